@@ -1,30 +1,242 @@
 import json
 import os
+import base64
+import hmac
+import hashlib
+import heapq
+import itertools
 import boto3
-from boto3.dynamodb.conditions import Key
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
+from boto3.dynamodb.types import Binary
+from boto3.dynamodb.conditions import Key, Attr
 
 dynamodb = boto3.resource("dynamodb")
 TABLE_NAME = os.environ["AUDIT_TABLE"]
-table = dynamodb.Table(TABLE_NAME)
+
+# Audit records are spread over AUDIT_SHARDS partitions per day by the writers:
+#   pk = AUDIT#<yyyy-mm-dd>#<shard>, sk = <timestamp>#<ACTION>#<id>
+AUDIT_SHARDS = int(os.environ.get("AUDIT_SHARDS", "8"))
+AUDIT_QUERY_WORKERS = int(os.environ.get("AUDIT_QUERY_WORKERS", "16"))
+
+# GSIs on AUDIT_TABLE (projection ALL), both sorted by the same sk:
+#   AuditTaskIndex  → taskId, sk   ("history of task X")
+#   AuditActorIndex → actor, sk    ("everything user Y did")
+AUDIT_TASK_INDEX = os.environ.get("AUDIT_TASK_INDEX", "AuditTaskIndex")
+AUDIT_ACTOR_INDEX = os.environ.get("AUDIT_ACTOR_INDEX", "AuditActorIndex")
+
+# Signs pagination cursors so clients cannot forge key ranges
+CURSOR_SECRET = os.environ["CURSOR_SECRET"].encode()
+
+DEFAULT_WINDOW_DAYS = 7
+MAX_WINDOW_DAYS = 31    # bounds the (day x shard) fan-out of unfiltered queries
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 500
+EARLIEST = "0000"       # lower sk bound when a task/actor query has no ?from
+LATEST = "~"            # sorts after every "<timestamp>#..." sk
+
+CORS_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*"
+}
+
+# DynamoDB types → JSON (Decimal, set, Binary) without a pre-copy
+def json_default(obj):
+    if isinstance(obj, Decimal):
+        return int(obj) if obj % 1 == 0 else float(obj)
+    if isinstance(obj, (set, frozenset)):
+        # convert first: Binary elements do not order
+        return sorted(json_default(v) if isinstance(v, (Decimal, Binary)) else v for v in obj)
+    if isinstance(obj, Binary):
+        return base64.b64encode(obj.value).decode()
+    raise TypeError(f"Not JSON serializable: {type(obj).__name__}")
+
+# Opaque signed cursor <-> {"sk": last returned sk, "from": lower bound}
+def encode_cursor(kind, value):
+    payload = base64.urlsafe_b64encode(
+        json.dumps({"k": kind, "v": value}, separators=(",", ":")).encode()
+    ).decode().rstrip("=")
+    sig = hmac.new(CURSOR_SECRET, payload.encode(), hashlib.sha256).hexdigest()[:32]
+    return f"{payload}.{sig}"
+
+def decode_cursor(cursor, kind):
+    try:
+        payload, sig = cursor.split(".", 1)
+        expected = hmac.new(CURSOR_SECRET, payload.encode(), hashlib.sha256).hexdigest()[:32]
+        if not hmac.compare_digest(sig, expected):
+            return None
+        data = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return data["v"] if data.get("k") == kind else None
+    except Exception:
+        return None
+
+# ISO-8601 (Z / offset / naive) → naive UTC, the format the writers store
+def utc_timestamp(value):
+    ts = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if ts.tzinfo:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts.isoformat()
+
+def bad_request(message):
+    return {
+        "statusCode": 400,
+        "headers": CORS_HEADERS,
+        "body": json.dumps({"message": message})
+    }
+
+# Newest `limit` records of one partition with start <= sk <= upper.
+# The cursor record itself (sk == upper) was on the previous page and is skipped.
+def query_range(partition_key, start, upper, limit, action=None, index=None, after=None):
+    items = []
+    kwargs = {
+        "TableName": TABLE_NAME,
+        "KeyConditionExpression": partition_key & Key("sk").between(start, upper),
+        "ScanIndexForward": False
+    }
+    if index:
+        kwargs["IndexName"] = index
+    if action:
+        kwargs["FilterExpression"] = Attr("action").eq(action)
+
+    while len(items) < limit:
+        kwargs["Limit"] = limit - len(items) + (1 if after else 0)
+        resp = dynamodb.meta.client.query(**kwargs)
+        items.extend(i for i in resp.get("Items", []) if i["sk"] != after)
+
+        if "LastEvaluatedKey" not in resp:
+            break
+        kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+    return items[:limit]
+
+# One page (newest first) of one partition → (items, LastEvaluatedKey or None)
+def query_page(pk, start, upper, limit, action, exclusive_start):
+    kwargs = {
+        "TableName": TABLE_NAME,
+        "KeyConditionExpression": Key("pk").eq(pk) & Key("sk").between(start, upper),
+        "ScanIndexForward": False,
+        "Limit": limit
+    }
+    if action:
+        kwargs["FilterExpression"] = Attr("action").eq(action)
+    if exclusive_start:
+        kwargs["ExclusiveStartKey"] = exclusive_start
+    resp = dynamodb.meta.client.query(**kwargs)
+    return resp.get("Items", []), resp.get("LastEvaluatedKey")
+
+# Newest `limit` records over many (day, shard) partitions, read in rounds of
+# about limit / AUDIT_SHARDS per partition. Everything a partition has not
+# returned yet sorts below its frontier (its LastEvaluatedKey, or the end of
+# its day before the first read), so only partitions whose frontier is above
+# the current limit-th record are read again; while fewer than `limit` records
+# are known, the newest day that is not exhausted is read next.
+def query_partitions(partitions, start, upper, limit, action=None, after=None):
+    page_size = -(-limit // AUDIT_SHARDS)
+    buffered = {pk: [] for pk in partitions}
+    frontier = {pk: pk.split("#")[1] + LATEST for pk in partitions}
+    next_key = dict.fromkeys(partitions)
+    head = []
+
+    with ThreadPoolExecutor(max_workers=min(AUDIT_QUERY_WORKERS, len(partitions))) as pool:
+        while True:
+            if len(head) < limit:
+                newest = max(frontier.values(), default=None)
+                due = [pk for pk in frontier if newest and frontier[pk][:10] == newest[:10]]
+            else:
+                due = [pk for pk in frontier if frontier[pk] > head[-1]["sk"]]
+            if not due:
+                return head
+
+            pages = pool.map(
+                lambda pk: query_page(pk, start, upper, page_size, action, next_key[pk]),
+                due
+            )
+            for pk, (items, last_key) in zip(due, pages):
+                # the cursor record itself (sk == upper) was on the previous page
+                buffered[pk].extend(i for i in items if i["sk"] != after)
+                if last_key:
+                    next_key[pk] = last_key
+                    frontier[pk] = last_key["sk"]
+                else:
+                    del frontier[pk]  # exhausted
+
+            # gather: each partition is newest-first, so a k-way merge on sk keeps that order
+            merged = heapq.merge(*buffered.values(), key=lambda item: item["sk"], reverse=True)
+            head = list(itertools.islice(merged, limit))
 
 def handler(event, context):
     try:
-        print("EVENT:", json.dumps(event))
+        params = event.get("queryStringParameters") or {}
+        task_id = params.get("taskId")
+        actor = params.get("actor")
+        action = params.get("action")
+
+        if task_id and actor:
+            return bad_request("Filter by taskId or actor, not both")
+
+        try:
+            limit = int(params.get("limit", DEFAULT_LIMIT))
+            to_ts = utc_timestamp(params["to"]) if params.get("to") else None
+            from_ts = utc_timestamp(params["from"]) if params.get("from") else None
+        except ValueError:
+            return bad_request("from/to must be ISO timestamps and limit a number")
+        if not 0 < limit <= MAX_LIMIT:
+            return bad_request(f"limit must be 1-{MAX_LIMIT}")
 
-        response = table.query(
-            KeyConditionExpression=Key("pk").eq("AUDIT"),
-            ScanIndexForward=False  # latest first
-        )
+        if task_id:
+            mode, value = "task", task_id
+        elif actor:
+            mode, value = "actor", actor
+        else:
+            mode, value = "all", None
+            # the global feed is bounded by a time window (default: last 7 days)
+            to_ts = to_ts or datetime.utcnow().isoformat()
+            from_ts = from_ts or (
+                datetime.fromisoformat(to_ts) - timedelta(days=DEFAULT_WINDOW_DAYS)
+            ).isoformat()
+            if (datetime.fromisoformat(to_ts) - datetime.fromisoformat(from_ts)).days >= MAX_WINDOW_DAYS:
+                return bad_request(f"from and to must be at most {MAX_WINDOW_DAYS} days apart")
 
-        items = response.get("Items", [])
+        start = from_ts or EARLIEST
+        upper = (to_ts + LATEST) if to_ts else LATEST
+        if start > upper:
+            return bad_request("from must be before to")
+
+        # ?cursor → continue below the last record of the previous page
+        cursor_kind = f"{mode}:{value}:{action}"
+        after = None
+        if params.get("cursor"):
+            position = decode_cursor(params["cursor"], cursor_kind)
+            if position is None:
+                return bad_request("Invalid cursor")
+            after = upper = position["sk"]
+            start = position["from"]
+
+        if mode == "task":
+            items = query_range(Key("taskId").eq(task_id), start, upper, limit,
+                                action, AUDIT_TASK_INDEX, after)
+        elif mode == "actor":
+            items = query_range(Key("actor").eq(actor), start, upper, limit,
+                                action, AUDIT_ACTOR_INDEX, after)
+        else:
+            # scatter: the (day, shard) partitions in the window, in parallel rounds
+            first_day = datetime.fromisoformat(start[:10]).date()
+            last_day = datetime.fromisoformat(upper[:10]).date()
+            days = [
+                (first_day + timedelta(days=d)).isoformat()
+                for d in range((last_day - first_day).days + 1)
+            ]
+            partitions = [f"AUDIT#{day}#{shard}" for day in days for shard in range(AUDIT_SHARDS)]
+            items = query_partitions(partitions, start, upper, limit, action, after)
+
+        next_cursor = None
+        if len(items) == limit:
+            next_cursor = encode_cursor(cursor_kind, {"sk": items[-1]["sk"], "from": start})
 
         return {
             "statusCode": 200,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*"
-            },
-            "body": json.dumps(items)
+            "headers": CORS_HEADERS,
+            "body": json.dumps({"items": items, "nextCursor": next_cursor}, default=json_default)
         }
 
     except Exception as e:
@@ -35,4 +247,4 @@ def handler(event, context):
                 "Access-Control-Allow-Origin": "*"
             },
             "body": json.dumps({"message": "Failed to fetch audit logs"})
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,44 @@
+import os
+import zlib
+import boto3
+from boto3.dynamodb.conditions import Key
+
+dynamodb = boto3.resource("dynamodb")
+AUDIT_TABLE = dynamodb.Table(os.environ["AUDIT_TABLE"])
+
+# Must match the writers (see audit_key in the task / comment handlers)
+AUDIT_SHARDS = int(os.environ.get("AUDIT_SHARDS", "8"))
+LEGACY_PK = "AUDIT"
+
+
+def audit_key(action, entity_id, ts):
+    sk = f"{ts}#{action}#{entity_id}"
+    return {"pk": f"AUDIT#{ts[:10]}#{zlib.crc32(sk.encode()) % AUDIT_SHARDS}", "sk": sk}
+
+
+# One-off: moves records from the single pk="AUDIT" partition (sk = ACTION#<id>#<ts>)
+# to the sharded keys, filling in actor. Safe to re-run; moved records are no longer under pk="AUDIT".
+def handler(event, context):
+    query_kwargs = {"KeyConditionExpression": Key("pk").eq(LEGACY_PK)}
+    moved = 0
+
+    with AUDIT_TABLE.batch_writer() as batch:
+        while True:
+            resp = AUDIT_TABLE.query(**query_kwargs)
+
+            for item in resp.get("Items", []):
+                action, entity_id, ts = item["sk"].split("#", 2)
+                actor = item.get("updatedBy") or item.get("deletedBy") or item.get("createdBy")
+                moved_item = {**item, **audit_key(action, entity_id, ts)}
+                if actor:
+                    moved_item["actor"] = actor  # AuditActorIndex
+                batch.put_item(Item=moved_item)
+                batch.delete_item(Key={"pk": item["pk"], "sk": item["sk"]})
+                moved += 1
+
+            if "LastEvaluatedKey" not in resp:
+                break
+            query_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+    print("RESHARD DONE:", moved, "audit records")
+    return {"moved": moved}
@@ -0,0 +1,104 @@
+import zlib
+import argparse
+from collections import deque
+from datetime import datetime, timedelta
+
+# =========================
+# Audit write load test: single pk="AUDIT" vs sharded audit keys.
+#
+# Runs against a local stand-in for DynamoDB that enforces the per-partition-key
+# write limit (1,000 WCU/s, 1 KB items → 1,000 writes/s per key, one second of
+# burst). Time is simulated, so a 10 s run finishes instantly and is repeatable.
+# Throttled writes are retried on the next tick, like the SDK would.
+#
+#   python audit-shard-loadtest.py --rate 5000 --seconds 10 --shards 8
+# =========================
+
+PER_KEY_WRITES_PER_SEC = 1000
+TICK = 0.01  # seconds
+
+
+class PartitionLimitedTable:
+    """Accepts a write only if its partition key still has capacity."""
+
+    def __init__(self, per_key_rate=PER_KEY_WRITES_PER_SEC):
+        self.rate = per_key_rate
+        self.buckets = {}  # pk → (tokens, last refill time)
+
+    def put(self, pk, now):
+        tokens, last = self.buckets.get(pk, (self.rate, now))
+        tokens = min(self.rate, tokens + (now - last) * self.rate)
+        if tokens < 1:
+            self.buckets[pk] = (tokens, now)
+            return False
+        self.buckets[pk] = (tokens - 1, now)
+        return True
+
+
+def legacy_key(action, entity_id, ts, shards):
+    return "AUDIT"
+
+
+# same as audit_key in the handlers
+def sharded_key(action, entity_id, ts, shards):
+    sk = f"{ts}#{action}#{entity_id}"
+    return f"AUDIT#{ts[:10]}#{zlib.crc32(sk.encode()) % shards}"
+
+
+def run(key_fn, rate, seconds, shards):
+    table = PartitionLimitedTable()
+    start = datetime(2024, 1, 1, 12)
+    pending = deque()  # (pk, enqueued at)
+    written = 0
+    delays = []
+    seq = 0
+
+    ticks = int(seconds / TICK)
+    for t in range(ticks):
+        now = t * TICK
+        ts = (start + timedelta(seconds=now)).isoformat()
+
+        for _ in range(int(rate * TICK)):
+            seq += 1
+            pending.append((key_fn("UPDATE_STATUS", f"task-{seq}", ts, shards), now))
+
+        retry = deque()
+        while pending:
+            pk, enqueued = pending.popleft()
+            if table.put(pk, now):
+                written += 1
+                delays.append(now - enqueued)
+            else:
+                retry.append((pk, enqueued))
+        pending = retry
+
+    delays.sort()
+    p99 = delays[int(len(delays) * 0.99)] if delays else 0
+    return {
+        "offered": seq,
+        "written": written,
+        "throughput": written / seconds,
+        "backlog": len(pending),
+        "p99_delay": p99
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Audit write throughput: single key vs sharded")
+    parser.add_argument("--rate", type=int, default=5000, help="offered audit writes per second")
+    parser.add_argument("--seconds", type=int, default=10)
+    parser.add_argument("--shards", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    print(f"offered {args.rate}/s for {args.seconds}s, per-key limit {PER_KEY_WRITES_PER_SEC}/s")
+    for name, key_fn in (("pk=AUDIT", legacy_key), (f"sharded x{args.shards}", sharded_key)):
+        r = run(key_fn, args.rate, args.seconds, args.shards)
+        print(
+            f"{name:>12}: {r['throughput']:8.0f} writes/s  "
+            f"written {r['written']}/{r['offered']}  backlog {r['backlog']}  "
+            f"p99 delay {r['p99_delay']:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
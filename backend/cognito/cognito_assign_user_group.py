@@ -3,10 +3,14 @@ import boto3
 import os
 
 client = boto3.client("cognito-idp")
+dynamodb = boto3.resource("dynamodb")
 
 USER_POOL_ID = os.environ["USER_POOL_ID"]
 DEFAULT_GROUP = "user"
 
+# Optional username → sub directory read by the mention resolvers
+USER_DIRECTORY_TABLE = os.environ.get("USER_DIRECTORY_TABLE")
+
 def handler(event, context):
     try:
         # Cognito internal username (required by AdminAddUserToGroup)
@@ -30,6 +34,18 @@ def handler(event, context):
             GroupName=DEFAULT_GROUP
         )
 
+        # Register in user directory (saves a Cognito ListUsers per mention)
+        if USER_DIRECTORY_TABLE:
+            dynamodb.Table(USER_DIRECTORY_TABLE).put_item(
+                Item={
+                    "pk": f"USER#{cognito_username}",
+                    "sk": "PROFILE",
+                    "username": cognito_username,
+                    "sub": attrs.get("sub"),
+                    "displayName": display_name
+                }
+            )
+
         return event
 
     except Exception as e:
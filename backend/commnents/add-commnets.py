@@ -3,6 +3,8 @@ import os
 import boto3
 import uuid
 import re
+import time
+import hashlib
 from datetime import datetime
 from decimal import Decimal
 
@@ -10,10 +12,18 @@ dynamodb = boto3.resource("dynamodb")
 
 COMMENTS_TABLE = dynamodb.Table(os.environ["COMMENTS_TABLE"])
 TASK_TABLE = dynamodb.Table(os.environ["TASK_TABLE"])
-MENTIONS_TABLE = dynamodb.Table(os.environ["MENTIONS_TABLE"])
 
-cognito = boto3.client("cognito-idp")
-USER_POOL_ID = os.environ["USER_POOL_ID"]
+TransactionCanceled = dynamodb.meta.client.exceptions.TransactionCanceledException
+
+# Idempotency-Key support (optional, enabled when the table is configured)
+IDEMPOTENCY_TABLE = os.environ.get("IDEMPOTENCY_TABLE")
+IDEMPOTENCY = dynamodb.Table(IDEMPOTENCY_TABLE) if IDEMPOTENCY_TABLE else None
+IDEMPOTENCY_TTL = int(os.environ.get("IDEMPOTENCY_TTL", "86400"))
+IDEMPOTENCY_LOCK_SECONDS = 60
+
+# Mention delivery + task sharing happen in mentions/mention-worker.py
+sqs = boto3.client("sqs")
+MENTION_QUEUE_URL = os.environ["MENTION_QUEUE_URL"]
 
 MENTION_REGEX = r'@([a-zA-Z0-9_.-]+)'
 
@@ -23,24 +33,96 @@ CORS_HEADERS = {
 }
 
 # =========================
-# Helper: username → sub
+# Helper: Idempotency-Key (header) → claim / replay / release
+# record: pk=IDEMPOTENCY#<sub>#<route>#<key>, expires via TTL on expiresAt
 # =========================
-def get_user_sub(username):
-    resp = cognito.list_users(
-        UserPoolId=USER_POOL_ID,
-        Filter=f'username = "{username}"'
-    )
-    users = resp.get("Users", [])
-    if not users:
+def idempotency_record_key(event, user_sub, route):
+    headers = {k.lower(): v for k, v in (event.get("headers") or {}).items()}
+    key = headers.get("idempotency-key")
+    if not key or not IDEMPOTENCY_TABLE:
+        return None
+    return {"pk": f"IDEMPOTENCY#{user_sub}#{route}#{key}", "sk": "REQUEST"}
+
+
+# None → this request owns the key; otherwise the response to send back
+def claim_idempotency(record_key, request_body, claim_token):
+    now = int(time.time())
+    body_hash = hashlib.sha256((request_body or "").encode()).hexdigest()
+
+    try:
+        IDEMPOTENCY.put_item(
+            Item={
+                **record_key,
+                "status": "IN_PROGRESS",
+                "claimToken": claim_token,  # only this request may complete / release it
+                "bodyHash": body_hash,
+                "expiresAt": now + IDEMPOTENCY_LOCK_SECONDS
+            },
+            ConditionExpression="attribute_not_exists(pk) OR expiresAt < :now",
+            ExpressionAttributeValues={":now": now}
+        )
         return None
+    except IDEMPOTENCY.meta.client.exceptions.ConditionalCheckFailedException:
+        pass
 
-    for attr in users[0]["Attributes"]:
-        if attr["Name"] == "sub":
-            return attr["Value"]
-    return None
+    record = IDEMPOTENCY.get_item(Key=record_key, ConsistentRead=True).get("Item", {})
+
+    if record.get("bodyHash") != body_hash:
+        return {
+            "statusCode": 422,
+            "headers": CORS_HEADERS,
+            "body": json.dumps({"message": "Idempotency-Key reused with a different request"})
+        }
+    if record.get("status") == "COMPLETED":
+        return {
+            "statusCode": int(record["statusCode"]),
+            "headers": {**CORS_HEADERS, "Idempotent-Replayed": "true"},
+            "body": record["responseBody"]
+        }
+    return {
+        "statusCode": 409,
+        "headers": CORS_HEADERS,
+        "body": json.dumps({"message": "Request with this Idempotency-Key is in progress"})
+    }
+
+
+# COMPLETED record as a transaction item: it commits together with the write,
+# so a retry can never see the write without the response to replay.
+# Guarded by the claim token: if the lock expired and a retry re-claimed the
+# key, this write is cancelled instead of committing a second time
+def idempotency_completion_item(record_key, response, claim_token):
+    return {
+        "Update": {
+            "TableName": IDEMPOTENCY_TABLE,
+            "Key": record_key,
+            "UpdateExpression": "SET #s = :c, statusCode = :code, responseBody = :b, expiresAt = :exp",
+            "ConditionExpression": "claimToken = :t",
+            "ExpressionAttributeNames": {"#s": "status"},
+            "ExpressionAttributeValues": {
+                ":c": "COMPLETED",
+                ":code": response["statusCode"],
+                ":b": response["body"],
+                ":exp": int(time.time()) + IDEMPOTENCY_TTL,
+                ":t": claim_token
+            }
+        }
+    }
+
+
+def release_idempotency(record_key, claim_token):
+    try:
+        IDEMPOTENCY.delete_item(
+            Key=record_key,
+            ConditionExpression="claimToken = :t",
+            ExpressionAttributeValues={":t": claim_token}
+        )
+    except IDEMPOTENCY.meta.client.exceptions.ConditionalCheckFailedException:
+        pass  # re-claimed by a retry after the lock expired: not ours to release
 
 
 def handler(event, context):
+    idem_key = None
+    claim_token = str(uuid.uuid4())
     try:
         body = json.loads(event.get("body") or "{}")
         comment_text = body.get("comment", "").strip()
@@ -77,24 +159,13 @@ def handler(event, context):
         comment_id = str(uuid.uuid4())
 
         # =========================
-        # Fetch task META
+        # Idempotency (retries replay the first response)
         # =========================
-        task_res = TASK_TABLE.get_item(
-            Key={
-                "pk": f"TASK#{task_id}",
-                "sk": "META"
-            }
-        )
-
-        task = task_res.get("Item")
-        if not task:
-            return {
-                "statusCode": 404,
-                "headers": CORS_HEADERS,
-                "body": json.dumps({"message": "Task not found"})
-            }
-
-        task_title = task.get("title", "Untitled Task")
+        idem_key = idempotency_record_key(event, user_sub, f"POST /tasks/{task_id}/comments")
+        if idem_key:
+            replay = claim_idempotency(idem_key, event.get("body"), claim_token)
+            if replay:
+                return replay
 
         # =========================
         # Extract mentions
@@ -102,98 +173,106 @@ def handler(event, context):
         mentioned_usernames = list(set(re.findall(MENTION_REGEX, comment_text)))
         mentioned_usernames = [u for u in mentioned_usernames if u != username]
 
-        # =========================
-        # Store comment
-        # =========================
-        COMMENTS_TABLE.put_item(
-            Item={
-                "pk": f"TASK#{task_id}",
-                "sk": f"COMMENT#{comment_id}",
-                "taskId": task_id,
-                "commentId": comment_id,
-                "comment": comment_text,
-                "userId": user_sub,
-                "userName": username,
-                "createdAt": now
-            }
-        )
-
-        # =========================
-        # Increment comment count (SAFE)
-        # =========================
-        TASK_TABLE.update_item(
-            Key={
-                "pk": f"TASK#{task_id}",
-                "sk": "META"
-            },
-            UpdateExpression="SET commentCount = if_not_exists(commentCount, :zero) + :inc",
-            ExpressionAttributeValues={
-                ":inc": Decimal(1),
-                ":zero": Decimal(0)
-            }
-        )
+        response = {
+            "statusCode": 201,
+            "headers": CORS_HEADERS,
+            "body": json.dumps({"message": "Comment added", "commentId": comment_id})
+        }
 
         # =========================
-        # Handle mentions + sharing
+        # Comment + comment count (+ idempotency record) in ONE transaction
+        # (the META condition replaces the old "does the task exist" read;
+        # task/task-membership-stream.py moves the memberships' updatedAt)
         # =========================
-        for mentioned_username in mentioned_usernames:
-            mentioned_sub = get_user_sub(mentioned_username)
-            if not mentioned_sub:
-                continue
-
-            # Mention
-            MENTIONS_TABLE.put_item(
-                Item={
-                    "pk": f"USER#{mentioned_username}",
-                    "sk": f"MENTION#{now}#{comment_id}",
-                    "taskId": task_id,
-                    "taskTitle": task_title,
-                    "commentId": comment_id,
-                    "comment": comment_text,
-                    "mentionedBy": username,
-                    "createdAt": now,
-                    "status": "UNREAD"
+        transact_items = [
+            {
+                "Put": {
+                    "TableName": COMMENTS_TABLE.name,
+                    "Item": {
+                        "pk": f"TASK#{task_id}",
+                        "sk": f"COMMENT#{comment_id}",
+                        "taskId": task_id,
+                        "commentId": comment_id,
+                        "comment": comment_text,
+                        "userId": user_sub,
+                        "userName": username,
+                        "createdAt": now
+                    }
                 }
-            )
-
-            # Share task
-            if mentioned_sub not in task.get("participantIds", []):
-                TASK_TABLE.update_item(
-                    Key={
+            },
+            {
+                "Update": {
+                    "TableName": TASK_TABLE.name,
+                    "Key": {
                         "pk": f"TASK#{task_id}",
                         "sk": "META"
                     },
-                    UpdateExpression="""
-                        SET participants = list_append(
-                                if_not_exists(participants, :p0),
-                                :p1
-                            ),
-                            participantIds = list_append(
-                                if_not_exists(participantIds, :i0),
-                                :i1
-                            ),
-                            updatedAt = :t
-                    """,
-                    ExpressionAttributeValues={
-                        ":p0": [],
-                        ":p1": [{
-                            "userId": mentioned_sub,
-                            "userName": mentioned_username
-                        }],
-                        ":i0": [],
-                        ":i1": [mentioned_sub],
-                        ":t": now
+                    "UpdateExpression": "SET commentCount = if_not_exists(commentCount, :zero) + :inc, updatedAt = :now ADD #v :inc",
+                    "ConditionExpression": "attribute_exists(pk)",
+                    "ExpressionAttributeNames": {"#v": "version"},
+                    "ExpressionAttributeValues": {
+                        ":inc": Decimal(1),
+                        ":zero": Decimal(0),
+                        ":now": now
                     }
+                }
+            }
+        ]
+        if idem_key:
+            transact_items.append(idempotency_completion_item(idem_key, response, claim_token))
+
+        try:
+            dynamodb.meta.client.transact_write_items(TransactItems=transact_items)
+        except TransactionCanceled as e:
+            reasons = e.response.get("CancellationReasons", [])
+            if len(reasons) > 1 and reasons[1].get("Code") == "ConditionalCheckFailed":
+                if idem_key:
+                    release_idempotency(idem_key, claim_token)
+                    idem_key = None
+                return {
+                    "statusCode": 404,
+                    "headers": CORS_HEADERS,
+                    "body": json.dumps({"message": "Task not found"})
+                }
+            if idem_key and len(reasons) > 2 and reasons[2].get("Code") == "ConditionalCheckFailed":
+                # lock expired and a retry owns the key now: it adds the comment
+                idem_key = None
+                return {
+                    "statusCode": 409,
+                    "headers": CORS_HEADERS,
+                    "body": json.dumps({"message": "Request with this Idempotency-Key is in progress"})
+                }
+            raise
+
+        idem_key = None  # committed: the claim is now the replayable response
+
+        # =========================
+        # Enqueue mentions + sharing (one event, async worker)
+        # the comment exists from here on, so failures are logged, not returned as 500
+        # =========================
+        if mentioned_usernames:
+            try:
+                sqs.send_message(
+                    QueueUrl=MENTION_QUEUE_URL,
+                    MessageBody=json.dumps({
+                        "type": "COMMENT_MENTIONS",
+                        "taskId": task_id,
+                        "commentId": comment_id,
+                        "comment": comment_text,
+                        "mentionedBy": username,
+                        "createdAt": now,
+                        "usernames": mentioned_usernames
+                    })
                 )
+            except Exception as e:
+                print("ADD COMMENT MENTIONS ERROR:", comment_id, str(e))
 
-        return {
-            "statusCode": 201,
-            "headers": CORS_HEADERS,
-            "body": json.dumps({"message": "Comment added"})
-        }
+        return response
 
     except Exception as e:
         print("ADD COMMENT ERROR:", str(e))
+        if idem_key:
+            release_idempotency(idem_key, claim_token)
         return {
             "statusCode": 500,
             "headers": CORS_HEADERS,
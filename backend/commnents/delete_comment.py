@@ -1,7 +1,9 @@
 import json
 import os
+import zlib
 import boto3
 from datetime import datetime
+from decimal import Decimal
 
 dynamodb = boto3.resource("dynamodb")
 
@@ -9,6 +11,17 @@ COMMENTS = dynamodb.Table(os.environ["COMMENTS_TABLE"])
 AUDIT = dynamodb.Table(os.environ["AUDIT_TABLE"])
 TASKS = dynamodb.Table(os.environ["TASKS_TABLE"])
 
+# Audit records are spread over AUDIT_SHARDS partitions per day
+# (audit/audit-get-lambda.py reads them with the same AUDIT_SHARDS; never lower it)
+AUDIT_SHARDS = int(os.environ.get("AUDIT_SHARDS", "8"))
+
+TransactionCanceled = dynamodb.meta.client.exceptions.TransactionCanceledException
+
+# Audit key: pk = AUDIT#<day>#<shard>, sk starts with the timestamp
+def audit_key(action, entity_id, ts):
+    sk = f"{ts}#{action}#{entity_id}"
+    return {"pk": f"AUDIT#{ts[:10]}#{zlib.crc32(sk.encode()) % AUDIT_SHARDS}", "sk": sk}
+
 def handler(event, context):
     task_id = event["pathParameters"]["taskId"]
     comment_id = event["pathParameters"]["commentId"]
@@ -35,40 +48,61 @@ def handler(event, context):
 
     # 2️⃣ Get task meta (title)
     task = TASKS.get_item(
-        Key={"pk": pk, "sk": "META"}
+        Key={"pk": pk, "sk": "META"},
+        ProjectionExpression="title"
     ).get("Item", {})
 
     task_title = task.get("title", "Unknown Task")
 
-    # 3️⃣ Delete comment
-    COMMENTS.delete_item(Key={"pk": pk, "sk": sk})
-
-    # 4️⃣ Decrement comment count safely
-    TASKS.update_item(
-        Key={
-            "pk": pk,
-            "sk": "META"
-        },
-        UpdateExpression="SET commentCount = if_not_exists(commentCount, :zero) - :one",
-        ExpressionAttributeValues={
-            ":one": 1,
-            ":zero": 0
-        }
-    )
-
-    # 5️⃣ Audit
     ts = datetime.utcnow().isoformat()
 
+    # 3️⃣ Delete comment + decrement comment count (+ move updatedAt for delta sync)
+    # in ONE transaction; task/task-membership-stream.py moves the memberships
+    try:
+        dynamodb.meta.client.transact_write_items(
+            TransactItems=[
+                {
+                    "Delete": {
+                        "TableName": COMMENTS.name,
+                        "Key": {"pk": pk, "sk": sk},
+                        "ConditionExpression": "attribute_exists(pk)"
+                    }
+                },
+                {
+                    "Update": {
+                        "TableName": TASKS.name,
+                        "Key": {"pk": pk, "sk": "META"},
+                        "UpdateExpression": "SET commentCount = if_not_exists(commentCount, :zero) - :one, updatedAt = :now ADD #v :one",
+                        "ConditionExpression": "attribute_exists(pk)",
+                        "ExpressionAttributeNames": {"#v": "version"},
+                        "ExpressionAttributeValues": {
+                            ":one": Decimal(1),
+                            ":zero": Decimal(0),
+                            ":now": ts
+                        }
+                    }
+                }
+            ]
+        )
+    except TransactionCanceled as e:
+        reasons = e.response.get("CancellationReasons", [])
+        if reasons and reasons[0].get("Code") == "ConditionalCheckFailed":
+            return {"statusCode": 404, "body": "Comment not found"}  # deleted concurrently
+        if len(reasons) > 1 and reasons[1].get("Code") == "ConditionalCheckFailed":
+            return {"statusCode": 404, "body": "Task not found"}
+        raise
+
+    # 4️⃣ Audit
     AUDIT.put_item(
         Item={
-            "pk": "AUDIT",
-            "sk": f"DELETE_COMMENT#{comment_id}#{ts}",
+            **audit_key("DELETE_COMMENT", comment_id, ts),
             "action": "DELETE_COMMENT",
             "taskId": task_id,
             "taskTitle": task_title,
             "commentId": comment_id,
             "deletedComment": comment["comment"],
             "deletedBy": username,
+            "actor": username,  # AuditActorIndex
             "createdAt": ts
         }
     )
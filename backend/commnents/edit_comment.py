@@ -1,5 +1,6 @@
 import json
 import os
+import zlib
 import boto3
 from datetime import datetime
 
@@ -9,6 +10,15 @@ COMMENTS_TABLE = dynamodb.Table(os.environ["COMMENTS_TABLE"])
 AUDIT_TABLE = dynamodb.Table(os.environ["AUDIT_TABLE"])
 TASKS_TABLE = dynamodb.Table(os.environ["TASKS_TABLE"])
 
+# Audit records are spread over AUDIT_SHARDS partitions per day
+# (audit/audit-get-lambda.py reads them with the same AUDIT_SHARDS; never lower it)
+AUDIT_SHARDS = int(os.environ.get("AUDIT_SHARDS", "8"))
+
+# Audit key: pk = AUDIT#<day>#<shard>, sk starts with the timestamp
+def audit_key(action, entity_id, ts):
+    sk = f"{ts}#{action}#{entity_id}"
+    return {"pk": f"AUDIT#{ts[:10]}#{zlib.crc32(sk.encode()) % AUDIT_SHARDS}", "sk": sk}
+
 def handler(event, context):
     try:
         # ==============================
@@ -88,12 +98,9 @@ def handler(event, context):
         # ==============================
         # AUDIT LOG
         # ==============================
-        audit_sk = f"EDIT_COMMENT#{comment_id}#{timestamp}"
-
         AUDIT_TABLE.put_item(
             Item={
-                "pk": "AUDIT",
-                "sk": audit_sk,
+                **audit_key("EDIT_COMMENT", comment_id, timestamp),
                 "action": "EDIT_COMMENT",
                 "taskId": task_id,
                 "taskTitle": task_title,
@@ -101,6 +108,7 @@ def handler(event, context):
                 "oldValue": old_comment,
                 "newValue": new_comment,
                 "updatedBy": username,
+                "actor": username,  # AuditActorIndex
                 "userId": user_id,
                 "createdAt": timestamp,
                 "updatedAt": timestamp
@@ -0,0 +1,114 @@
+import json
+import os
+import base64
+import boto3
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
+from boto3.dynamodb.types import Binary
+from boto3.dynamodb.conditions import Key
+
+dynamodb = boto3.resource("dynamodb")
+COMMENTS_TABLE = os.environ["COMMENTS_TABLE"]
+TASK_TABLE = os.environ["TASK_TABLE"]
+
+# GSI on COMMENTS_TABLE: partition key pk (TASK#id), sort key createdAt
+COMMENT_TIME_INDEX = os.environ.get("COMMENT_TIME_INDEX", "CommentTimeIndex")
+
+COMMENT_FETCH_WORKERS = int(os.environ.get("COMMENT_FETCH_WORKERS", "8"))
+MAX_TASKS = 50
+MAX_PER_TASK = 20
+DEFAULT_PER_TASK = 5
+
+CORS_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*"
+}
+
+# DynamoDB types → JSON (Decimal, set, Binary) without a pre-copy
+def json_default(obj):
+    if isinstance(obj, Decimal):
+        return int(obj) if obj % 1 == 0 else float(obj)
+    if isinstance(obj, (set, frozenset)):
+        # convert first: Binary elements do not order
+        return sorted(json_default(v) if isinstance(v, (Decimal, Binary)) else v for v in obj)
+    if isinstance(obj, Binary):
+        return base64.b64encode(obj.value).decode()
+    raise TypeError(f"Not JSON serializable: {type(obj).__name__}")
+
+# Task ids the caller participates in (one BatchGetItem on membership items)
+def visible_task_ids(task_ids, user_id):
+    visible = set()
+    request = {
+        TASK_TABLE: {
+            "Keys": [{"pk": f"TASK#{t}", "sk": f"MEMBER#{user_id}"} for t in task_ids],
+            "ProjectionExpression": "taskId, memberId"
+        }
+    }
+
+    while request:
+        resp = dynamodb.batch_get_item(RequestItems=request)
+        for item in resp.get("Responses", {}).get(TASK_TABLE, []):
+            if item.get("memberId") == user_id:
+                visible.add(item["taskId"])
+        request = resp.get("UnprocessedKeys") or None
+
+    return visible
+
+# Latest `k` comments of one task, newest first (client is thread-safe)
+def latest_comments(task_id, k):
+    resp = dynamodb.meta.client.query(
+        TableName=COMMENTS_TABLE,
+        IndexName=COMMENT_TIME_INDEX,
+        KeyConditionExpression=Key("pk").eq(f"TASK#{task_id}"),
+        ScanIndexForward=False,
+        Limit=k
+    )
+    return resp.get("Items", [])
+
+def handler(event, context):
+    try:
+        claims = event["requestContext"]["authorizer"]["jwt"]["claims"]
+        user_id = claims["sub"]
+        groups = claims.get("cognito:groups", [])
+
+        # POST {"taskIds": [...], "k": 5}  or  GET ?ids=a,b,c&k=5
+        body = json.loads(event.get("body") or "{}")
+        params = event.get("queryStringParameters") or {}
+        task_ids = body.get("taskIds") or [t for t in (params.get("ids") or "").split(",") if t]
+        task_ids = list(dict.fromkeys(task_ids))
+
+        try:
+            k = int(body.get("k") or params.get("k") or DEFAULT_PER_TASK)
+        except ValueError:
+            k = 0
+
+        if not 0 < len(task_ids) <= MAX_TASKS or not 0 < k <= MAX_PER_TASK:
+            return {
+                "statusCode": 400,
+                "headers": CORS_HEADERS,
+                "body": json.dumps({
+                    "message": f"1-{MAX_TASKS} task ids and k of 1-{MAX_PER_TASK} required"
+                })
+            }
+
+        if "admin" not in groups:
+            visible = visible_task_ids(task_ids, user_id)
+            task_ids = [t for t in task_ids if t in visible]
+
+        with ThreadPoolExecutor(max_workers=min(COMMENT_FETCH_WORKERS, len(task_ids) or 1)) as pool:
+            results = pool.map(lambda t: latest_comments(t, k), task_ids)
+            comments = dict(zip(task_ids, results))
+
+        return {
+            "statusCode": 200,
+            "headers": CORS_HEADERS,
+            "body": json.dumps(comments, default=json_default)
+        }
+
+    except Exception as e:
+        print("GET COMMENTS BATCH ERROR:", str(e))
+        return {
+            "statusCode": 500,
+            "headers": CORS_HEADERS,
+            "body": json.dumps({"message": "Internal server error"})
+        }
@@ -1,26 +1,128 @@
 import json
 import os
+import base64
+import hmac
+import hashlib
 import boto3
+from decimal import Decimal
+from boto3.dynamodb.types import Binary
+from boto3.dynamodb.conditions import Key
 
 dynamodb = boto3.resource("dynamodb")
 COMMENTS_TABLE = dynamodb.Table(os.environ["COMMENTS_TABLE"])
 
+# GSI on COMMENTS_TABLE: partition key pk (TASK#id), sort key createdAt
+# (comment sort keys are COMMENT#<uuid>, so the base table has no time order)
+COMMENT_TIME_INDEX = os.environ.get("COMMENT_TIME_INDEX", "CommentTimeIndex")
+
+# Signs pagination cursors so clients cannot forge ExclusiveStartKeys
+CURSOR_SECRET = os.environ["CURSOR_SECRET"].encode()
+MAX_PAGE_SIZE = 100
+
+# Attributes returned for ?view=list
+LIST_VIEW_PROJECTION = "commentId, #c, userId, userName, createdAt, updatedAt"
+
+# DynamoDB types → JSON (Decimal, set, Binary) without a pre-copy
+def json_default(obj):
+    if isinstance(obj, Decimal):
+        return int(obj) if obj % 1 == 0 else float(obj)
+    if isinstance(obj, (set, frozenset)):
+        # convert first: Binary elements do not order
+        return sorted(json_default(v) if isinstance(v, (Decimal, Binary)) else v for v in obj)
+    if isinstance(obj, Binary):
+        return base64.b64encode(obj.value).decode()
+    raise TypeError(f"Not JSON serializable: {type(obj).__name__}")
+
+# Opaque signed cursor <-> DynamoDB key
+def encode_cursor(kind, key):
+    payload = base64.urlsafe_b64encode(
+        json.dumps({"k": kind, "v": key}, separators=(",", ":")).encode()
+    ).decode().rstrip("=")
+    sig = hmac.new(CURSOR_SECRET, payload.encode(), hashlib.sha256).hexdigest()[:32]
+    return f"{payload}.{sig}"
+
+def decode_cursor(cursor, kind):
+    try:
+        payload, sig = cursor.split(".", 1)
+        expected = hmac.new(CURSOR_SECRET, payload.encode(), hashlib.sha256).hexdigest()[:32]
+        if not hmac.compare_digest(sig, expected):
+            return None
+        data = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return data["v"] if data.get("k") == kind else None
+    except Exception:
+        return None
+
+def bad_request(message):
+    return {
+        "statusCode": 400,
+        "headers": {"Access-Control-Allow-Origin": "*"},
+        "body": json.dumps({"message": message})
+    }
+
 def handler(event, context):
     try:
         task_id = event["pathParameters"]["id"]
+        params = event.get("queryStringParameters") or {}
+
+        # ?limit / ?cursor → one page; neither → every page, as a plain list
+        cursor = params.get("cursor")
+        paged = "limit" in params or cursor is not None
+        try:
+            limit = int(params.get("limit", MAX_PAGE_SIZE))
+        except ValueError:
+            limit = 0
+        if paged and not 0 < limit <= MAX_PAGE_SIZE:
+            return bad_request(f"limit must be 1-{MAX_PAGE_SIZE}")
 
-        res = COMMENTS_TABLE.query(
-            KeyConditionExpression="pk = :pk",
-            ExpressionAttributeValues={
-                ":pk": f"TASK#{task_id}"
-            },
-            ScanIndexForward=True
-        )
+        order = params.get("order", "oldest")
+        if order not in ("oldest", "newest"):
+            return bad_request("order must be oldest or newest")
+
+        key_condition = Key("pk").eq(f"TASK#{task_id}")
+        if params.get("since"):
+            # only comments newer than the client's last-seen createdAt
+            key_condition = key_condition & Key("createdAt").gt(params["since"])
+
+        query_kwargs = {
+            "IndexName": COMMENT_TIME_INDEX,
+            "KeyConditionExpression": key_condition,
+            "ScanIndexForward": order == "oldest"
+        }
+        if params.get("view") == "list":
+            query_kwargs["ProjectionExpression"] = LIST_VIEW_PROJECTION
+            query_kwargs["ExpressionAttributeNames"] = {"#c": "comment"}
+
+        cursor_kind = f"{task_id}:{order}"
+        if cursor:
+            start_key = decode_cursor(cursor, cursor_kind)
+            if start_key is None:
+                return bad_request("Invalid cursor")
+            query_kwargs["ExclusiveStartKey"] = start_key
+
+        items = []
+        while True:
+            if paged:
+                query_kwargs["Limit"] = limit - len(items)
+
+            res = COMMENTS_TABLE.query(**query_kwargs)
+            items.extend(res.get("Items", []))
+
+            last_key = res.get("LastEvaluatedKey")
+            if not last_key or (paged and len(items) >= limit):
+                break
+            query_kwargs["ExclusiveStartKey"] = last_key
+
+        body = items
+        if paged:
+            body = {
+                "items": items,
+                "nextCursor": encode_cursor(cursor_kind, last_key) if last_key else None
+            }
 
         return {
             "statusCode": 200,
             "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps(res.get("Items", []))
+            "body": json.dumps(body, default=json_default)
         }
 
     except Exception as e:
@@ -29,4 +131,4 @@ def handler(event, context):
             "statusCode": 500,
             "headers": {"Access-Control-Allow-Origin": "*"},
             "body": json.dumps({"message": "Internal server error"})
-        }
\ No newline at end of file
+        }
@@ -1,10 +1,59 @@
 import json
 import os
+import base64
+import hmac
+import hashlib
 import boto3
+from decimal import Decimal
+from boto3.dynamodb.types import Binary
 
 dynamodb = boto3.resource("dynamodb")
 MENTIONS_TABLE = dynamodb.Table(os.environ["MENTIONS_TABLE"])
 
+# Sparse GSI on MENTIONS_TABLE: partition key unreadPk, sort key sk, projection ALL
+UNREAD_MENTIONS_INDEX = os.environ.get("UNREAD_MENTIONS_INDEX", "UnreadMentionsIndex")
+
+# Signs pagination cursors so clients cannot forge ExclusiveStartKeys
+CURSOR_SECRET = os.environ["CURSOR_SECRET"].encode()
+MAX_PAGE_SIZE = 100
+
+# DynamoDB types → JSON (Decimal, set, Binary) without a pre-copy
+def json_default(obj):
+    if isinstance(obj, Decimal):
+        return int(obj) if obj % 1 == 0 else float(obj)
+    if isinstance(obj, (set, frozenset)):
+        # convert first: Binary elements do not order
+        return sorted(json_default(v) if isinstance(v, (Decimal, Binary)) else v for v in obj)
+    if isinstance(obj, Binary):
+        return base64.b64encode(obj.value).decode()
+    raise TypeError(f"Not JSON serializable: {type(obj).__name__}")
+
+# Opaque signed cursor <-> DynamoDB key
+def encode_cursor(kind, key):
+    payload = base64.urlsafe_b64encode(
+        json.dumps({"k": kind, "v": key}, separators=(",", ":")).encode()
+    ).decode().rstrip("=")
+    sig = hmac.new(CURSOR_SECRET, payload.encode(), hashlib.sha256).hexdigest()[:32]
+    return f"{payload}.{sig}"
+
+def decode_cursor(cursor, kind):
+    try:
+        payload, sig = cursor.split(".", 1)
+        expected = hmac.new(CURSOR_SECRET, payload.encode(), hashlib.sha256).hexdigest()[:32]
+        if not hmac.compare_digest(sig, expected):
+            return None
+        data = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return data["v"] if data.get("k") == kind else None
+    except Exception:
+        return None
+
+def bad_request(message):
+    return {
+        "statusCode": 400,
+        "headers": {"Access-Control-Allow-Origin": "*"},
+        "body": json.dumps({"message": message})
+    }
+
 def handler(event, context):
     try:
         claims = event["requestContext"]["authorizer"]["jwt"]["claims"]
@@ -14,18 +63,73 @@ def handler(event, context):
             or claims.get("email")
         )
 
-        res = MENTIONS_TABLE.query(
-            KeyConditionExpression="pk = :pk",
-            ExpressionAttributeValues={
-                ":pk": f"USER#{username}"
-            },
-            ScanIndexForward=False
-        )
+        params = event.get("queryStringParameters") or {}
+
+        # ?limit / ?cursor → one page as {items, nextCursor}; neither → plain list
+        cursor = params.get("cursor")
+        paged = "limit" in params or cursor is not None
+        try:
+            limit = int(params.get("limit", MAX_PAGE_SIZE))
+        except ValueError:
+            limit = 0
+        if paged and not 0 < limit <= MAX_PAGE_SIZE:
+            return bad_request(f"limit must be 1-{MAX_PAGE_SIZE}")
+
+        view = "unread" if params.get("status") == "unread" else "all"
+
+        if view == "unread":
+            # sparse index: holds UNREAD mentions only
+            query_kwargs = {
+                "IndexName": UNREAD_MENTIONS_INDEX,
+                "KeyConditionExpression": "unreadPk = :pk",
+                "ExpressionAttributeValues": {
+                    ":pk": f"USER#{username}"
+                },
+                "ScanIndexForward": False
+            }
+        else:
+            query_kwargs = {
+                "KeyConditionExpression": "pk = :pk AND begins_with(sk, :m)",
+                "ExpressionAttributeValues": {
+                    ":pk": f"USER#{username}",
+                    ":m": "MENTION#"  # skips the UNREAD_COUNT item
+                },
+                "ScanIndexForward": False
+            }
+
+        if not paged:
+            res = MENTIONS_TABLE.query(**query_kwargs)
+            return {
+                "statusCode": 200,
+                "headers": {"Access-Control-Allow-Origin": "*"},
+                "body": json.dumps(res.get("Items", []), default=json_default)
+            }
+
+        cursor_kind = f"{username}:{view}"
+        if cursor:
+            start_key = decode_cursor(cursor, cursor_kind)
+            if start_key is None:
+                return bad_request("Invalid cursor")
+            query_kwargs["ExclusiveStartKey"] = start_key
+
+        items = []
+        while True:
+            query_kwargs["Limit"] = limit - len(items)
+            res = MENTIONS_TABLE.query(**query_kwargs)
+            items.extend(res.get("Items", []))
+
+            last_key = res.get("LastEvaluatedKey")
+            if not last_key or len(items) >= limit:
+                break
+            query_kwargs["ExclusiveStartKey"] = last_key
 
         return {
             "statusCode": 200,
             "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps(res.get("Items", []))
+            "body": json.dumps({
+                "items": items,
+                "nextCursor": encode_cursor(cursor_kind, last_key) if last_key else None
+            }, default=json_default)
         }
 
     except Exception as e:
@@ -0,0 +1,163 @@
+import json
+import os
+import time
+import boto3
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from boto3.dynamodb.conditions import Key
+
+dynamodb = boto3.resource("dynamodb")
+MENTIONS_TABLE = os.environ["MENTIONS_TABLE"]
+
+# Sparse GSI on MENTIONS_TABLE: partition key unreadPk, sort key sk.
+# unreadPk is only present while a mention is UNREAD.
+UNREAD_MENTIONS_INDEX = os.environ.get("UNREAD_MENTIONS_INDEX", "UnreadMentionsIndex")
+
+# per-user unread counter item (pk=USER#<username>), read by mentions/unread-count.py
+UNREAD_COUNT_SK = "UNREAD_COUNT"
+
+# Read mentions expire (TTL on expiresAt) so the USER# partition stays small
+READ_MENTION_TTL_DAYS = int(os.environ.get("READ_MENTION_TTL_DAYS", "30"))
+
+MAX_SELECTED = 500
+CHUNK_SIZE = 99  # + the counter update = TransactWriteItems limit of 100
+BATCH_MAX_RETRIES = 8
+
+TransactionCanceled = dynamodb.meta.client.exceptions.TransactionCanceledException
+
+CORS_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*"
+}
+
+# =========================
+# POST /mentions/read
+#   {"all": true}        → every UNREAD mention (paged from the sparse index)
+#   {"sks": [...]}       → just these mentions
+# Each chunk is one transaction: ≤99 conditional UNREAD → READ updates plus one
+# counter decrement for exactly the mentions that changed.
+# =========================
+
+# =========================
+# Helper: mark one chunk; mentions already READ are dropped and the rest retried
+# =========================
+def mark_chunk(username, sks, now):
+    pk = f"USER#{username}"
+    expires_at = int(time.time()) + READ_MENTION_TTL_DAYS * 86400
+    attempt = 0
+
+    while sks:
+        items = [
+            {
+                "Update": {
+                    "TableName": MENTIONS_TABLE,
+                    "Key": {"pk": pk, "sk": sk},
+                    "UpdateExpression": "SET #s = :r, readAt = :t, expiresAt = :exp REMOVE unreadPk",
+                    "ConditionExpression": "#s = :u",
+                    "ExpressionAttributeNames": {"#s": "status"},
+                    "ExpressionAttributeValues": {":r": "READ", ":u": "UNREAD", ":t": now, ":exp": expires_at}
+                }
+            }
+            for sk in sks
+        ]
+        items.append({
+            "Update": {
+                "TableName": MENTIONS_TABLE,
+                "Key": {"pk": pk, "sk": UNREAD_COUNT_SK},
+                "UpdateExpression": "ADD unreadCount :dec",
+                "ExpressionAttributeValues": {":dec": -len(sks)}
+            }
+        })
+
+        try:
+            dynamodb.meta.client.transact_write_items(TransactItems=items)
+            return len(sks)
+        except TransactionCanceled as e:
+            reasons = e.response.get("CancellationReasons", [])
+            stale = {
+                i for i, r in enumerate(reasons[:len(sks)])
+                if r.get("Code") == "ConditionalCheckFailed"
+            }
+            if stale:
+                sks = [sk for i, sk in enumerate(sks) if i not in stale]
+                continue
+            # conflict / throttling → back off and retry the same chunk
+            if attempt >= BATCH_MAX_RETRIES:
+                raise
+            time.sleep(min(0.05 * (2 ** attempt), 1))
+            attempt += 1
+
+    return 0
+
+
+def handler(event, context):
+    try:
+        claims = event["requestContext"]["authorizer"]["jwt"]["claims"]
+        username = (
+            claims.get("cognito:username")
+            or claims.get("username")
+            or claims.get("email")
+        )
+
+        body = json.loads(event.get("body") or "{}")
+        sks = list(dict.fromkeys(body.get("sks") or []))
+        mark_all = body.get("all") is True
+
+        if mark_all == bool(sks) or len(sks) > MAX_SELECTED:
+            return {
+                "statusCode": 400,
+                "headers": CORS_HEADERS,
+                "body": json.dumps({
+                    "message": f'Send either {{"all": true}} or 1-{MAX_SELECTED} mention sks'
+                })
+            }
+        if any(not isinstance(sk, str) or not sk.startswith("MENTION#") for sk in sks):
+            return {
+                "statusCode": 400,
+                "headers": CORS_HEADERS,
+                "body": json.dumps({"message": "Invalid mention sk"})
+            }
+
+        now = datetime.utcnow().isoformat()
+        marked = 0
+
+        if sks:
+            for i in range(0, len(sks), CHUNK_SIZE):
+                marked += mark_chunk(username, sks[i:i + CHUNK_SIZE], now)
+        else:
+            # the next index page is read while the previous chunk is written;
+            # writes stay serial because every chunk updates the same counter item
+            query_kwargs = {
+                "TableName": MENTIONS_TABLE,
+                "IndexName": UNREAD_MENTIONS_INDEX,
+                "KeyConditionExpression": Key("unreadPk").eq(f"USER#{username}"),
+                "ProjectionExpression": "sk",
+                "Limit": CHUNK_SIZE
+            }
+            futures = []
+            with ThreadPoolExecutor(max_workers=1) as writer:
+                while True:
+                    resp = dynamodb.meta.client.query(**query_kwargs)
+                    page = [m["sk"] for m in resp.get("Items", [])]
+                    if page:
+                        futures.append(writer.submit(mark_chunk, username, page, now))
+
+                    if "LastEvaluatedKey" not in resp:
+                        break
+                    query_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+                marked = sum(f.result() for f in futures)
+
+        return {
+            "statusCode": 200,
+            "headers": CORS_HEADERS,
+            "body": json.dumps({"message": "Marked as read", "marked": marked})
+        }
+
+    except Exception as e:
+        print("MARK MENTIONS READ ERROR:", str(e))
+        return {
+            "statusCode": 500,
+            "headers": CORS_HEADERS,
+            "body": json.dumps({"message": "Internal server error"})
+        }
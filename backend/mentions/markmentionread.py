@@ -1,11 +1,20 @@
 import json
 import os
+import time
 import boto3
 from datetime import datetime
 
 dynamodb = boto3.resource("dynamodb")
 MENTIONS_TABLE = dynamodb.Table(os.environ["MENTIONS_TABLE"])
 
+# per-user unread counter item (pk=USER#<username>), read by mentions/unread-count.py
+UNREAD_COUNT_SK = "UNREAD_COUNT"
+
+# Read mentions expire (TTL on expiresAt) so the USER# partition stays small
+READ_MENTION_TTL_DAYS = int(os.environ.get("READ_MENTION_TTL_DAYS", "30"))
+
+TransactionCanceled = dynamodb.meta.client.exceptions.TransactionCanceledException
+
 def handler(event, context):
     try:
         claims = event["requestContext"]["authorizer"]["jwt"]["claims"]
@@ -17,20 +26,48 @@ def handler(event, context):
 
         mention_sk = event["pathParameters"]["sk"]
 
-        MENTIONS_TABLE.update_item(
-            Key={
-                "pk": f"USER#{username}",
-                "sk": mention_sk
-            },
-            UpdateExpression="SET #s = :r, readAt = :t",
-            ExpressionAttributeNames={
-                "#s": "status"
-            },
-            ExpressionAttributeValues={
-                ":r": "READ",
-                ":t": datetime.utcnow().isoformat()
-            }
-        )
+        # READ + counter decrement together, only on an actual UNREAD → READ change
+        try:
+            dynamodb.meta.client.transact_write_items(
+                TransactItems=[
+                    {
+                        "Update": {
+                            "TableName": MENTIONS_TABLE.name,
+                            "Key": {
+                                "pk": f"USER#{username}",
+                                "sk": mention_sk
+                            },
+                            "UpdateExpression": "SET #s = :r, readAt = :t, expiresAt = :exp REMOVE unreadPk",
+                            "ConditionExpression": "#s = :u",
+                            "ExpressionAttributeNames": {
+                                "#s": "status"
+                            },
+                            "ExpressionAttributeValues": {
+                                ":r": "READ",
+                                ":u": "UNREAD",
+                                ":t": datetime.utcnow().isoformat(),
+                                ":exp": int(time.time()) + READ_MENTION_TTL_DAYS * 86400
+                            }
+                        }
+                    },
+                    {
+                        "Update": {
+                            "TableName": MENTIONS_TABLE.name,
+                            "Key": {
+                                "pk": f"USER#{username}",
+                                "sk": UNREAD_COUNT_SK
+                            },
+                            "UpdateExpression": "ADD unreadCount :dec",
+                            "ExpressionAttributeValues": {":dec": -1}
+                        }
+                    }
+                ]
+            )
+        except TransactionCanceled as e:
+            reasons = e.response.get("CancellationReasons", [])
+            if not reasons or reasons[0].get("Code") != "ConditionalCheckFailed":
+                raise
+            # already read (or gone): nothing to change
 
         return {
             "statusCode": 200,
@@ -44,4 +81,4 @@ def handler(event, context):
             "statusCode": 500,
             "headers": {"Access-Control-Allow-Origin": "*"},
             "body": json.dumps({"message": "Internal server error"})
-        }
\ No newline at end of file
+        }
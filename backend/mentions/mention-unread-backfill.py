@@ -0,0 +1,77 @@
+import os
+import time
+import boto3
+
+dynamodb = boto3.resource("dynamodb")
+MENTIONS_TABLE = dynamodb.Table(os.environ["MENTIONS_TABLE"])
+
+# per-user unread counter item (pk=USER#<username>), read by mentions/unread-count.py
+UNREAD_COUNT_SK = "UNREAD_COUNT"
+
+# Read mentions expire (TTL on expiresAt) so the USER# partition stays small
+READ_MENTION_TTL_DAYS = int(os.environ.get("READ_MENTION_TTL_DAYS", "30"))
+
+
+# One-off: sets unreadPk (UnreadMentionsIndex) on UNREAD mentions and expiresAt
+# on READ mentions written before those existed, then resets every user's unread
+# counter to the scanned count.
+# Safe to re-run; run it while no mentions are being written or read.
+def handler(event, context):
+    scan_kwargs = {
+        "FilterExpression": "begins_with(sk, :m)",
+        "ExpressionAttributeNames": {"#s": "status"},
+        "ExpressionAttributeValues": {":m": "MENTION#"},
+        "ProjectionExpression": "pk, sk, #s, unreadPk, expiresAt"
+    }
+    read_expires_at = int(time.time()) + READ_MENTION_TTL_DAYS * 86400
+    counts = {}
+    indexed = 0
+    expiring = 0
+
+    while True:
+        resp = MENTIONS_TABLE.scan(**scan_kwargs)
+
+        for m in resp.get("Items", []):
+            key = {"pk": m["pk"], "sk": m["sk"]}
+            if m.get("status") == "UNREAD":
+                counts[m["pk"]] = counts.get(m["pk"], 0) + 1
+                if "unreadPk" not in m:
+                    MENTIONS_TABLE.update_item(
+                        Key=key,
+                        UpdateExpression="SET unreadPk = :pk",
+                        ExpressionAttributeValues={":pk": m["pk"]}
+                    )
+                    indexed += 1
+            elif "expiresAt" not in m:
+                MENTIONS_TABLE.update_item(
+                    Key=key,
+                    UpdateExpression="SET expiresAt = :exp",
+                    ExpressionAttributeValues={":exp": read_expires_at}
+                )
+                expiring += 1
+
+        if "LastEvaluatedKey" not in resp:
+            break
+        scan_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+    # users whose counter exists but who have nothing unread left go back to 0
+    counter_kwargs = {
+        "FilterExpression": "sk = :c",
+        "ExpressionAttributeValues": {":c": UNREAD_COUNT_SK},
+        "ProjectionExpression": "pk"
+    }
+    while True:
+        resp = MENTIONS_TABLE.scan(**counter_kwargs)
+        for c in resp.get("Items", []):
+            counts.setdefault(c["pk"], 0)
+
+        if "LastEvaluatedKey" not in resp:
+            break
+        counter_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+    with MENTIONS_TABLE.batch_writer() as batch:
+        for pk, n in counts.items():
+            batch.put_item(Item={"pk": pk, "sk": UNREAD_COUNT_SK, "unreadCount": n})
+
+    print("BACKFILL DONE:", indexed, "mentions indexed,", expiring, "read mentions expiring,", len(counts), "counters")
+    return {"indexed": indexed, "expiring": expiring, "counters": len(counts)}
@@ -0,0 +1,188 @@
+import os
+import sys
+import json
+import uuid
+import argparse
+import importlib.util
+from collections import deque
+from datetime import datetime
+
+# =========================
+# Local run of mention-worker.py behind an in-memory SQS stand-in.
+#
+# InMemoryQueue keeps SQS semantics that matter to the worker: messages are
+# received in batches, ones named in batchItemFailures come back (receive
+# count +1) and land in the DLQ after max_receives. --fail-first injects a
+# failure on the first delivery of every message so redelivery is exercised.
+#
+# Tables live in DynamoDB Local (created here if missing):
+#   docker run -p 8000:8000 amazon/dynamodb-local
+#   AWS_ENDPOINT_URL_DYNAMODB=http://localhost:8000 \
+#       python mention-worker-local.py --mention alice --mention bob --duplicate --fail-first
+# =========================
+
+
+class InMemoryQueue:
+    def __init__(self, max_receives=3):
+        self.messages = deque()
+        self.dlq = []
+        self.max_receives = max_receives
+
+    def send(self, body):
+        self.messages.append({"messageId": str(uuid.uuid4()), "body": json.dumps(body), "receives": 0})
+
+    def receive(self, batch_size=10):
+        batch = []
+        while self.messages and len(batch) < batch_size:
+            msg = self.messages.popleft()
+            msg["receives"] += 1
+            batch.append(msg)
+        return batch
+
+    # SQS event source mapping: failed items are made visible again, the rest deleted
+    def settle(self, batch, response):
+        failed = {f["itemIdentifier"] for f in response.get("batchItemFailures", [])}
+        for msg in batch:
+            if msg["messageId"] not in failed:
+                continue
+            if msg["receives"] >= self.max_receives:
+                self.dlq.append(msg)
+            else:
+                self.messages.append(msg)
+
+
+def load_worker(users):
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "local")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "local")
+    os.environ.setdefault("TASK_TABLE", "local-tasks")
+    os.environ.setdefault("MENTIONS_TABLE", "local-mentions")
+    os.environ.setdefault("USER_POOL_ID", "local")
+    os.environ.pop("USER_DIRECTORY_TABLE", None)
+
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mention-worker.py")
+    spec = importlib.util.spec_from_file_location("mention_worker", path)
+    worker = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(worker)
+
+    # Cognito stand-in: username → sub from the command line
+    worker.get_user_sub = users.get
+    return worker
+
+
+def ensure_table(dynamodb, name):
+    if name in dynamodb.meta.client.list_tables()["TableNames"]:
+        return
+    dynamodb.create_table(
+        TableName=name,
+        KeySchema=[{"AttributeName": "pk", "KeyType": "HASH"},
+                   {"AttributeName": "sk", "KeyType": "RANGE"}],
+        AttributeDefinitions=[{"AttributeName": "pk", "AttributeType": "S"},
+                              {"AttributeName": "sk", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST"
+    ).wait_until_exists()
+
+
+def seed_task(worker, owner_sub):
+    task_id = str(uuid.uuid4())
+    now = datetime.utcnow().isoformat()
+    worker.TASK_TABLE.put_item(Item={
+        "pk": f"TASK#{task_id}",
+        "sk": "META",
+        "taskId": task_id,
+        "title": "Local mention run",
+        "status": "todo",
+        "priority": "medium",
+        "category": "general",
+        "ownerId": owner_sub,
+        "participants": [{"userId": owner_sub, "userName": "owner"}],
+        "participantIds": [owner_sub],
+        "updatedAt": now,
+        "version": 1
+    })
+    return task_id, now
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run mention-worker.py against an in-memory queue")
+    parser.add_argument("--mention", action="append", default=[], help="username to mention (repeatable)")
+    parser.add_argument("--comments", type=int, default=1)
+    parser.add_argument("--duplicate", action="store_true", help="enqueue every event twice")
+    parser.add_argument("--fail-first", action="store_true", help="fail each message's first delivery")
+    parser.add_argument("--batch-size", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    mentioned = args.mention or ["alice", "bob"]
+    users = {u: f"sub-{u}" for u in mentioned}
+    worker = load_worker(users)
+
+    for table in (worker.TASK_TABLE, worker.MENTIONS_TABLE):
+        ensure_table(worker.dynamodb, table.name)
+    task_id, created = seed_task(worker, "sub-owner")
+
+    queue = InMemoryQueue()
+    for _ in range(args.comments):
+        event = {
+            "type": "COMMENT_MENTIONS",
+            "taskId": task_id,
+            "commentId": str(uuid.uuid4()),
+            "comment": " ".join(f"@{u}" for u in mentioned),
+            "mentionedBy": "owner",
+            "createdAt": created,
+            "usernames": mentioned
+        }
+        queue.send(event)
+        if args.duplicate:
+            queue.send(event)
+
+    # fault injection: first delivery of each message raises inside deliver()
+    deliver, seen = worker.deliver, set()
+
+    def flaky_deliver(evt, subs):
+        key = json.dumps(evt, sort_keys=True)
+        if args.fail_first and key not in seen:
+            seen.add(key)
+            raise RuntimeError("injected failure")
+        deliver(evt, subs)
+
+    worker.deliver = flaky_deliver
+
+    invocations = 0
+    while queue.messages:
+        batch = queue.receive(args.batch_size)
+        response = worker.handler({"Records": batch}, None)
+        queue.settle(batch, response)
+        invocations += 1
+
+    # ===== what a client would see =====
+    task = worker.TASK_TABLE.get_item(Key={"pk": f"TASK#{task_id}", "sk": "META"}, ConsistentRead=True)["Item"]
+    members = worker.TASK_TABLE.query(
+        KeyConditionExpression="pk = :pk AND begins_with(sk, :m)",
+        ExpressionAttributeValues={":pk": f"TASK#{task_id}", ":m": "MEMBER#"},
+        ConsistentRead=True
+    )["Items"]
+
+    print(f"{invocations} invocations, {len(queue.dlq)} in DLQ")
+    print("participantIds:", task["participantIds"])
+    print("memberships   :", sorted(m["memberId"] for m in members))
+
+    ok = len(task["participantIds"]) == len(set(task["participantIds"])) and not queue.dlq
+    for u in mentioned:
+        mentions = worker.MENTIONS_TABLE.query(
+            KeyConditionExpression="pk = :pk AND begins_with(sk, :m)",
+            ExpressionAttributeValues={":pk": f"USER#{u}", ":m": "MENTION#"},
+            ConsistentRead=True
+        )["Items"]
+        counter = worker.MENTIONS_TABLE.get_item(
+            Key={"pk": f"USER#{u}", "sk": worker.UNREAD_COUNT_SK}, ConsistentRead=True
+        ).get("Item", {}).get("unreadCount", 0)
+        task_mentions = sum(1 for m in mentions if m["taskId"] == task_id)
+        print(f"{u}: {task_mentions} mentions for this task, unreadCount {counter}")
+        ok = ok and task_mentions == args.comments
+
+    print("OK" if ok else "MISMATCH")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,351 @@
+import json
+import os
+import time
+import boto3
+from collections import OrderedDict
+from datetime import datetime
+
+dynamodb = boto3.resource("dynamodb")
+cognito = boto3.client("cognito-idp")
+
+TASK_TABLE = dynamodb.Table(os.environ["TASK_TABLE"])
+MENTIONS_TABLE = dynamodb.Table(os.environ["MENTIONS_TABLE"])
+
+USER_POOL_ID = os.environ["USER_POOL_ID"]
+
+# username → sub cache (lives as long as the container)
+USER_DIRECTORY_TABLE = os.environ.get("USER_DIRECTORY_TABLE")
+SUB_CACHE_TTL = int(os.environ.get("SUB_CACHE_TTL", "300"))
+SUB_CACHE_NEGATIVE_TTL = int(os.environ.get("SUB_CACHE_NEGATIVE_TTL", "30"))
+SUB_CACHE_SIZE = 1024
+_sub_cache = OrderedDict()
+
+# per-user unread counter item (pk=USER#<username>), read by mentions/unread-count.py
+UNREAD_COUNT_SK = "UNREAD_COUNT"
+
+ALL_MEMBERS = "ALL"  # admin membership partition
+
+# =========================
+# Mention fan-out worker (SQS trigger, batch item failures enabled)
+# Events come from add-commnets.py. Redelivery is safe:
+#   - mentions are written (with their unread counter bump) only for keys that
+#     do not exist yet; a racing duplicate cancels the transaction → retried
+#   - participants are appended only for subs not already in participantIds, in the
+#     same transaction as their MEMBER# items (a failure leaves neither behind)
+# =========================
+
+# =========================
+# Helper: username → sub (Cognito lookup)
+# (this and the resolver below: one copy per handler,
+#  kept identical by shared-helpers-check.py)
+# =========================
+def get_user_sub(username):
+    resp = cognito.list_users(
+        UserPoolId=USER_POOL_ID,
+        Filter=f'username = "{username}"'
+    )
+    users = resp.get("Users", [])
+    if not users:
+        return None
+
+    for attr in users[0]["Attributes"]:
+        if attr["Name"] == "sub":
+            return attr["Value"]
+    return None
+
+
+# =========================
+# Helper: batched username → sub resolver
+# per-container LRU with TTL, "not found" cached briefly,
+# user directory table first, Cognito only for what is left
+# =========================
+def directory_user_subs(usernames):
+    found = {}
+    if not USER_DIRECTORY_TABLE:
+        return found
+
+    names = list(usernames)
+    for i in range(0, len(names), 100):
+        request = {
+            USER_DIRECTORY_TABLE: {
+                "Keys": [{"pk": f"USER#{u}", "sk": "PROFILE"} for u in names[i:i + 100]],
+                "ProjectionExpression": "username, #s",
+                "ExpressionAttributeNames": {"#s": "sub"}
+            }
+        }
+        attempt = 0
+
+        while request:
+            resp = dynamodb.batch_get_item(RequestItems=request)
+            for item in resp.get("Responses", {}).get(USER_DIRECTORY_TABLE, []):
+                found[item["username"]] = item["sub"]
+
+            request = resp.get("UnprocessedKeys") or None
+            if request:
+                time.sleep(min(0.05 * (2 ** attempt), 1))
+                attempt += 1
+
+    return found
+
+
+def resolve_user_subs(usernames):
+    now = time.time()
+    result = {}
+    misses = []
+
+    for u in set(usernames):
+        hit = _sub_cache.get(u)
+        if hit and hit[1] > now:
+            _sub_cache.move_to_end(u)
+            result[u] = hit[0]
+        else:
+            misses.append(u)
+
+    if misses:
+        found = directory_user_subs(misses)
+
+        for u in misses:
+            sub = found.get(u)
+            if sub is None:
+                sub = get_user_sub(u)
+                # write-through so the next container finds it in the directory
+                if sub and USER_DIRECTORY_TABLE:
+                    dynamodb.Table(USER_DIRECTORY_TABLE).put_item(
+                        Item={"pk": f"USER#{u}", "sk": "PROFILE", "username": u, "sub": sub}
+                    )
+
+            ttl = SUB_CACHE_TTL if sub else SUB_CACHE_NEGATIVE_TTL
+            _sub_cache[u] = (sub, now + ttl)
+            _sub_cache.move_to_end(u)
+            result[u] = sub
+
+        while len(_sub_cache) > SUB_CACHE_SIZE:
+            _sub_cache.popitem(last=False)
+
+    return result
+
+# =========================
+# Helper: membership item (feeds MemberIndex + filter GSIs)
+# (one copy per handler, kept identical by shared-helpers-check.py)
+# =========================
+def membership_item(task, member_id, now):
+    status = task.get("status", "todo")
+    priority = task.get("priority", "medium")
+    category = task.get("category", "general")
+    return {
+        "pk": f"TASK#{task['taskId']}",
+        "sk": f"MEMBER#{member_id}",
+        "taskId": task["taskId"],
+        "memberId": member_id,
+        "updatedAt": now,
+        "status": status,
+        "priority": priority,
+        "category": category,
+        # composite partition keys for the filter GSIs
+        "memberStatus": f"{member_id}#STATUS#{status}",
+        "memberPriority": f"{member_id}#PRIORITY#{priority}",
+        "memberCategory": f"{member_id}#CATEGORY#{category}",
+        "memberStatusPriority": f"{member_id}#STATUS#{status}#PRIORITY#{priority}"
+    }
+
+
+
+# =========================
+# Helper: which mention keys already exist (BatchGetItem, 100 keys per call)
+# =========================
+def existing_mention_keys(keys):
+    found = set()
+
+    for i in range(0, len(keys), 100):
+        request = {
+            MENTIONS_TABLE.name: {
+                "Keys": keys[i:i + 100],
+                "ProjectionExpression": "pk, sk"
+            }
+        }
+        attempt = 0
+
+        while request:
+            resp = dynamodb.batch_get_item(RequestItems=request)
+            for item in resp.get("Responses", {}).get(MENTIONS_TABLE.name, []):
+                found.add((item["pk"], item["sk"]))
+
+            request = resp.get("UnprocessedKeys") or None
+            if request:
+                time.sleep(min(0.05 * (2 ** attempt), 1))
+                attempt += 1
+
+    return found
+
+
+# =========================
+# Helper: mention puts + unread counter bumps, atomically
+# (≤50 mentions per TransactWriteItems: one put and one ADD each)
+# =========================
+def write_mentions(mentions):
+    for i in range(0, len(mentions), 50):
+        transact_items = []
+        for m in mentions[i:i + 50]:
+            transact_items.append({
+                "Put": {
+                    "TableName": MENTIONS_TABLE.name,
+                    "Item": m,
+                    "ConditionExpression": "attribute_not_exists(sk)"
+                }
+            })
+            transact_items.append({
+                "Update": {
+                    "TableName": MENTIONS_TABLE.name,
+                    "Key": {"pk": m["pk"], "sk": UNREAD_COUNT_SK},
+                    "UpdateExpression": "ADD unreadCount :one",
+                    "ExpressionAttributeValues": {":one": 1}
+                }
+            })
+        dynamodb.meta.client.transact_write_items(TransactItems=transact_items)
+
+
+# =========================
+# Deliver one mention event
+# =========================
+def deliver(evt, subs):
+    task_id = evt["taskId"]
+    now = datetime.utcnow().isoformat()
+
+    task = TASK_TABLE.get_item(
+        Key={"pk": f"TASK#{task_id}", "sk": "META"},
+        ProjectionExpression="taskId, title, #s, priority, category, participantIds",
+        ExpressionAttributeNames={"#s": "status"},
+        ConsistentRead=True
+    ).get("Item")
+    if not task:
+        return  # task deleted since the comment was written
+
+    targets = [(u, subs[u]) for u in evt["usernames"] if subs.get(u)]
+    if not targets:
+        return
+
+    # Mentions (idempotent: key is fixed per comment + user, existing ones skipped)
+    mentions = {
+        u: {
+            "pk": f"USER#{u}",
+            "sk": f"MENTION#{evt['createdAt']}#{evt['commentId']}",
+            "taskId": task_id,
+            "taskTitle": evt.get("taskTitle") or task.get("title", "Untitled Task"),
+            "commentId": evt["commentId"],
+            "comment": evt["comment"],
+            "mentionedBy": evt["mentionedBy"],
+            "createdAt": evt["createdAt"],
+            "status": "UNREAD",
+            "unreadPk": f"USER#{u}"  # sparse UnreadMentionsIndex key, removed on read
+        }
+        for u, _ in targets
+    }
+    existing = existing_mention_keys([{"pk": m["pk"], "sk": m["sk"]} for m in mentions.values()])
+
+    new_mentions = [m for m in mentions.values() if (m["pk"], m["sk"]) not in existing]
+    write_mentions(new_mentions)
+
+    # Share task: META append + every MEMBER# item in ONE transaction
+    # (skipped once all targets are in, so a redelivery never half-applies)
+    participant_ids = task.get("participantIds", [])
+    new_members = [(u, sub) for u, sub in targets if sub not in participant_ids]
+    if not new_members:
+        return
+
+    values = {
+        ":p0": [],
+        ":p1": [{"userId": sub, "userName": u} for u, sub in new_members],
+        ":i0": [],
+        ":i1": [sub for _, sub in new_members],
+        ":one": 1,
+        ":t": now
+    }
+    names = {"#v": "version"}
+    guards = ["attribute_exists(pk)"]
+
+    # idempotency: only subs not yet in participantIds (a racing share cancels)
+    for i, (_, sub) in enumerate(new_members):
+        values[f":s{i}"] = sub
+        guards.append(f"NOT contains(participantIds, :s{i})")
+
+    # the membership items copy status / priority / category from the META read:
+    # guard on those (not updatedAt, which every comment bumps) so a concurrent
+    # task update cancels the transaction → message retried, re-reads META
+    for field in ("status", "priority", "category"):
+        names[f"#{field}"] = field
+        if field in task:
+            values[f":{field}"] = task[field]
+            guards.append(f"#{field} = :{field}")
+        else:
+            guards.append(f"attribute_not_exists(#{field})")
+
+    transact_items = [{
+        "Update": {
+            "TableName": TASK_TABLE.name,
+            "Key": {
+                "pk": f"TASK#{task_id}",
+                "sk": "META"
+            },
+            "UpdateExpression": """
+                SET participants = list_append(
+                        if_not_exists(participants, :p0),
+                        :p1
+                    ),
+                    participantIds = list_append(
+                        if_not_exists(participantIds, :i0),
+                        :i1
+                    ),
+                    updatedAt = :t
+                ADD #v :one
+            """,
+            "ConditionExpression": " AND ".join(guards),
+            "ExpressionAttributeNames": names,
+            "ExpressionAttributeValues": values
+        }
+    }]
+
+    # Membership (feeds MemberIndex for GET /tasks): new members first, then
+    # every existing participant + ALL so their delta sync sees the change
+    member_ids = list(dict.fromkeys([sub for _, sub in new_members] + [ALL_MEMBERS] + participant_ids))
+    memberships = [membership_item(task, m, now) for m in member_ids]
+
+    transact_items += [
+        {"Put": {"TableName": TASK_TABLE.name, "Item": it}} for it in memberships[:99]
+    ]
+    dynamodb.meta.client.transact_write_items(TransactItems=transact_items)
+
+    # very large tasks: refresh the remaining participants outside the transaction
+    if len(memberships) > 99:
+        with TASK_TABLE.batch_writer() as batch:
+            for it in memberships[99:]:
+                batch.put_item(Item=it)
+
+
+# =========================
+# Process a batch of events; returns indexes that failed
+# =========================
+def process_events(events):
+    # one resolver pass for every username in the batch
+    subs = resolve_user_subs({u for evt in events for u in evt["usernames"]})
+
+    failed = []
+    for i, evt in enumerate(events):
+        try:
+            deliver(evt, subs)
+        except Exception as e:
+            print("MENTION WORKER ERROR:", evt.get("commentId"), str(e))
+            failed.append(i)
+    return failed
+
+
+def handler(event, context):
+    records = event.get("Records", [])
+    events = [json.loads(r["body"]) for r in records]
+
+    failed = process_events(events)
+
+    return {
+        "batchItemFailures": [
+            {"itemIdentifier": records[i]["messageId"]} for i in failed
+        ]
+    }
@@ -0,0 +1,40 @@
+import json
+import os
+import boto3
+
+dynamodb = boto3.resource("dynamodb")
+MENTIONS_TABLE = dynamodb.Table(os.environ["MENTIONS_TABLE"])
+
+# per-user unread counter item (pk=USER#<username>), maintained by every mention
+# writer and by markmentionread.py
+UNREAD_COUNT_SK = "UNREAD_COUNT"
+
+def handler(event, context):
+    try:
+        claims = event["requestContext"]["authorizer"]["jwt"]["claims"]
+        username = (
+            claims.get("cognito:username")
+            or claims.get("username")
+            or claims.get("email")
+        )
+
+        item = MENTIONS_TABLE.get_item(
+            Key={
+                "pk": f"USER#{username}",
+                "sk": UNREAD_COUNT_SK
+            }
+        ).get("Item", {})
+
+        return {
+            "statusCode": 200,
+            "headers": {"Access-Control-Allow-Origin": "*"},
+            "body": json.dumps({"unread": int(item.get("unreadCount", 0))})
+        }
+
+    except Exception as e:
+        print("UNREAD COUNT ERROR:", str(e))
+        return {
+            "statusCode": 500,
+            "headers": {"Access-Control-Allow-Origin": "*"},
+            "body": json.dumps({"message": "Internal server error"})
+        }
@@ -0,0 +1,196 @@
+import os
+import re
+import boto3
+from boto3.dynamodb.types import TypeDeserializer
+from boto3.dynamodb.conditions import Key
+
+dynamodb = boto3.resource("dynamodb")
+SEARCH_TABLE = dynamodb.Table(os.environ["SEARCH_TABLE"])
+
+deserializer = TypeDeserializer()
+
+# =========================
+# Search index worker (DynamoDB Streams trigger on TASK_TABLE + COMMENTS_TABLE,
+# view type NEW_AND_OLD_IMAGES, batch item failures enabled)
+#
+# Postings are kept per member, so a search only reads the caller's tasks:
+#   pk = TERM#<memberId>#<first 2 chars of term>   sk = <term>#<taskId>#<source>   w = weight
+#   memberId = participant sub, or ALL (admins; fed by the MEMBER#ALL items)
+#   source = META (title + description) or COMMENT#<commentId>
+#
+# Per task, what is indexed and for whom:
+#   pk = DOC#<taskId>   sk = SOURCE#<source>   terms = {term: weight}
+#   pk = DOC#<taskId>   sk = MEMBER#<memberId>          (from MEMBER# stream records)
+#
+# A source change writes its SOURCE# item, then fans out to the current members;
+# a membership change writes its MEMBER# item, then fans out every source.
+# Both write before they read (consistently), so a racing pair is never missed.
+# Replaying a record rewrites the same items.
+# =========================
+
+# tokenizer + document / posting helpers are copied into search/search-reindex.py
+# (and the tokenizer into search/search-tasks.py), kept identical by shared-helpers-check.py
+TOKEN_REGEX = r"[a-z0-9]+"
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 40
+STOPWORDS = {"an", "and", "are", "as", "at", "be", "by", "for", "in", "is", "it",
+             "of", "on", "or", "the", "to", "was", "with"}
+
+TITLE_WEIGHT = 3
+TEXT_WEIGHT = 1
+
+
+def terms(text, weight, into):
+    for t in re.findall(TOKEN_REGEX, (text or "").lower()):
+        if MIN_TERM_LENGTH <= len(t) <= MAX_TERM_LENGTH and t not in STOPWORDS:
+            into[t] = into.get(t, 0) + weight
+    return into
+
+
+def image(record, name):
+    raw = record["dynamodb"].get(name)
+    if not raw:
+        return None
+    return {k: deserializer.deserialize(v) for k, v in raw.items()}
+
+
+# =========================
+# Helper: one item image → (taskId, source, {term: weight})
+# =========================
+def document(item):
+    if not item:
+        return None, None, {}
+    sk = item.get("sk", "")
+
+    if sk == "META":
+        found = terms(item.get("title"), TITLE_WEIGHT, {})
+        terms(item.get("description"), TEXT_WEIGHT, found)
+        return item["taskId"], "META", found
+    if sk.startswith("COMMENT#"):
+        return item["taskId"], sk, terms(item.get("comment"), TEXT_WEIGHT, {})
+    return None, None, {}
+
+
+# =========================
+# Helper: MEMBER# item image → memberId (tombstones have none)
+# =========================
+def member(item):
+    if item and item.get("sk", "").startswith("MEMBER#") and item.get("memberId"):
+        return item["memberId"]
+    return None
+
+
+def posting_key(member_id, term, task_id, source):
+    return {
+        "pk": f"TERM#{member_id}#{term[:MIN_TERM_LENGTH]}",
+        "sk": f"{term}#{task_id}#{source}"
+    }
+
+
+def posting(member_id, term, task_id, source, weight):
+    return {**posting_key(member_id, term, task_id, source), "taskId": task_id, "w": weight}
+
+
+# =========================
+# Helper: DOC#<taskId> → ({source: {term: weight}}, {memberId})
+# =========================
+def task_doc(task_id):
+    sources, members = {}, set()
+    kwargs = {
+        "KeyConditionExpression": Key("pk").eq(f"DOC#{task_id}"),
+        "ConsistentRead": True
+    }
+    while True:
+        resp = SEARCH_TABLE.query(**kwargs)
+        for item in resp.get("Items", []):
+            if item["sk"].startswith("SOURCE#"):
+                sources[item["sk"][len("SOURCE#"):]] = item.get("terms", {})
+            elif item["sk"].startswith("MEMBER#"):
+                members.add(item["sk"][len("MEMBER#"):])
+
+        if "LastEvaluatedKey" not in resp:
+            break
+        kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+    return sources, members
+
+
+# =========================
+# Source (META / comment) changed → SOURCE# item, then every member's postings
+# =========================
+def index_document(task_id, source, old_terms, new_terms):
+    doc_key = {"pk": f"DOC#{task_id}", "sk": f"SOURCE#{source}"}
+    if new_terms:
+        SEARCH_TABLE.put_item(Item={**doc_key, "terms": new_terms})
+    else:
+        SEARCH_TABLE.delete_item(Key=doc_key)
+
+    _, members = task_doc(task_id)
+
+    with SEARCH_TABLE.batch_writer() as batch:
+        for member_id in members:
+            for term in old_terms.keys() - new_terms.keys():
+                batch.delete_item(Key=posting_key(member_id, term, task_id, source))
+            for term, weight in new_terms.items():
+                if old_terms.get(term) != weight:
+                    batch.put_item(Item=posting(member_id, term, task_id, source, weight))
+
+
+# =========================
+# Membership added / removed → MEMBER# item, then that member's postings for every source
+# =========================
+def index_membership(task_id, member_id, added):
+    doc_key = {"pk": f"DOC#{task_id}", "sk": f"MEMBER#{member_id}"}
+    if added:
+        SEARCH_TABLE.put_item(Item=doc_key)
+    else:
+        SEARCH_TABLE.delete_item(Key=doc_key)
+
+    sources, _ = task_doc(task_id)
+
+    with SEARCH_TABLE.batch_writer() as batch:
+        for source, found in sources.items():
+            for term, weight in found.items():
+                if added:
+                    batch.put_item(Item=posting(member_id, term, task_id, source, weight))
+                else:
+                    batch.delete_item(Key=posting_key(member_id, term, task_id, source))
+
+
+def index_record(record):
+    old, new = image(record, "OldImage"), image(record, "NewImage")
+
+    # membership: only adds / removes matter (updatedAt / status bumps do not)
+    old_member, new_member = member(old), member(new)
+    if old_member or new_member:
+        if old_member != new_member:
+            task_id = (new or old)["taskId"]
+            if old_member:
+                index_membership(task_id, old_member, False)
+            if new_member:
+                index_membership(task_id, new_member, True)
+        return
+
+    old_task, old_source, old_terms = document(old)
+    new_task, new_source, new_terms = document(new)
+    task_id = new_task or old_task
+    source = new_source or old_source
+    if not task_id or old_terms == new_terms:
+        return
+
+    index_document(task_id, source, old_terms, new_terms)
+
+
+def handler(event, context):
+    for record in event.get("Records", []):
+        try:
+            index_record(record)
+        except Exception as e:
+            print("SEARCH INDEX ERROR:", record["dynamodb"].get("SequenceNumber"), str(e))
+            return {
+                "batchItemFailures": [
+                    {"itemIdentifier": record["dynamodb"]["SequenceNumber"]}
+                ]
+            }
+
+    return {"batchItemFailures": []}
@@ -0,0 +1,176 @@
+import os
+import re
+import boto3
+from boto3.dynamodb.conditions import Key
+
+dynamodb = boto3.resource("dynamodb")
+SEARCH_TABLE = dynamodb.Table(os.environ["SEARCH_TABLE"])
+TASK_TABLE = dynamodb.Table(os.environ["TASK_TABLE"])
+COMMENTS_TABLE = dynamodb.Table(os.environ["COMMENTS_TABLE"])
+
+# Tokenizer, document and posting layout: copies of search/search-indexer.py,
+# kept identical by shared-helpers-check.py
+TOKEN_REGEX = r"[a-z0-9]+"
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 40
+STOPWORDS = {"an", "and", "are", "as", "at", "be", "by", "for", "in", "is", "it",
+             "of", "on", "or", "the", "to", "was", "with"}
+
+TITLE_WEIGHT = 3
+TEXT_WEIGHT = 1
+
+
+def terms(text, weight, into):
+    for t in re.findall(TOKEN_REGEX, (text or "").lower()):
+        if MIN_TERM_LENGTH <= len(t) <= MAX_TERM_LENGTH and t not in STOPWORDS:
+            into[t] = into.get(t, 0) + weight
+    return into
+
+
+def document(item):
+    if not item:
+        return None, None, {}
+    sk = item.get("sk", "")
+
+    if sk == "META":
+        found = terms(item.get("title"), TITLE_WEIGHT, {})
+        terms(item.get("description"), TEXT_WEIGHT, found)
+        return item["taskId"], "META", found
+    if sk.startswith("COMMENT#"):
+        return item["taskId"], sk, terms(item.get("comment"), TEXT_WEIGHT, {})
+    return None, None, {}
+
+
+def posting_key(member_id, term, task_id, source):
+    return {
+        "pk": f"TERM#{member_id}#{term[:MIN_TERM_LENGTH]}",
+        "sk": f"{term}#{task_id}#{source}"
+    }
+
+
+def posting(member_id, term, task_id, source, weight):
+    return {**posting_key(member_id, term, task_id, source), "taskId": task_id, "w": weight}
+
+
+def task_doc(task_id):
+    sources, members = {}, set()
+    kwargs = {
+        "KeyConditionExpression": Key("pk").eq(f"DOC#{task_id}"),
+        "ConsistentRead": True
+    }
+    while True:
+        resp = SEARCH_TABLE.query(**kwargs)
+        for item in resp.get("Items", []):
+            if item["sk"].startswith("SOURCE#"):
+                sources[item["sk"][len("SOURCE#"):]] = item.get("terms", {})
+            elif item["sk"].startswith("MEMBER#"):
+                members.add(item["sk"][len("MEMBER#"):])
+
+        if "LastEvaluatedKey" not in resp:
+            break
+        kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+    return sources, members
+
+
+def query_all(table, **query_kwargs):
+    while True:
+        resp = table.query(**query_kwargs)
+        yield from resp.get("Items", [])
+
+        if "LastEvaluatedKey" not in resp:
+            return
+        query_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+
+# =========================
+# Helper: one task's current sources + members (from TASK_TABLE / COMMENTS_TABLE)
+# =========================
+def current_doc(task):
+    _, _, found = document(task)
+    sources = {"META": found} if found else {}
+
+    for c in query_all(
+        COMMENTS_TABLE,
+        KeyConditionExpression=Key("pk").eq(task["pk"]) & Key("sk").begins_with("COMMENT#")
+    ):
+        _, source, found = document({**c, "taskId": task["taskId"]})
+        if found:
+            sources[source] = found
+
+    members = {
+        m["memberId"]
+        for m in query_all(
+            TASK_TABLE,
+            KeyConditionExpression=Key("pk").eq(task["pk"]) & Key("sk").begins_with("MEMBER#"),
+            ProjectionExpression="memberId"
+        )
+        if m.get("memberId")  # tombstones have none
+    }
+    return sources, members
+
+
+# =========================
+# Helper: indexed doc → current doc (postings, SOURCE# and MEMBER# items)
+# =========================
+def reindex_task(task):
+    task_id = task["taskId"]
+    old_sources, old_members = task_doc(task_id)
+    new_sources, new_members = current_doc(task)
+
+    with SEARCH_TABLE.batch_writer() as batch:
+        for member_id in old_members:
+            for source, found in old_sources.items():
+                for term in found:
+                    if member_id not in new_members or term not in new_sources.get(source, {}):
+                        batch.delete_item(Key=posting_key(member_id, term, task_id, source))
+        for member_id in new_members:
+            for source, found in new_sources.items():
+                for term, weight in found.items():
+                    batch.put_item(Item=posting(member_id, term, task_id, source, weight))
+
+        for source in old_sources.keys() - new_sources.keys():
+            batch.delete_item(Key={"pk": f"DOC#{task_id}", "sk": f"SOURCE#{source}"})
+        for source, found in new_sources.items():
+            batch.put_item(Item={"pk": f"DOC#{task_id}", "sk": f"SOURCE#{source}", "terms": found})
+        for member_id in old_members - new_members:
+            batch.delete_item(Key={"pk": f"DOC#{task_id}", "sk": f"MEMBER#{member_id}"})
+        for member_id in new_members:
+            batch.put_item(Item={"pk": f"DOC#{task_id}", "sk": f"MEMBER#{member_id}"})
+
+    return sum(len(f) for f in new_sources.values()) * len(new_members)
+
+
+# One-off: (re)builds the search index of every task from its META, comments
+# and memberships, for data written before search/search-indexer.py was
+# attached or after changing the tokenizer. Postings that no longer match are
+# deleted. Optional event {"taskIds": [...]} limits it to those tasks.
+# Safe to re-run; run it while the tasks are not being edited (a stream record
+# applied during the rebuild of the same task can be overwritten).
+def handler(event, context):
+    task_ids = (event or {}).get("taskIds")
+    tasks = postings = 0
+
+    if task_ids:
+        for task_id in task_ids:
+            task = TASK_TABLE.get_item(Key={"pk": f"TASK#{task_id}", "sk": "META"}).get("Item")
+            if task:
+                postings += reindex_task(task)
+                tasks += 1
+    else:
+        scan_kwargs = {
+            "FilterExpression": "sk = :meta",
+            "ExpressionAttributeValues": {":meta": "META"}
+        }
+        while True:
+            resp = TASK_TABLE.scan(**scan_kwargs)
+            for task in resp.get("Items", []):
+                postings += reindex_task(task)
+                tasks += 1
+
+            if "LastEvaluatedKey" not in resp:
+                break
+            scan_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+    print("REINDEX DONE:", tasks, "tasks,", postings, "postings")
+    return {"tasks": tasks, "postings": postings}
@@ -0,0 +1,188 @@
+import json
+import os
+import re
+import math
+import time
+import base64
+import boto3
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
+from boto3.dynamodb.types import Binary
+from boto3.dynamodb.conditions import Key
+
+dynamodb = boto3.resource("dynamodb")
+SEARCH_TABLE_NAME = os.environ["SEARCH_TABLE"]
+TASK_TABLE_NAME = os.environ["TASK_TABLE"]
+
+# Postings are written by search/search-indexer.py (same tokenizer,
+# kept identical by shared-helpers-check.py)
+TOKEN_REGEX = r"[a-z0-9]+"
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 40
+STOPWORDS = {"an", "and", "are", "as", "at", "be", "by", "for", "in", "is", "it",
+             "of", "on", "or", "the", "to", "was", "with"}
+
+MAX_QUERY_TERMS = 5
+MAX_POSTINGS = 2000      # per query term and member: bounds work regardless of table size
+ALL_MEMBERS = "ALL"      # admins search the postings of the ALL membership
+PREFIX_MATCH_WEIGHT = 0.5  # "dep" matching "deploy" counts half an exact hit
+MAX_RESULTS = 50
+
+CORS_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*"
+}
+
+# DynamoDB types → JSON (Decimal, set, Binary) without a pre-copy
+def json_default(obj):
+    if isinstance(obj, Decimal):
+        return int(obj) if obj % 1 == 0 else float(obj)
+    if isinstance(obj, (set, frozenset)):
+        # convert first: Binary elements do not order
+        return sorted(json_default(v) if isinstance(v, (Decimal, Binary)) else v for v in obj)
+    if isinstance(obj, Binary):
+        return base64.b64encode(obj.value).decode()
+    raise TypeError(f"Not JSON serializable: {type(obj).__name__}")
+
+
+def query_terms(text):
+    found = []
+    for t in re.findall(TOKEN_REGEX, (text or "").lower()):
+        if MIN_TERM_LENGTH <= len(t) <= MAX_TERM_LENGTH and t not in STOPWORDS and t not in found:
+            found.append(t)
+    return found[:MAX_QUERY_TERMS]
+
+
+# =========================
+# Helper: one term (as a prefix) → ({taskId: score}, truncated), over one
+# member's postings; truncated = postings past MAX_POSTINGS were not read
+# =========================
+def term_scores(member_id, term):
+    scores = {}
+    kwargs = {
+        "TableName": SEARCH_TABLE_NAME,
+        "KeyConditionExpression": (
+            Key("pk").eq(f"TERM#{member_id}#{term[:MIN_TERM_LENGTH]}") & Key("sk").begins_with(term)
+        ),
+        "ProjectionExpression": "sk, taskId, w"
+    }
+    seen = 0
+    truncated = False
+    while True:
+        kwargs["Limit"] = MAX_POSTINGS - seen
+        resp = dynamodb.meta.client.query(**kwargs)
+        for p in resp.get("Items", []):
+            exact = p["sk"].split("#", 1)[0] == term
+            weight = float(p["w"]) * (1 if exact else PREFIX_MATCH_WEIGHT)
+            scores[p["taskId"]] = scores.get(p["taskId"], 0) + weight
+        seen += len(resp.get("Items", []))
+
+        if "LastEvaluatedKey" not in resp:
+            break
+        if seen >= MAX_POSTINGS:
+            truncated = True
+            break
+        kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+    # rarer terms rank higher (df capped by MAX_POSTINGS)
+    idf = 1 + math.log(MAX_POSTINGS / max(len(scores), 1))
+    return {t: s * idf for t, s in scores.items()}, truncated
+
+
+# =========================
+# Helper: ranked ids → visible tasks (membership + META in one BatchGetItem per chunk)
+# postings are already per member; this drops tasks deleted / unshared since indexing
+# =========================
+def visible_tasks(ranked_ids, user_id, is_admin, limit):
+    results = []
+    chunk_size = 100 if is_admin else 50
+
+    for i in range(0, len(ranked_ids), chunk_size):
+        chunk = ranked_ids[i:i + chunk_size]
+        keys = [{"pk": f"TASK#{t}", "sk": "META"} for t in chunk]
+        if not is_admin:
+            keys += [{"pk": f"TASK#{t}", "sk": f"MEMBER#{user_id}"} for t in chunk]
+
+        found = {}
+        members = set()
+        request = {TASK_TABLE_NAME: {"Keys": keys}}
+        attempt = 0
+        while request:
+            resp = dynamodb.batch_get_item(RequestItems=request)
+            for item in resp.get("Responses", {}).get(TASK_TABLE_NAME, []):
+                if item["sk"] == "META":
+                    found[item["taskId"]] = item
+                elif item.get("memberId") == user_id:
+                    members.add(item["taskId"])
+
+            request = resp.get("UnprocessedKeys") or None
+            if request:
+                time.sleep(min(0.05 * (2 ** attempt), 1))
+                attempt += 1
+
+        for t in chunk:
+            if t in found and (is_admin or t in members):
+                results.append(found[t])
+                if len(results) >= limit:
+                    return results
+
+    return results
+
+
+def handler(event, context):
+    try:
+        claims = event["requestContext"]["authorizer"]["jwt"]["claims"]
+        user_id = claims["sub"]
+        groups = claims.get("cognito:groups", [])
+
+        params = event.get("queryStringParameters") or {}
+        terms = query_terms(params.get("q"))
+        try:
+            limit = int(params.get("limit", "20"))
+        except ValueError:
+            limit = 0
+
+        if not terms or not 0 < limit <= MAX_RESULTS:
+            return {
+                "statusCode": 400,
+                "headers": CORS_HEADERS,
+                "body": json.dumps({
+                    "message": f"q (words of {MIN_TERM_LENGTH}+ characters) and limit of 1-{MAX_RESULTS} required"
+                })
+            }
+
+        is_admin = "admin" in groups
+        member_id = ALL_MEMBERS if is_admin else user_id
+
+        # every term must match (as a prefix); score = sum over terms
+        with ThreadPoolExecutor(max_workers=len(terms)) as pool:
+            per_term, cut = zip(*pool.map(lambda t: term_scores(member_id, t), terms))
+
+        matched = set(per_term[0]).intersection(*per_term[1:])
+        scores = {t: sum(s[t] for s in per_term) for t in matched}
+        ranked = sorted(matched, key=lambda t: (-scores[t], t))
+
+        items = []
+        for task in visible_tasks(ranked, user_id, is_admin, limit):
+            task["id"] = task["taskId"]
+            task["score"] = round(scores[task["taskId"]], 3)
+            items.append(task)
+
+        return {
+            "statusCode": 200,
+            "headers": CORS_HEADERS,
+            # truncated: a term matched more than MAX_POSTINGS postings, so
+            # matches past those (and their ranking) may be missing
+            "body": json.dumps(
+                {"items": items, "terms": terms, "truncated": any(cut)},
+                default=json_default
+            )
+        }
+
+    except Exception as e:
+        print("SEARCH ERROR:", str(e))
+        return {
+            "statusCode": 500,
+            "headers": CORS_HEADERS,
+            "body": json.dumps({"message": "Internal server error"})
+        }
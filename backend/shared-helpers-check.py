@@ -0,0 +1,99 @@
+import os
+import sys
+import ast
+import argparse
+
+# =========================
+# Every handler here is deployed as a single self-contained file, so helpers
+# needed by several handlers are copied rather than imported. This check keeps
+# the copies identical: run it before deploying (non-zero exit on drift).
+#
+#   python shared-helpers-check.py
+# =========================
+
+BACKEND = os.path.dirname(os.path.abspath(__file__))
+
+# name → files that carry a copy (module-level function or constant)
+SHARED = {
+    "membership_item": [
+        "task/task-create.py", "task/task-update.py", "task/task-bulk-update.py",
+        "task/task-import.py", "task/task-membership-backfill.py", "mentions/mention-worker.py"
+    ],
+    "get_user_sub": ["task/task-create.py", "task/task-import.py", "mentions/mention-worker.py"],
+    "directory_user_subs": ["task/task-create.py", "task/task-import.py", "mentions/mention-worker.py"],
+    "resolve_user_subs": ["task/task-create.py", "task/task-import.py", "mentions/mention-worker.py"],
+    "SUB_CACHE_TTL": ["task/task-create.py", "task/task-import.py", "mentions/mention-worker.py"],
+    "SUB_CACHE_NEGATIVE_TTL": ["task/task-create.py", "task/task-import.py", "mentions/mention-worker.py"],
+    "SUB_CACHE_SIZE": ["task/task-create.py", "task/task-import.py", "mentions/mention-worker.py"],
+    "terms": ["search/search-indexer.py", "search/search-reindex.py"],
+    "document": ["search/search-indexer.py", "search/search-reindex.py"],
+    "posting_key": ["search/search-indexer.py", "search/search-reindex.py"],
+    "posting": ["search/search-indexer.py", "search/search-reindex.py"],
+    "task_doc": ["search/search-indexer.py", "search/search-reindex.py"],
+    "TITLE_WEIGHT": ["search/search-indexer.py", "search/search-reindex.py"],
+    "TEXT_WEIGHT": ["search/search-indexer.py", "search/search-reindex.py"],
+    "TOKEN_REGEX": ["search/search-indexer.py", "search/search-reindex.py", "search/search-tasks.py"],
+    "MIN_TERM_LENGTH": ["search/search-indexer.py", "search/search-reindex.py", "search/search-tasks.py"],
+    "MAX_TERM_LENGTH": ["search/search-indexer.py", "search/search-reindex.py", "search/search-tasks.py"],
+    "STOPWORDS": ["search/search-indexer.py", "search/search-reindex.py", "search/search-tasks.py"],
+    "contribution": ["stats/stats-stream.py", "stats/stats-backfill.py"],
+    "ALL_MEMBERS": [
+        "task/task-create.py", "task/task-update.py", "task/task-bulk-update.py",
+        "task/task-import.py", "task/task-membership-backfill.py", "task/task-delete.py",
+        "task/task-list.py", "task/task-membership-stream.py", "mentions/mention-worker.py",
+        "search/search-tasks.py", "stats/get-stats.py"
+    ]
+}
+
+
+# top-level definition → normalized source (comments / formatting ignored)
+def definitions(path):
+    with open(path) as f:
+        tree = ast.parse(f.read())
+
+    found = {}
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef):
+            found[node.name] = ast.dump(node)
+        elif isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    found[target.id] = ast.dump(node.value)
+    return found
+
+
+def check(shared):
+    problems = []
+    cache = {}
+
+    for name, files in shared.items():
+        versions = {}
+        for rel in files:
+            if rel not in cache:
+                cache[rel] = definitions(os.path.join(BACKEND, rel))
+            body = cache[rel].get(name)
+            if body is None:
+                problems.append(f"{rel}: {name} missing")
+            else:
+                versions.setdefault(body, []).append(rel)
+
+        if len(versions) > 1:
+            groups = sorted(versions.values(), key=len, reverse=True)
+            for odd in groups[1:]:
+                problems.append(f"{name}: {', '.join(odd)} differ from {groups[0][0]}")
+    return problems
+
+
+def main(argv=None):
+    argparse.ArgumentParser(description="Check copied helpers are identical").parse_args(argv)
+
+    problems = check(SHARED)
+    for p in problems:
+        print("DRIFT:", p)
+    if not problems:
+        print(f"{len(SHARED)} shared helpers identical")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+import json
+import os
+import boto3
+from decimal import Decimal
+
+dynamodb = boto3.resource("dynamodb")
+STATS_TABLE = dynamodb.Table(os.environ["STATS_TABLE"])
+TASK_TABLE = dynamodb.Table(os.environ["TASK_TABLE"])
+
+ALL_MEMBERS = "ALL"  # aggregate over every task, read by admins
+
+CORS_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*"
+}
+
+# Aggregates maintained by stats/stats-stream.py
+#   GET /stats             → {"total", "status": {...}, "priority": {...}}
+#   GET /tasks/{id}/stats  → {"commentCount"}
+def counters(item):
+    result = {"total": 0, "status": {}, "priority": {}}
+    for name, value in item.items():
+        if name in ("pk", "sk"):
+            continue
+        value = int(value) if isinstance(value, Decimal) else value
+        group, _, key = name.partition("#")
+        if key and group in result:
+            result[group][key] = value
+        else:
+            result[name] = value
+    return result
+
+
+def handler(event, context):
+    try:
+        claims = event["requestContext"]["authorizer"]["jwt"]["claims"]
+        user_id = claims["sub"]
+        groups = claims.get("cognito:groups", [])
+        is_admin = "admin" in groups
+
+        task_id = (event.get("pathParameters") or {}).get("id")
+
+        if task_id:
+            if not is_admin:
+                member = TASK_TABLE.get_item(
+                    Key={"pk": f"TASK#{task_id}", "sk": f"MEMBER#{user_id}"},
+                    ProjectionExpression="memberId"
+                ).get("Item")
+                if not member:
+                    return {
+                        "statusCode": 404,
+                        "headers": CORS_HEADERS,
+                        "body": json.dumps({"message": "Task not found"})
+                    }
+
+            item = STATS_TABLE.get_item(
+                Key={"pk": f"TASK#{task_id}", "sk": "COMMENT_STATS"}
+            ).get("Item", {})
+            body = {"taskId": task_id, "commentCount": int(item.get("commentCount", 0))}
+        else:
+            owner = ALL_MEMBERS if is_admin else user_id
+            item = STATS_TABLE.get_item(
+                Key={"pk": f"USER#{owner}", "sk": "TASK_STATS"}
+            ).get("Item", {})
+            body = counters(item)
+
+        return {
+            "statusCode": 200,
+            "headers": CORS_HEADERS,
+            "body": json.dumps(body)
+        }
+
+    except Exception as e:
+        print("GET STATS ERROR:", str(e))
+        return {
+            "statusCode": 500,
+            "headers": CORS_HEADERS,
+            "body": json.dumps({"message": "Internal server error"})
+        }
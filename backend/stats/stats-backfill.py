@@ -0,0 +1,84 @@
+import os
+import boto3
+
+dynamodb = boto3.resource("dynamodb")
+STATS_TABLE = dynamodb.Table(os.environ["STATS_TABLE"])
+TASK_TABLE = dynamodb.Table(os.environ["TASK_TABLE"])
+COMMENTS_TABLE = dynamodb.Table(os.environ["COMMENTS_TABLE"])
+
+
+# =========================
+# Helper: one item image → (aggregate key, counters it contributes to)
+# (copy of stats/stats-stream.py, kept identical by shared-helpers-check.py)
+# =========================
+def contribution(item):
+    if not item:
+        return None, {}
+    sk = item.get("sk", "")
+
+    if sk.startswith("MEMBER#") and item.get("memberId"):
+        owner = item["memberId"]  # tombstones have no memberId → count nothing
+    elif sk.startswith("COMMENT#"):
+        return {"pk": item["pk"], "sk": "COMMENT_STATS"}, {"commentCount": 1}
+    else:
+        return None, {}
+
+    return {"pk": f"USER#{owner}", "sk": "TASK_STATS"}, {
+        "total": 1,
+        f"status#{item.get('status', 'todo')}": 1,
+        f"priority#{item.get('priority', 'medium')}": 1
+    }
+
+
+def scan_all(table, **scan_kwargs):
+    while True:
+        resp = table.scan(**scan_kwargs)
+        yield from resp.get("Items", [])
+
+        if "LastEvaluatedKey" not in resp:
+            return
+        scan_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+
+# One-off: rebuilds every STATS_TABLE counter from the MEMBER# and COMMENT#
+# items, through the same contribution() the stream worker applies, so data
+# written before the stream existed is counted. Aggregates with nothing left
+# to count are deleted.
+# Safe to re-run; run it while no tasks or comments are being written
+# (counters are replaced, so stream updates during the scan would be lost).
+def handler(event, context):
+    totals = {}
+    sources = [
+        (TASK_TABLE, "begins_with(sk, :p) AND attribute_exists(memberId)", "MEMBER#"),
+        (COMMENTS_TABLE, "begins_with(sk, :p)", "COMMENT#")
+    ]
+
+    for table, condition, prefix in sources:
+        for item in scan_all(
+            table,
+            FilterExpression=condition,
+            ProjectionExpression="pk, sk, memberId, #s, priority",
+            ExpressionAttributeNames={"#s": "status"},
+            ExpressionAttributeValues={":p": prefix}
+        ):
+            key, counters = contribution(item)
+            if key is None:
+                continue
+            bucket = totals.setdefault((key["pk"], key["sk"]), {})
+            for name, n in counters.items():
+                bucket[name] = bucket.get(name, 0) + n
+
+    stale = [
+        (s["pk"], s["sk"])
+        for s in scan_all(STATS_TABLE, ProjectionExpression="pk, sk")
+        if (s["pk"], s["sk"]) not in totals
+    ]
+
+    with STATS_TABLE.batch_writer() as batch:
+        for (pk, sk), counters in totals.items():
+            batch.put_item(Item={"pk": pk, "sk": sk, **counters})
+        for pk, sk in stale:
+            batch.delete_item(Key={"pk": pk, "sk": sk})
+
+    print("BACKFILL DONE:", len(totals), "aggregates rebuilt,", len(stale), "removed")
+    return {"aggregates": len(totals), "removed": len(stale)}
@@ -0,0 +1,105 @@
+import os
+import boto3
+from boto3.dynamodb.types import TypeDeserializer
+
+dynamodb = boto3.resource("dynamodb")
+STATS_TABLE = dynamodb.Table(os.environ["STATS_TABLE"])
+
+deserializer = TypeDeserializer()
+
+# =========================
+# Aggregates worker (DynamoDB Streams trigger on TASK_TABLE + COMMENTS_TABLE,
+# view type NEW_AND_OLD_IMAGES, batch item failures enabled)
+#
+#   USER#<sub>  / TASK_STATS    → total, status#<s>, priority#<p>   (from MEMBER# items)
+#   USER#ALL    / TASK_STATS    → same, over every task             (from MEMBER#ALL items)
+#   TASK#<id>   / COMMENT_STATS → commentCount                      (from COMMENT# items)
+#
+# Records are applied one at a time in stream order; on failure the batch is
+# checkpointed at the failed record, so nothing before it is counted twice.
+# =========================
+
+def image(record, name):
+    raw = record["dynamodb"].get(name)
+    if not raw:
+        return None
+    return {k: deserializer.deserialize(v) for k, v in raw.items()}
+
+
+# =========================
+# Helper: one item image → (aggregate key, counters it contributes to)
+# (stats/stats-backfill.py carries a copy, kept identical by shared-helpers-check.py)
+# =========================
+def contribution(item):
+    if not item:
+        return None, {}
+    sk = item.get("sk", "")
+
+    if sk.startswith("MEMBER#") and item.get("memberId"):
+        owner = item["memberId"]  # tombstones have no memberId → count nothing
+    elif sk.startswith("COMMENT#"):
+        return {"pk": item["pk"], "sk": "COMMENT_STATS"}, {"commentCount": 1}
+    else:
+        return None, {}
+
+    return {"pk": f"USER#{owner}", "sk": "TASK_STATS"}, {
+        "total": 1,
+        f"status#{item.get('status', 'todo')}": 1,
+        f"priority#{item.get('priority', 'medium')}": 1
+    }
+
+
+# =========================
+# Helper: one stream record → {aggregate key: {counter: delta}}
+# (a MODIFY that leaves status/priority alone produces no deltas)
+# =========================
+def record_deltas(record):
+    old_key, old = contribution(image(record, "OldImage"))
+    new_key, new = contribution(image(record, "NewImage"))
+
+    deltas = {}
+    for key, counters, sign in ((old_key, old, -1), (new_key, new, 1)):
+        if key is None:
+            continue
+        bucket = deltas.setdefault((key["pk"], key["sk"]), {})
+        for name, n in counters.items():
+            bucket[name] = bucket.get(name, 0) + sign * n
+
+    return {
+        key: {k: v for k, v in counters.items() if v}
+        for key, counters in deltas.items()
+        if any(counters.values())
+    }
+
+
+def apply_deltas(deltas):
+    for (pk, sk), counters in deltas.items():
+        names = {}
+        values = {}
+        adds = []
+        for i, (name, n) in enumerate(counters.items()):
+            names[f"#a{i}"] = name
+            values[f":a{i}"] = n
+            adds.append(f"#a{i} :a{i}")
+
+        STATS_TABLE.update_item(
+            Key={"pk": pk, "sk": sk},
+            UpdateExpression="ADD " + ", ".join(adds),
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values
+        )
+
+
+def handler(event, context):
+    for record in event.get("Records", []):
+        try:
+            apply_deltas(record_deltas(record))
+        except Exception as e:
+            print("STATS STREAM ERROR:", record["dynamodb"].get("SequenceNumber"), str(e))
+            return {
+                "batchItemFailures": [
+                    {"itemIdentifier": record["dynamodb"]["SequenceNumber"]}
+                ]
+            }
+
+    return {"batchItemFailures": []}
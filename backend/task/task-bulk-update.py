@@ -0,0 +1,319 @@
+import json
+import os
+import zlib
+import time
+import boto3
+from datetime import datetime
+
+dynamodb = boto3.resource("dynamodb")
+TASK_TABLE = dynamodb.Table(os.environ["TASK_TABLE"])
+AUDIT_TABLE = dynamodb.Table(os.environ["AUDIT_TABLE"])
+
+# Audit records are spread over AUDIT_SHARDS partitions per day
+# (audit/audit-get-lambda.py reads them with the same AUDIT_SHARDS; never lower it)
+AUDIT_SHARDS = int(os.environ.get("AUDIT_SHARDS", "8"))
+
+MAX_BULK_UPDATES = 100
+MAX_TRANSACT_ITEMS = 100
+BATCH_MAX_RETRIES = 8
+ALL_MEMBERS = "ALL"  # admin membership / tombstone partition
+TransactionCanceled = dynamodb.meta.client.exceptions.TransactionCanceledException
+
+# =========================
+# Helper: audit key (pk = AUDIT#<day>#<shard>, sk starts with the timestamp)
+# =========================
+def audit_key(action, entity_id, ts):
+    sk = f"{ts}#{action}#{entity_id}"
+    return {"pk": f"AUDIT#{ts[:10]}#{zlib.crc32(sk.encode()) % AUDIT_SHARDS}", "sk": sk}
+
+
+# =========================
+# Helper: membership item (feeds MemberIndex + filter GSIs)
+# (one copy per handler, kept identical by shared-helpers-check.py)
+# =========================
+def membership_item(task, member_id, now):
+    status = task.get("status", "todo")
+    priority = task.get("priority", "medium")
+    category = task.get("category", "general")
+    return {
+        "pk": f"TASK#{task['taskId']}",
+        "sk": f"MEMBER#{member_id}",
+        "taskId": task["taskId"],
+        "memberId": member_id,
+        "updatedAt": now,
+        "status": status,
+        "priority": priority,
+        "category": category,
+        # composite partition keys for the filter GSIs
+        "memberStatus": f"{member_id}#STATUS#{status}",
+        "memberPriority": f"{member_id}#PRIORITY#{priority}",
+        "memberCategory": f"{member_id}#CATEGORY#{category}",
+        "memberStatusPriority": f"{member_id}#STATUS#{status}#PRIORITY#{priority}"
+    }
+
+
+
+CORS_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*"
+}
+
+
+# =========================
+# Helper: BatchGetItem task META (100 keys per call)
+# =========================
+def batch_get_tasks(task_ids):
+    found = {}
+
+    for i in range(0, len(task_ids), 100):
+        request = {
+            TASK_TABLE.name: {
+                "Keys": [{"pk": f"TASK#{t}", "sk": "META"} for t in task_ids[i:i + 100]],
+                "ConsistentRead": True
+            }
+        }
+        attempt = 0
+
+        while request:
+            resp = dynamodb.batch_get_item(RequestItems=request)
+            for item in resp.get("Responses", {}).get(TASK_TABLE.name, []):
+                found[item["taskId"]] = item
+
+            request = resp.get("UnprocessedKeys") or None
+            if request:
+                time.sleep(min(0.05 * (2 ** attempt), 1))
+                attempt += 1
+
+    return found
+
+
+# =========================
+# Helper: BatchWriteItem in 25-item chunks with backoff
+# =========================
+def batch_put(table_name, items):
+    for i in range(0, len(items), 25):
+        request = {table_name: [{"PutRequest": {"Item": it}} for it in items[i:i + 25]]}
+        attempt = 0
+
+        while request:
+            resp = dynamodb.batch_write_item(RequestItems=request)
+            request = resp.get("UnprocessedItems") or None
+            if request:
+                if attempt >= BATCH_MAX_RETRIES:
+                    raise RuntimeError(f"Unprocessed items left after {attempt} retries")
+                time.sleep(min(0.05 * (2 ** attempt), 1))
+                attempt += 1
+
+
+# =========================
+# Helper: one task change → its transaction items
+# META update is guarded by the updatedAt we read, so the
+# authorization and the audit diff cannot go stale in between
+# =========================
+def task_write_items(task, changes, username, now):
+    names = {"#ub": "updatedBy", "#ua": "updatedAt", "#v": "version"}
+    values = {":ub": username, ":ua": now, ":seen": task.get("updatedAt"), ":one": 1}
+    sets = ["#ub = :ub", "#ua = :ua"]
+
+    for field, value in changes.items():
+        names[f"#{field}"] = field
+        values[f":{field}"] = value
+        sets.append(f"#{field} = :{field}")
+
+    items = [{
+        "Update": {
+            "TableName": TASK_TABLE.name,
+            "Key": {"pk": task["pk"], "sk": "META"},
+            "UpdateExpression": "SET " + ", ".join(sets) + " ADD #v :one",
+            "ConditionExpression": "attribute_exists(pk) AND #ua = :seen",
+            "ExpressionAttributeNames": names,
+            "ExpressionAttributeValues": values
+        }
+    }]
+
+    updated = dict(task, **changes)
+    items += [
+        {"Put": {"TableName": TASK_TABLE.name, "Item": membership_item(updated, m, now)}}
+        for m in task.get("participantIds", []) + [ALL_MEMBERS]
+    ]
+    return items
+
+
+# =========================
+# Helper: run grouped writes in ≤100-item transactions;
+# tasks named in CancellationReasons are dropped (added to failed) and the
+# rest retried, on_commit(task_ids) runs right after each chunk commits
+# (groups must already fit in one transaction)
+# =========================
+def transact_groups(groups, on_commit, failed):
+    chunk, size = [], 0
+
+    def flush(chunk):
+        while chunk:
+            items = [it for _, group in chunk for it in group]
+            try:
+                dynamodb.meta.client.transact_write_items(TransactItems=items)
+            except TransactionCanceled as e:
+                reasons = e.response.get("CancellationReasons", [])
+                bad, pos = set(), 0
+                for task_id, group in chunk:
+                    if any(r.get("Code") not in (None, "None")
+                           for r in reasons[pos:pos + len(group)]):
+                        bad.add(task_id)
+                    pos += len(group)
+                if not bad:
+                    raise
+                failed.update(bad)
+                chunk = [(t, g) for t, g in chunk if t not in bad]
+                continue
+
+            on_commit([t for t, _ in chunk])
+            return
+
+    for task_id, group in groups:
+        if size + len(group) > MAX_TRANSACT_ITEMS:
+            flush(chunk)
+            chunk, size = [], 0
+        chunk.append((task_id, group))
+        size += len(group)
+    flush(chunk)
+
+
+def handler(event, context):
+    try:
+        body = json.loads(event.get("body") or "{}")
+        updates = body.get("updates") or []
+
+        if not isinstance(updates, list) or not 0 < len(updates) <= MAX_BULK_UPDATES:
+            return {
+                "statusCode": 400,
+                "headers": CORS_HEADERS,
+                "body": json.dumps({"message": f"updates must be a list of 1-{MAX_BULK_UPDATES} items"})
+            }
+
+        # ===== AUTH =====
+        claims = event["requestContext"]["authorizer"]["jwt"]["claims"]
+        user_id = claims["sub"]
+        username = (
+            claims.get("cognito:username")
+            or claims.get("username")
+            or claims.get("email")
+            or "unknown"
+        )
+        groups = claims.get("cognito:groups", [])
+        is_admin = "admin" in groups
+        now = datetime.utcnow().isoformat()
+
+        # ===== VALIDATION (one result per entry, in request order) =====
+        requested = {}
+        slots = []  # task id, or the entry's own 400 outcome
+        for i, u in enumerate(updates):
+            task_id = u.get("id") if isinstance(u, dict) else None
+            if not isinstance(task_id, str) or not task_id:
+                slots.append({"index": i, "status": 400, "message": "id required"})
+            elif task_id in requested:
+                slots.append({"id": task_id, "index": i, "status": 400, "message": "Duplicate id"})
+            else:
+                requested[task_id] = u
+                slots.append(task_id)
+
+        # ===== BATCHED READ =====
+        tasks = batch_get_tasks(list(requested))
+
+        outcomes = {}
+        write_groups = []
+        audits = {}
+
+        # ===== AUTHZ + CHANGE DETECTION =====
+        for task_id, u in requested.items():
+            task = tasks.get(task_id)
+            if not task:
+                outcomes[task_id] = {"id": task_id, "status": 404, "message": "Task not found"}
+                continue
+            if not is_admin and user_id != task["ownerId"]:
+                outcomes[task_id] = {"id": task_id, "status": 403, "message": "Not allowed"}
+                continue
+
+            # optional per-task precondition, same as If-Match on PUT
+            if "version" in u and u["version"] != int(task.get("version", 0)):
+                outcomes[task_id] = {"id": task_id, "status": 412, "message": "Task was modified by someone else"}
+                continue
+
+            changes = {
+                f: u[f] for f in ("status", "priority")
+                if f in u and u[f] != task.get(f)
+            }
+            if not changes:
+                outcomes[task_id] = {"id": task_id, "status": 200, "message": "No changes"}
+                continue
+
+            group = task_write_items(task, changes, username, now)
+            if len(group) > MAX_TRANSACT_ITEMS:
+                # META + one membership per participant cannot commit atomically
+                outcomes[task_id] = {
+                    "id": task_id,
+                    "status": 422,
+                    "message": "Task has too many participants for a bulk update"
+                }
+                continue
+
+            write_groups.append((task_id, group))
+            audits[task_id] = [
+                {
+                    **audit_key(f"UPDATE_{f.upper()}", task_id, now),
+                    "action": f"UPDATE_{f.upper()}",
+                    "taskId": task_id,
+                    "taskTitle": task.get("title"),
+                    "oldValue": task.get(f),
+                    "newValue": v,
+                    "updatedBy": username,
+                    "actor": username,  # AuditActorIndex
+                    "updatedAt": now,
+                    "createdAt": now
+                }
+                for f, v in changes.items()
+            ]
+
+        # ===== CHUNKED TRANSACTIONAL WRITES (+ audit per committed chunk) =====
+        # audits are written as each chunk commits, so a later failure
+        # cannot leave committed changes without their audit records
+        committed, conflicts = set(), set()
+
+        def write_audits(task_ids):
+            committed.update(task_ids)
+            batch_put(AUDIT_TABLE.name, [a for t in task_ids for a in audits[t]])
+
+        # an unexpected error still reports what was applied so far
+        try:
+            transact_groups(write_groups, write_audits, conflicts)
+        except Exception as e:
+            print("TASK BULK UPDATE WRITE ERROR:", str(e))
+
+        for task_id, _ in write_groups:
+            if task_id in committed:
+                outcomes[task_id] = {
+                    "id": task_id,
+                    "status": 200,
+                    "message": "Task updated",
+                    "version": int(tasks[task_id].get("version", 0)) + 1
+                }
+            elif task_id in conflicts:
+                outcomes[task_id] = {"id": task_id, "status": 409, "message": "Task changed concurrently"}
+            else:
+                outcomes[task_id] = {"id": task_id, "status": 500, "message": "Update failed"}
+
+        return {
+            "statusCode": 200,
+            "headers": CORS_HEADERS,
+            "body": json.dumps({
+                "results": [outcomes[s] if isinstance(s, str) else s for s in slots]
+            })
+        }
+
+    except Exception as e:
+        print("TASK BULK UPDATE ERROR:", str(e))
+        return {
+            "statusCode": 500,
+            "headers": CORS_HEADERS,
+            "body": json.dumps({"message": "Internal server error"})
+        }
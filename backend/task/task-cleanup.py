@@ -0,0 +1,183 @@
+import json
+import os
+import time
+import boto3
+from concurrent.futures import ThreadPoolExecutor
+from boto3.dynamodb.conditions import Key
+
+dynamodb = boto3.resource("dynamodb")
+COMMENTS_TABLE = os.environ["COMMENTS_TABLE"]
+MENTIONS_TABLE = os.environ["MENTIONS_TABLE"]
+
+# GSI on MENTIONS_TABLE: partition key taskId, projection KEYS_ONLY
+TASK_MENTIONS_INDEX = os.environ.get("TASK_MENTIONS_INDEX", "TaskMentionsIndex")
+
+CLEANUP_WORKERS = int(os.environ.get("CLEANUP_WORKERS", "8"))
+BATCH_MAX_RETRIES = 8
+
+# per-user unread counter item (pk=USER#<username>), read by mentions/unread-count.py
+UNREAD_COUNT_SK = "UNREAD_COUNT"
+
+TransactionCanceled = dynamodb.meta.client.exceptions.TransactionCanceledException
+
+# =========================
+# Cascade worker for deleted tasks (SQS trigger, batch item failures enabled)
+# Events come from task-delete.py; deleting what is already gone is a no-op,
+# so redelivery is safe. UNREAD mentions also decrement their owner's unread
+# counter, in the same transaction as the delete.
+# =========================
+
+
+# =========================
+# Helper: all primary keys returned by a query (every page)
+# =========================
+def query_keys(table_name, **query_kwargs):
+    keys = []
+    query_kwargs.update({
+        "TableName": table_name,
+        "ProjectionExpression": "pk, sk"
+    })
+
+    while True:
+        resp = dynamodb.meta.client.query(**query_kwargs)
+        keys.extend({"pk": i["pk"], "sk": i["sk"]} for i in resp.get("Items", []))
+
+        if "LastEvaluatedKey" not in resp:
+            return keys
+        query_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+
+# =========================
+# Helper: one BatchWriteItem of ≤25 deletes, UnprocessedItems retried
+# =========================
+def delete_chunk(table_name, keys):
+    request = {table_name: [{"DeleteRequest": {"Key": k}} for k in keys]}
+    attempt = 0
+
+    while request:
+        resp = dynamodb.meta.client.batch_write_item(RequestItems=request)
+        request = resp.get("UnprocessedItems") or None
+        if request:
+            if attempt >= BATCH_MAX_RETRIES:
+                raise RuntimeError(f"Unprocessed deletes left after {attempt} retries")
+            time.sleep(min(0.05 * (2 ** attempt), 1))
+            attempt += 1
+
+
+# =========================
+# Helper: keys of the mentions still UNREAD (the index is KEYS_ONLY)
+# =========================
+def unread_mention_keys(keys):
+    unread = []
+    for i in range(0, len(keys), 100):
+        request = {
+            MENTIONS_TABLE: {
+                "Keys": keys[i:i + 100],
+                "ProjectionExpression": "pk, sk, #s",
+                "ExpressionAttributeNames": {"#s": "status"}
+            }
+        }
+        attempt = 0
+        while request:
+            resp = dynamodb.meta.client.batch_get_item(RequestItems=request)
+            unread.extend(
+                {"pk": m["pk"], "sk": m["sk"]}
+                for m in resp.get("Responses", {}).get(MENTIONS_TABLE, [])
+                if m.get("status") == "UNREAD"
+            )
+            request = resp.get("UnprocessedKeys") or None
+            if request:
+                time.sleep(min(0.05 * (2 ** attempt), 1))
+                attempt += 1
+    return unread
+
+
+# =========================
+# Helper: delete one user's UNREAD mentions, ≤99 per transaction with ONE
+# counter decrement (one user's counter is never in two transactions at once).
+# Mentions read in the meantime fail their condition → plain delete, rest retried
+# =========================
+def delete_unread_mentions(keys):
+    for i in range(0, len(keys), 99):
+        chunk = keys[i:i + 99]
+
+        while chunk:
+            transact_items = [
+                {
+                    "Delete": {
+                        "TableName": MENTIONS_TABLE,
+                        "Key": k,
+                        "ConditionExpression": "#s = :u",
+                        "ExpressionAttributeNames": {"#s": "status"},
+                        "ExpressionAttributeValues": {":u": "UNREAD"}
+                    }
+                }
+                for k in chunk
+            ]
+            transact_items.append({
+                "Update": {
+                    "TableName": MENTIONS_TABLE,
+                    "Key": {"pk": chunk[0]["pk"], "sk": UNREAD_COUNT_SK},
+                    "UpdateExpression": "ADD unreadCount :dec",
+                    "ExpressionAttributeValues": {":dec": -len(chunk)}
+                }
+            })
+            try:
+                dynamodb.meta.client.transact_write_items(TransactItems=transact_items)
+                break
+            except TransactionCanceled as e:
+                reasons = e.response.get("CancellationReasons", [])
+                read = [
+                    k for k, r in zip(chunk, reasons)
+                    if r.get("Code") == "ConditionalCheckFailed"
+                ]
+                if not read:
+                    raise
+                for n in range(0, len(read), 25):
+                    delete_chunk(MENTIONS_TABLE, read[n:n + 25])
+                chunk = [k for k in chunk if k not in read]
+
+
+def cleanup_task(task_id, pool):
+    comment_keys = query_keys(
+        COMMENTS_TABLE,
+        KeyConditionExpression=Key("pk").eq(f"TASK#{task_id}") & Key("sk").begins_with("COMMENT#")
+    )
+    mention_keys = query_keys(
+        MENTIONS_TABLE,
+        IndexName=TASK_MENTIONS_INDEX,
+        KeyConditionExpression=Key("taskId").eq(task_id)
+    )
+
+    unread = unread_mention_keys(mention_keys)
+    unread_ids = {(k["pk"], k["sk"]) for k in unread}
+    read_keys = [k for k in mention_keys if (k["pk"], k["sk"]) not in unread_ids]
+
+    futures = [
+        pool.submit(delete_chunk, table, keys[i:i + 25])
+        for table, keys in ((COMMENTS_TABLE, comment_keys), (MENTIONS_TABLE, read_keys))
+        for i in range(0, len(keys), 25)
+    ]
+    unread_by_user = {}
+    for k in unread:
+        unread_by_user.setdefault(k["pk"], []).append(k)
+    futures += [pool.submit(delete_unread_mentions, keys) for keys in unread_by_user.values()]
+    for f in futures:
+        f.result()
+
+    print("TASK CLEANUP:", task_id, len(comment_keys), "comments,", len(mention_keys), "mentions")
+
+
+def handler(event, context):
+    records = event.get("Records", [])
+    failures = []
+
+    with ThreadPoolExecutor(max_workers=CLEANUP_WORKERS) as pool:
+        for record in records:
+            try:
+                cleanup_task(json.loads(record["body"])["taskId"], pool)
+            except Exception as e:
+                print("TASK CLEANUP ERROR:", record.get("messageId"), str(e))
+                failures.append({"itemIdentifier": record["messageId"]})
+
+    return {"batchItemFailures": failures}
@@ -1,8 +1,12 @@
 import json
 import os
+import zlib
 import boto3
 import uuid
 import re
+import time
+import hashlib
+from collections import OrderedDict
 from datetime import datetime
 
 dynamodb = boto3.resource("dynamodb")
@@ -12,19 +16,62 @@ TASK_TABLE = dynamodb.Table(os.environ["TASK_TABLE"])
 AUDIT_TABLE = dynamodb.Table(os.environ["AUDIT_TABLE"])
 MENTIONS_TABLE = dynamodb.Table(os.environ["MENTIONS_TABLE"])
 
+# Audit records are spread over AUDIT_SHARDS partitions per day
+# (audit/audit-get-lambda.py reads them with the same AUDIT_SHARDS; never lower it)
+AUDIT_SHARDS = int(os.environ.get("AUDIT_SHARDS", "8"))
+
+# Idempotency-Key support (optional, enabled when the table is configured)
+IDEMPOTENCY_TABLE = os.environ.get("IDEMPOTENCY_TABLE")
+IDEMPOTENCY = dynamodb.Table(IDEMPOTENCY_TABLE) if IDEMPOTENCY_TABLE else None
+IDEMPOTENCY_TTL = int(os.environ.get("IDEMPOTENCY_TTL", "86400"))
+IDEMPOTENCY_LOCK_SECONDS = 60
+
+TransactionCanceled = dynamodb.meta.client.exceptions.TransactionCanceledException
+
 USER_POOL_ID = os.environ["USER_POOL_ID"]
 
+# username → sub cache (lives as long as the container)
+USER_DIRECTORY_TABLE = os.environ.get("USER_DIRECTORY_TABLE")
+SUB_CACHE_TTL = int(os.environ.get("SUB_CACHE_TTL", "300"))
+SUB_CACHE_NEGATIVE_TTL = int(os.environ.get("SUB_CACHE_NEGATIVE_TTL", "30"))
+SUB_CACHE_SIZE = 1024
+_sub_cache = OrderedDict()
+
 MENTION_REGEX = r'@([a-zA-Z0-9_.-]+)'
 
+ALL_MEMBERS = "ALL"  # admin membership / tombstone partition
+
+# per-user unread counter item (pk=USER#<username>), read by mentions/unread-count.py
+UNREAD_COUNT_SK = "UNREAD_COUNT"
+
+# Counts DynamoDB HTTP requests (retries included) per invocation
+_round_trips = {"count": 0}
+
+
+def _count_round_trip(**kwargs):
+    _round_trips["count"] += 1
+
+
+dynamodb.meta.client.meta.events.register("before-send.dynamodb", _count_round_trip)
+
 CORS_HEADERS = {
     "Content-Type": "application/json",
     "Access-Control-Allow-Origin": "*",
-    "Access-Control-Allow-Headers": "Authorization,Content-Type",
+    "Access-Control-Allow-Headers": "Authorization,Content-Type,Idempotency-Key",
     "Access-Control-Allow-Methods": "OPTIONS,POST"
 }
 
 # -------------------------
-# Helper: username → sub
+# Helper: audit key (pk = AUDIT#<day>#<shard>, sk starts with the timestamp)
+# -------------------------
+def audit_key(action, entity_id, ts):
+    sk = f"{ts}#{action}#{entity_id}"
+    return {"pk": f"AUDIT#{ts[:10]}#{zlib.crc32(sk.encode()) % AUDIT_SHARDS}", "sk": sk}
+
+# -------------------------
+# Helper: username → sub (Cognito lookup)
+# (this and the resolver below: one copy per handler,
+#  kept identical by shared-helpers-check.py)
 # -------------------------
 def get_user_sub(username):
     resp = cognito.list_users(
@@ -41,7 +88,212 @@ def get_user_sub(username):
     return None
 
 
+# -------------------------
+# Helper: batched username → sub resolver
+# per-container LRU with TTL, "not found" cached briefly,
+# user directory table first, Cognito only for what is left
+# -------------------------
+def directory_user_subs(usernames):
+    found = {}
+    if not USER_DIRECTORY_TABLE:
+        return found
+
+    names = list(usernames)
+    for i in range(0, len(names), 100):
+        request = {
+            USER_DIRECTORY_TABLE: {
+                "Keys": [{"pk": f"USER#{u}", "sk": "PROFILE"} for u in names[i:i + 100]],
+                "ProjectionExpression": "username, #s",
+                "ExpressionAttributeNames": {"#s": "sub"}
+            }
+        }
+        attempt = 0
+
+        while request:
+            resp = dynamodb.batch_get_item(RequestItems=request)
+            for item in resp.get("Responses", {}).get(USER_DIRECTORY_TABLE, []):
+                found[item["username"]] = item["sub"]
+
+            request = resp.get("UnprocessedKeys") or None
+            if request:
+                time.sleep(min(0.05 * (2 ** attempt), 1))
+                attempt += 1
+
+    return found
+
+
+def resolve_user_subs(usernames):
+    now = time.time()
+    result = {}
+    misses = []
+
+    for u in set(usernames):
+        hit = _sub_cache.get(u)
+        if hit and hit[1] > now:
+            _sub_cache.move_to_end(u)
+            result[u] = hit[0]
+        else:
+            misses.append(u)
+
+    if misses:
+        found = directory_user_subs(misses)
+
+        for u in misses:
+            sub = found.get(u)
+            if sub is None:
+                sub = get_user_sub(u)
+                # write-through so the next container finds it in the directory
+                if sub and USER_DIRECTORY_TABLE:
+                    dynamodb.Table(USER_DIRECTORY_TABLE).put_item(
+                        Item={"pk": f"USER#{u}", "sk": "PROFILE", "username": u, "sub": sub}
+                    )
+
+            ttl = SUB_CACHE_TTL if sub else SUB_CACHE_NEGATIVE_TTL
+            _sub_cache[u] = (sub, now + ttl)
+            _sub_cache.move_to_end(u)
+            result[u] = sub
+
+        while len(_sub_cache) > SUB_CACHE_SIZE:
+            _sub_cache.popitem(last=False)
+
+    return result
+
+# -------------------------
+# Helper: membership item (feeds MemberIndex + filter GSIs)
+# (one copy per handler, kept identical by shared-helpers-check.py)
+# -------------------------
+def membership_item(task, member_id, now):
+    status = task.get("status", "todo")
+    priority = task.get("priority", "medium")
+    category = task.get("category", "general")
+    return {
+        "pk": f"TASK#{task['taskId']}",
+        "sk": f"MEMBER#{member_id}",
+        "taskId": task["taskId"],
+        "memberId": member_id,
+        "updatedAt": now,
+        "status": status,
+        "priority": priority,
+        "category": category,
+        # composite partition keys for the filter GSIs
+        "memberStatus": f"{member_id}#STATUS#{status}",
+        "memberPriority": f"{member_id}#PRIORITY#{priority}",
+        "memberCategory": f"{member_id}#CATEGORY#{category}",
+        "memberStatusPriority": f"{member_id}#STATUS#{status}#PRIORITY#{priority}"
+    }
+
+# -------------------------
+# Helper: mention puts + unread counter bumps, atomically
+# (≤50 mentions per TransactWriteItems: one put and one ADD each)
+# -------------------------
+def write_mentions(mentions):
+    for i in range(0, len(mentions), 50):
+        transact_items = []
+        for m in mentions[i:i + 50]:
+            transact_items.append({"Put": {"TableName": MENTIONS_TABLE.name, "Item": m}})
+            transact_items.append({
+                "Update": {
+                    "TableName": MENTIONS_TABLE.name,
+                    "Key": {"pk": m["pk"], "sk": UNREAD_COUNT_SK},
+                    "UpdateExpression": "ADD unreadCount :one",
+                    "ExpressionAttributeValues": {":one": 1}
+                }
+            })
+        dynamodb.meta.client.transact_write_items(TransactItems=transact_items)
+
+
+# -------------------------
+# Helper: Idempotency-Key (header) → claim / replay / release
+# record: pk=IDEMPOTENCY#<sub>#<route>#<key>, expires via TTL on expiresAt
+# -------------------------
+def idempotency_record_key(event, user_sub, route):
+    headers = {k.lower(): v for k, v in (event.get("headers") or {}).items()}
+    key = headers.get("idempotency-key")
+    if not key or not IDEMPOTENCY_TABLE:
+        return None
+    return {"pk": f"IDEMPOTENCY#{user_sub}#{route}#{key}", "sk": "REQUEST"}
+
+
+# None → this request owns the key; otherwise the response to send back
+def claim_idempotency(record_key, request_body, claim_token):
+    now = int(time.time())
+    body_hash = hashlib.sha256((request_body or "").encode()).hexdigest()
+
+    try:
+        IDEMPOTENCY.put_item(
+            Item={
+                **record_key,
+                "status": "IN_PROGRESS",
+                "claimToken": claim_token,  # only this request may complete / release it
+                "bodyHash": body_hash,
+                "expiresAt": now + IDEMPOTENCY_LOCK_SECONDS
+            },
+            ConditionExpression="attribute_not_exists(pk) OR expiresAt < :now",
+            ExpressionAttributeValues={":now": now}
+        )
+        return None
+    except IDEMPOTENCY.meta.client.exceptions.ConditionalCheckFailedException:
+        pass
+
+    record = IDEMPOTENCY.get_item(Key=record_key, ConsistentRead=True).get("Item", {})
+
+    if record.get("bodyHash") != body_hash:
+        return {
+            "statusCode": 422,
+            "headers": CORS_HEADERS,
+            "body": json.dumps({"message": "Idempotency-Key reused with a different request"})
+        }
+    if record.get("status") == "COMPLETED":
+        return {
+            "statusCode": int(record["statusCode"]),
+            "headers": {**CORS_HEADERS, "Idempotent-Replayed": "true"},
+            "body": record["responseBody"]
+        }
+    return {
+        "statusCode": 409,
+        "headers": CORS_HEADERS,
+        "body": json.dumps({"message": "Request with this Idempotency-Key is in progress"})
+    }
+
+
+# COMPLETED record as a transaction item: it commits together with the write,
+# so a retry can never see the write without the response to replay.
+# Guarded by the claim token: if the lock expired and a retry re-claimed the
+# key, this write is cancelled instead of committing a second time
+def idempotency_completion_item(record_key, response, claim_token):
+    return {
+        "Update": {
+            "TableName": IDEMPOTENCY_TABLE,
+            "Key": record_key,
+            "UpdateExpression": "SET #s = :c, statusCode = :code, responseBody = :b, expiresAt = :exp",
+            "ConditionExpression": "claimToken = :t",
+            "ExpressionAttributeNames": {"#s": "status"},
+            "ExpressionAttributeValues": {
+                ":c": "COMPLETED",
+                ":code": response["statusCode"],
+                ":b": response["body"],
+                ":exp": int(time.time()) + IDEMPOTENCY_TTL,
+                ":t": claim_token
+            }
+        }
+    }
+
+
+def release_idempotency(record_key, claim_token):
+    try:
+        IDEMPOTENCY.delete_item(
+            Key=record_key,
+            ConditionExpression="claimToken = :t",
+            ExpressionAttributeValues={":t": claim_token}
+        )
+    except IDEMPOTENCY.meta.client.exceptions.ConditionalCheckFailedException:
+        pass  # re-claimed by a retry after the lock expired: not ours to release
+
+
 def handler(event, context):
+    _round_trips["count"] = 0
+    idem_key = None
+    claim_token = str(uuid.uuid4())
     try:
         if event.get("httpMethod") == "OPTIONS":
             return {"statusCode": 200, "headers": CORS_HEADERS, "body": ""}
@@ -71,6 +323,15 @@ def handler(event, context):
                 "body": json.dumps({"message": "Title required"})
             }
 
+        # =====================
+        # IDEMPOTENCY (retries replay the first response)
+        # =====================
+        idem_key = idempotency_record_key(event, user_sub, "POST /tasks")
+        if idem_key:
+            replay = claim_idempotency(idem_key, event.get("body"), claim_token)
+            if replay:
+                return replay
+
         description = body.get("description", "")
         category = body.get("category", "general")
         status = body.get("status", "todo").strip().lower()
@@ -96,8 +357,10 @@ def handler(event, context):
         # =====================
         # ADD MENTIONED USERS
         # =====================
+        subs = resolve_user_subs(mentioned_usernames)
+
         for u in mentioned_usernames:
-            sub = get_user_sub(u)
+            sub = subs[u]
             if not sub or sub in participant_ids:
                 continue
 
@@ -113,49 +376,91 @@ def handler(event, context):
         task_id = str(uuid.uuid4())
         now = datetime.utcnow().isoformat()
 
-        TASK_TABLE.put_item(
-            Item={
-                "pk": f"TASK#{task_id}",
-                "sk": "META",
-                "taskId": task_id,
-                "id": task_id,
-                "title": title,
-                "description": description,
-                "category": category,
-                "status": status,
-                "priority": priority,
-                "ownerId": user_sub,
-                "ownerName": username,
-                "participants": participants,
-                "participantIds": participant_ids,
-                "createdBy": username,
-                "createdAt": now,
-                "updatedBy": username,
-                "updatedAt": now
-            }
-        )
+        task = {
+            "pk": f"TASK#{task_id}",
+            "sk": "META",
+            "taskId": task_id,
+            "id": task_id,
+            "title": title,
+            "description": description,
+            "category": category,
+            "status": status,
+            "priority": priority,
+            "ownerId": user_sub,
+            "ownerName": username,
+            "participants": participants,
+            "participantIds": participant_ids,
+            "createdBy": username,
+            "createdAt": now,
+            "updatedBy": username,
+            "updatedAt": now,
+            "version": 1
+        }
+
+        response = {
+            "statusCode": 201,
+            "headers": CORS_HEADERS,
+            "body": json.dumps({
+                "message": "Task created",
+                "taskId": task_id
+            })
+        }
 
         # =====================
-        # AUDIT
+        # TASK + MEMBERSHIP + AUDIT (+ idempotency record) in one transaction
         # =====================
-        AUDIT_TABLE.put_item(
-            Item={
-                "pk": "AUDIT",
-                "sk": f"CREATE#{task_id}#{now}",
-                "action": "CREATE",
-                "taskId": task_id,
-                "taskTitle": title,
-                "createdBy": username,
-                "createdAt": now
+        transact_items = [{
+            "Put": {
+                "TableName": TASK_TABLE.name,
+                "Item": task,
+                "ConditionExpression": "attribute_not_exists(pk)"
             }
-        )
+        }]
+        transact_items += [
+            {"Put": {"TableName": TASK_TABLE.name, "Item": membership_item(task, sub, now)}}
+            for sub in participant_ids + [ALL_MEMBERS]
+        ]
+        transact_items.append({
+            "Put": {
+                "TableName": AUDIT_TABLE.name,
+                "Item": {
+                    **audit_key("CREATE", task_id, now),
+                    "action": "CREATE",
+                    "taskId": task_id,
+                    "taskTitle": title,
+                    "createdBy": username,
+                    "actor": username,  # AuditActorIndex
+                    "createdAt": now
+                }
+            }
+        })
+
+        if idem_key:
+            transact_items.append(idempotency_completion_item(idem_key, response, claim_token))
+
+        try:
+            dynamodb.meta.client.transact_write_items(TransactItems=transact_items)
+        except TransactionCanceled as e:
+            reasons = e.response.get("CancellationReasons", [])
+            if idem_key and reasons and reasons[-1].get("Code") == "ConditionalCheckFailed":
+                # lock expired and a retry owns the key now: it creates the task
+                idem_key = None
+                return {
+                    "statusCode": 409,
+                    "headers": CORS_HEADERS,
+                    "body": json.dumps({"message": "Request with this Idempotency-Key is in progress"})
+                }
+            raise
+
+        idem_key = None  # committed: the claim is now the replayable response
 
         # =====================
-        # MENTIONS
+        # MENTIONS (+ unread counters)
+        # the task exists from here on, so a failure is logged, not returned as 500
         # =====================
-        for u in mentioned_usernames:
-            MENTIONS_TABLE.put_item(
-                Item={
+        try:
+            write_mentions([
+                {
                     "pk": f"USER#{u}",
                     "sk": f"MENTION#{now}#{task_id}",
                     "taskId": task_id,
@@ -163,21 +468,23 @@ def handler(event, context):
                     "comment": "You were mentioned in task description",
                     "mentionedBy": username,
                     "status": "UNREAD",
+                    "unreadPk": f"USER#{u}",  # sparse UnreadMentionsIndex key, removed on read
                     "createdAt": now
                 }
-            )
+                for u in mentioned_usernames
+            ])
+        except Exception as e:
+            print("CREATE TASK MENTIONS ERROR:", task_id, str(e))
 
-        return {
-            "statusCode": 201,
-            "headers": CORS_HEADERS,
-            "body": json.dumps({
-                "message": "Task created",
-                "taskId": task_id
-            })
-        }
+        print("CREATE TASK DYNAMODB ROUND TRIPS:", _round_trips["count"])
+
+        response["headers"] = {**CORS_HEADERS, "X-DynamoDB-Round-Trips": str(_round_trips["count"])}
+        return response
 
     except Exception as e:
         print("CREATE TASK ERROR:", str(e))
+        if idem_key:
+            release_idempotency(idem_key, claim_token)
         return {
             "statusCode": 500,
             "headers": CORS_HEADERS,
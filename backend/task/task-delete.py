@@ -1,5 +1,7 @@
 import json
 import os
+import zlib
+import time
 import boto3
 from datetime import datetime
 
@@ -7,6 +9,41 @@ dynamodb = boto3.resource("dynamodb")
 TASK_TABLE = dynamodb.Table(os.environ["TASK_TABLE"])
 AUDIT_TABLE = dynamodb.Table(os.environ["AUDIT_TABLE"])
 
+# Audit records are spread over AUDIT_SHARDS partitions per day
+# (audit/audit-get-lambda.py reads them with the same AUDIT_SHARDS; never lower it)
+AUDIT_SHARDS = int(os.environ.get("AUDIT_SHARDS", "8"))
+
+# Comments + mentions of a deleted task are removed by task-cleanup.py
+sqs = boto3.client("sqs")
+CLEANUP_QUEUE_URL = os.environ["CLEANUP_QUEUE_URL"]
+
+# Tombstones let GET /tasks?since=... report deletions, then expire (TTL on expiresAt)
+TOMBSTONE_TTL_DAYS = int(os.environ.get("TOMBSTONE_TTL_DAYS", "30"))
+ALL_MEMBERS = "ALL"  # tombstone partition read by admins
+
+ConditionalCheckFailed = dynamodb.meta.client.exceptions.ConditionalCheckFailedException
+
+
+# Audit key: pk = AUDIT#<day>#<shard>, sk starts with the timestamp
+def audit_key(action, entity_id, ts):
+    sk = f"{ts}#{action}#{entity_id}"
+    return {"pk": f"AUDIT#{ts[:10]}#{zlib.crc32(sk.encode()) % AUDIT_SHARDS}", "sk": sk}
+
+
+# If-Match: "<version>" → expected version (None = no precondition)
+def if_match_version(event):
+    headers = {k.lower(): v for k, v in (event.get("headers") or {}).items()}
+    tag = (headers.get("if-match") or "").strip()
+    if not tag or tag == "*":
+        return None
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    try:
+        return int(tag.strip('"'))
+    except ValueError:
+        return -1  # unparseable → never matches
+
+
 def handler(event, context):
     now = datetime.utcnow().isoformat()
 
@@ -25,45 +62,103 @@ def handler(event, context):
     pk = f"TASK#{task_id}"
     sk = "META"
 
-    # 1️⃣ GET TASK (FAST – SINGLE READ)
-    res = TASK_TABLE.get_item(
-        Key={"pk": pk, "sk": sk}
-    )
+    # 1️⃣ DELETE + AUTH CHECK IN ONE CALL (no read first)
+    delete_kwargs = {
+        "Key": {"pk": pk, "sk": sk},
+        "ConditionExpression": "attribute_exists(pk)",
+        "ReturnValues": "ALL_OLD",
+        "ReturnValuesOnConditionCheckFailure": "ALL_OLD"
+    }
+    values = {}
+    if "admin" not in groups:
+        delete_kwargs["ConditionExpression"] += " AND ownerId = :uid"
+        values[":uid"] = user_id
 
-    task = res.get("Item")
-    if not task:
-        return {
-            "statusCode": 404,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"message": "Task not found"})
-        }
+    expected = if_match_version(event)
+    if expected is not None:
+        delete_kwargs["ExpressionAttributeNames"] = {"#v": "version"}
+    if expected == 0:
+        delete_kwargs["ConditionExpression"] += " AND attribute_not_exists(#v)"
+    elif expected is not None:
+        delete_kwargs["ConditionExpression"] += " AND #v = :ver"
+        values[":ver"] = expected
 
-    # 2️⃣ AUTH CHECK
-    if "admin" not in groups and task["ownerId"] != user_id:
+    if values:
+        delete_kwargs["ExpressionAttributeValues"] = values
+
+    try:
+        res = TASK_TABLE.delete_item(**delete_kwargs)
+    except ConditionalCheckFailed as e:
+        # 2️⃣ WHY IT FAILED: missing vs not the owner vs stale If-Match
+        current = e.response.get("Item")
+        if not current:
+            return {
+                "statusCode": 404,
+                "headers": {"Access-Control-Allow-Origin": "*"},
+                "body": json.dumps({"message": "Task not found"})
+            }
+        owner = current.get("ownerId", {}).get("S")
+        if expected is not None and ("admin" in groups or owner == user_id):
+            return {
+                "statusCode": 412,
+                "headers": {"Access-Control-Allow-Origin": "*"},
+                "body": json.dumps({"message": "Task was modified by someone else"})
+            }
         return {
             "statusCode": 403,
             "headers": {"Access-Control-Allow-Origin": "*"},
             "body": json.dumps({"message": "Not allowed to delete this task"})
         }
 
-    # 3️⃣ DELETE (FAST – SINGLE DELETE)
-    TASK_TABLE.delete_item(
-        Key={"pk": pk, "sk": sk}
-    )
+    task = res["Attributes"]
+
+    # the task is gone from here on: each follow-up step is attempted on its
+    # own and failures are logged, not returned as errors
+    # 3️⃣ MEMBERSHIP → TOMBSTONE (leaves MemberIndex, enters TombstoneIndex)
+    expires_at = int(time.time()) + TOMBSTONE_TTL_DAYS * 86400
+
+    try:
+        with TASK_TABLE.batch_writer() as batch:
+            for member_id in task.get("participantIds", []) + [ALL_MEMBERS]:
+                batch.put_item(
+                    Item={
+                        "pk": pk,
+                        "sk": f"MEMBER#{member_id}",
+                        "taskId": task_id,
+                        "tombstoneMemberId": member_id,
+                        "deleted": True,
+                        "updatedAt": now,
+                        "expiresAt": expires_at
+                    }
+                )
+    except Exception as e:
+        print("TASK DELETE TOMBSTONE ERROR:", task_id, str(e))
 
     # 4️⃣ AUDIT (OPTIONAL BUT SAFE)
-    AUDIT_TABLE.put_item(
-        Item={
-            "pk": "AUDIT",
-            "sk": f"DELETE#{task_id}#{now}",
-            "action": "DELETE",
-            "taskId": task_id,
-            "taskTitle": task.get("title"),
-            "deletedBy": username,
-            "deletedAt": now,
-            "createdAt": now
-        }
-    )
+    try:
+        AUDIT_TABLE.put_item(
+            Item={
+                **audit_key("DELETE", task_id, now),
+                "action": "DELETE",
+                "taskId": task_id,
+                "taskTitle": task.get("title"),
+                "deletedBy": username,
+                "actor": username,  # AuditActorIndex
+                "deletedAt": now,
+                "createdAt": now
+            }
+        )
+    except Exception as e:
+        print("TASK DELETE AUDIT ERROR:", task_id, str(e))
+
+    # 5️⃣ CASCADE (async: comments + mentions)
+    try:
+        sqs.send_message(
+            QueueUrl=CLEANUP_QUEUE_URL,
+            MessageBody=json.dumps({"type": "TASK_DELETED", "taskId": task_id})
+        )
+    except Exception as e:
+        print("TASK DELETE CLEANUP ENQUEUE ERROR:", task_id, str(e))
 
     return {
         "statusCode": 200,
@@ -0,0 +1,137 @@
+import io
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import importlib.util
+from types import SimpleNamespace
+
+# =========================
+# Import throughput on a local stand-in: task-import.py's import_tasks()
+# against an in-memory DynamoDB client with injected per-call latency,
+# optional UnprocessedItems and failing chunks (which must roll back).
+#
+#   python task-import-bench.py --rows 2000 --latency-ms 20 --workers 1 4 8 16
+#   python task-import-bench.py --rows 500 --fail-rate 0.05
+# =========================
+
+
+class FakeClient:
+    """batch_write_item / transact_write_items over a dict, with latency."""
+
+    def __init__(self, latency, unprocessed_rate, fail_rate, seed=7):
+        self.latency = latency
+        self.unprocessed_rate = unprocessed_rate
+        self.fail_rate = fail_rate
+        self.items = {}
+        self.calls = 0
+        self.lock = threading.Lock()
+        self.random = random.Random(seed)
+
+    def batch_write_item(self, RequestItems):
+        time.sleep(self.latency)
+        with self.lock:
+            self.calls += 1
+            unprocessed = {}
+            puts = any("PutRequest" in r for reqs in RequestItems.values() for r in reqs)
+            if puts and self.random.random() < self.fail_rate:
+                # half the request lands, then the call fails
+                for table, reqs in RequestItems.items():
+                    for r in reqs[:len(reqs) // 2]:
+                        self.apply(table, r)
+                raise RuntimeError("injected BatchWriteItem failure")
+
+            for table, reqs in RequestItems.items():
+                for r in reqs:
+                    if self.random.random() < self.unprocessed_rate:
+                        unprocessed.setdefault(table, []).append(r)
+                    else:
+                        self.apply(table, r)
+            return {"UnprocessedItems": unprocessed}
+
+    def transact_write_items(self, TransactItems):
+        time.sleep(self.latency)
+        with self.lock:
+            self.calls += 1
+            for op in TransactItems:
+                if "Put" in op:
+                    self.apply(op["Put"]["TableName"], {"PutRequest": {"Item": op["Put"]["Item"]}})
+        return {}
+
+    def apply(self, table, request):
+        if "PutRequest" in request:
+            item = request["PutRequest"]["Item"]
+            self.items[(table, item["pk"], item["sk"])] = item
+        else:
+            key = request["DeleteRequest"]["Key"]
+            self.items.pop((table, key["pk"], key["sk"]), None)
+
+
+def load_task_import():
+    for name in ("TASK_TABLE", "AUDIT_TABLE", "MENTIONS_TABLE", "USER_POOL_ID"):
+        os.environ.setdefault(name, f"bench-{name.lower()}")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ.pop("USER_DIRECTORY_TABLE", None)
+
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "task-import.py")
+    spec = importlib.util.spec_from_file_location("task_import", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    # resolver stand-in: every mentioned username exists
+    module.resolve_user_subs = lambda names: {u: f"sub-{u}" for u in names}
+    return module
+
+
+def ndjson_rows(n, mention_every):
+    lines = []
+    for i in range(n):
+        description = f"Imported task {i}"
+        if mention_every and i % mention_every == 0:
+            description += f" for @user{i % 20} and @user{(i + 7) % 20}"
+        lines.append(json.dumps({"title": f"Task {i}", "description": description, "priority": "low"}))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="task-import throughput on a local stand-in")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--mention-every", type=int, default=5)
+    parser.add_argument("--unprocessed-rate", type=float, default=0.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    task_import = load_task_import()
+    body = ndjson_rows(args.rows, args.mention_every)
+
+    print(f"{args.rows} rows, {args.latency_ms:.0f} ms per call")
+    for workers in args.workers:
+        client = FakeClient(args.latency_ms / 1000, args.unprocessed_rate, args.fail_rate)
+        task_import.dynamodb = SimpleNamespace(meta=SimpleNamespace(client=client))
+        task_import.IMPORT_WORKERS = workers
+
+        result = task_import.import_tasks(io.StringIO(body), "ndjson", "sub-owner", "owner")
+
+        # rows reported as error must have left nothing behind
+        failed = {r["row"] for r in result["rows"] if r["status"] != "created"}
+        created_ids = {r["taskId"] for r in result["rows"] if r["status"] == "created"}
+        metas = {it["taskId"] for (_, _, sk), it in client.items.items() if sk == "META"}
+        leaked = metas - created_ids
+
+        print(
+            f"workers {workers:>3}: {result['tasksPerSecond']:>8} tasks/s  "
+            f"{client.calls:>5} calls  {len(failed)} failed rows  {len(leaked)} leaked tasks"
+        )
+        if leaked or len(metas) != len(created_ids):
+            print("MISMATCH")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
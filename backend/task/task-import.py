@@ -0,0 +1,495 @@
+import json
+import os
+import zlib
+import io
+import csv
+import sys
+import re
+import time
+import uuid
+import argparse
+import boto3
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+dynamodb = boto3.resource("dynamodb")
+cognito = boto3.client("cognito-idp")
+
+TASK_TABLE = os.environ["TASK_TABLE"]
+AUDIT_TABLE = os.environ["AUDIT_TABLE"]
+MENTIONS_TABLE = os.environ["MENTIONS_TABLE"]
+
+# Audit records are spread over AUDIT_SHARDS partitions per day
+# (audit/audit-get-lambda.py reads them with the same AUDIT_SHARDS; never lower it)
+AUDIT_SHARDS = int(os.environ.get("AUDIT_SHARDS", "8"))
+
+USER_POOL_ID = os.environ["USER_POOL_ID"]
+
+# username → sub cache (lives as long as the container)
+USER_DIRECTORY_TABLE = os.environ.get("USER_DIRECTORY_TABLE")
+SUB_CACHE_TTL = int(os.environ.get("SUB_CACHE_TTL", "300"))
+SUB_CACHE_NEGATIVE_TTL = int(os.environ.get("SUB_CACHE_NEGATIVE_TTL", "30"))
+SUB_CACHE_SIZE = 1024
+_sub_cache = OrderedDict()
+
+MENTION_REGEX = r'@([a-zA-Z0-9_.-]+)'
+
+ALL_MEMBERS = "ALL"  # admin membership / tombstone partition
+
+# per-user unread counter item (pk=USER#<username>), read by mentions/unread-count.py
+UNREAD_COUNT_SK = "UNREAD_COUNT"
+
+MAX_IMPORT_ROWS = 5000
+ROW_FIELDS = ("title", "description", "category", "status", "priority")
+IMPORT_WORKERS = int(os.environ.get("IMPORT_WORKERS", "8"))
+BATCH_MAX_RETRIES = 8
+
+CORS_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Authorization,Content-Type",
+    "Access-Control-Allow-Methods": "OPTIONS,POST"
+}
+
+# -------------------------
+# Helper: username → sub (Cognito lookup)
+# (this and the resolver below: one copy per handler,
+#  kept identical by shared-helpers-check.py)
+# -------------------------
+def get_user_sub(username):
+    resp = cognito.list_users(
+        UserPoolId=USER_POOL_ID,
+        Filter=f'username = "{username}"'
+    )
+    users = resp.get("Users", [])
+    if not users:
+        return None
+
+    for attr in users[0]["Attributes"]:
+        if attr["Name"] == "sub":
+            return attr["Value"]
+    return None
+
+
+# -------------------------
+# Helper: batched username → sub resolver
+# per-container LRU with TTL, "not found" cached briefly,
+# user directory table first, Cognito only for what is left
+# -------------------------
+def directory_user_subs(usernames):
+    found = {}
+    if not USER_DIRECTORY_TABLE:
+        return found
+
+    names = list(usernames)
+    for i in range(0, len(names), 100):
+        request = {
+            USER_DIRECTORY_TABLE: {
+                "Keys": [{"pk": f"USER#{u}", "sk": "PROFILE"} for u in names[i:i + 100]],
+                "ProjectionExpression": "username, #s",
+                "ExpressionAttributeNames": {"#s": "sub"}
+            }
+        }
+        attempt = 0
+
+        while request:
+            resp = dynamodb.batch_get_item(RequestItems=request)
+            for item in resp.get("Responses", {}).get(USER_DIRECTORY_TABLE, []):
+                found[item["username"]] = item["sub"]
+
+            request = resp.get("UnprocessedKeys") or None
+            if request:
+                time.sleep(min(0.05 * (2 ** attempt), 1))
+                attempt += 1
+
+    return found
+
+
+def resolve_user_subs(usernames):
+    now = time.time()
+    result = {}
+    misses = []
+
+    for u in set(usernames):
+        hit = _sub_cache.get(u)
+        if hit and hit[1] > now:
+            _sub_cache.move_to_end(u)
+            result[u] = hit[0]
+        else:
+            misses.append(u)
+
+    if misses:
+        found = directory_user_subs(misses)
+
+        for u in misses:
+            sub = found.get(u)
+            if sub is None:
+                sub = get_user_sub(u)
+                # write-through so the next container finds it in the directory
+                if sub and USER_DIRECTORY_TABLE:
+                    dynamodb.Table(USER_DIRECTORY_TABLE).put_item(
+                        Item={"pk": f"USER#{u}", "sk": "PROFILE", "username": u, "sub": sub}
+                    )
+
+            ttl = SUB_CACHE_TTL if sub else SUB_CACHE_NEGATIVE_TTL
+            _sub_cache[u] = (sub, now + ttl)
+            _sub_cache.move_to_end(u)
+            result[u] = sub
+
+        while len(_sub_cache) > SUB_CACHE_SIZE:
+            _sub_cache.popitem(last=False)
+
+    return result
+
+
+# -------------------------
+# Helper: audit key (pk = AUDIT#<day>#<shard>, sk starts with the timestamp)
+# -------------------------
+def audit_key(action, entity_id, ts):
+    sk = f"{ts}#{action}#{entity_id}"
+    return {"pk": f"AUDIT#{ts[:10]}#{zlib.crc32(sk.encode()) % AUDIT_SHARDS}", "sk": sk}
+
+# -------------------------
+# Helper: membership item (feeds MemberIndex + filter GSIs)
+# (one copy per handler, kept identical by shared-helpers-check.py)
+# -------------------------
+def membership_item(task, member_id, now):
+    status = task.get("status", "todo")
+    priority = task.get("priority", "medium")
+    category = task.get("category", "general")
+    return {
+        "pk": f"TASK#{task['taskId']}",
+        "sk": f"MEMBER#{member_id}",
+        "taskId": task["taskId"],
+        "memberId": member_id,
+        "updatedAt": now,
+        "status": status,
+        "priority": priority,
+        "category": category,
+        # composite partition keys for the filter GSIs
+        "memberStatus": f"{member_id}#STATUS#{status}",
+        "memberPriority": f"{member_id}#PRIORITY#{priority}",
+        "memberCategory": f"{member_id}#CATEGORY#{category}",
+        "memberStatusPriority": f"{member_id}#STATUS#{status}#PRIORITY#{priority}"
+    }
+
+# -------------------------
+# Parse NDJSON or CSV lazily, one row dict at a time
+# -------------------------
+def iter_rows(stream, fmt):
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+        return
+
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+# -------------------------
+# Row → all items it needs (task, memberships, audit) + its mentions
+# -------------------------
+def build_row_items(row, owner_sub, owner_name, subs, now):
+    task_id = str(uuid.uuid4())
+    title = (row.get("title") or "").strip()
+    description = row.get("description") or ""
+
+    mentioned = sorted(set(
+        u for u in re.findall(MENTION_REGEX, description) if u != owner_name
+    ))
+
+    participants = [{"userId": owner_sub, "userName": owner_name}]
+    participant_ids = [owner_sub]
+    for u in mentioned:
+        sub = subs.get(u)
+        if sub and sub not in participant_ids:
+            participants.append({"userId": sub, "userName": u})
+            participant_ids.append(sub)
+
+    task = {
+        "pk": f"TASK#{task_id}",
+        "sk": "META",
+        "taskId": task_id,
+        "id": task_id,
+        "title": title,
+        "description": description,
+        "category": row.get("category") or "general",
+        "status": (row.get("status") or "todo").strip().lower(),
+        "priority": row.get("priority") or "medium",
+        "ownerId": owner_sub,
+        "ownerName": owner_name,
+        "participants": participants,
+        "participantIds": participant_ids,
+        "createdBy": owner_name,
+        "createdAt": now,
+        "updatedBy": owner_name,
+        "updatedAt": now,
+        "version": 1
+    }
+
+    items = [(TASK_TABLE, task)]
+    items += [
+        (TASK_TABLE, membership_item(task, sub, now))
+        for sub in participant_ids + [ALL_MEMBERS]
+    ]
+    items.append((AUDIT_TABLE, {
+        **audit_key("CREATE", task_id, now),
+        "action": "CREATE",
+        "taskId": task_id,
+        "taskTitle": title,
+        "createdBy": owner_name,
+        "actor": owner_name,  # AuditActorIndex
+        "createdAt": now,
+        "source": "IMPORT"
+    }))
+    mentions = [
+        {
+            "pk": f"USER#{u}",
+            "sk": f"MENTION#{now}#{task_id}",
+            "taskId": task_id,
+            "taskTitle": title,
+            "comment": "You were mentioned in task description",
+            "mentionedBy": owner_name,
+            "status": "UNREAD",
+            "unreadPk": f"USER#{u}",  # sparse UnreadMentionsIndex key, removed on read
+            "createdAt": now
+        }
+        for u in mentioned
+    ]
+    return task_id, items, mentions
+
+
+# -------------------------
+# Pack rows into BatchWriteItem chunks (max 25 puts, any tables)
+# a row is never split across chunks: one that alone needs more than
+# 25 puts becomes its own chunk, written in 25-put requests
+# -------------------------
+def pack_chunks(row_units):
+    chunks = []
+    current, rows = [], []
+
+    for row_no, items in row_units:
+        if current and len(current) + len(items) > 25:
+            chunks.append((current, rows))
+            current, rows = [], []
+        current.extend(items)
+        rows.append(row_no)
+
+    if current:
+        chunks.append((current, rows))
+    return chunks
+
+
+def batch_write(requests):
+    request = {}
+    for table, req in requests:
+        request.setdefault(table, []).append(req)
+
+    attempt = 0
+    while request:
+        resp = dynamodb.meta.client.batch_write_item(RequestItems=request)
+        request = resp.get("UnprocessedItems") or None
+        if request:
+            if attempt >= BATCH_MAX_RETRIES:
+                raise RuntimeError(f"Unprocessed items left after {attempt} retries")
+            time.sleep(min(0.05 * (2 ** attempt), 1))
+            attempt += 1
+
+
+# -------------------------
+# Write one chunk; None, or the error message for its rows.
+# BatchWriteItem is not atomic, so a failed chunk deletes every put it
+# made: a row reported as error leaves nothing behind and can be re-imported
+# -------------------------
+def write_chunk(items):
+    try:
+        for i in range(0, len(items), 25):
+            batch_write([(t, {"PutRequest": {"Item": it}}) for t, it in items[i:i + 25]])
+        return None
+    except Exception as e:
+        print("IMPORT CHUNK ERROR:", str(e))
+
+    try:
+        for i in range(0, len(items), 25):
+            batch_write([
+                (t, {"DeleteRequest": {"Key": {"pk": it["pk"], "sk": it["sk"]}}})
+                for t, it in items[i:i + 25]
+            ])
+        return "Write failed"
+    except Exception as e:
+        print("IMPORT ROLLBACK ERROR:", str(e))
+        return "Write failed, rollback incomplete"
+
+
+# -------------------------
+# One user's mentions + unread counter, atomically
+# (≤99 puts and ONE ADD per transaction; a user's chunks run serially,
+# so their counter is never in two transactions at once)
+# -------------------------
+def write_user_mentions(mentions):
+    for i in range(0, len(mentions), 99):
+        chunk = mentions[i:i + 99]
+        transact_items = [
+            {
+                "Put": {
+                    "TableName": MENTIONS_TABLE,
+                    "Item": m,
+                    "ConditionExpression": "attribute_not_exists(sk)"
+                }
+            }
+            for m in chunk
+        ]
+        transact_items.append({
+            "Update": {
+                "TableName": MENTIONS_TABLE,
+                "Key": {"pk": chunk[0]["pk"], "sk": UNREAD_COUNT_SK},
+                "UpdateExpression": "ADD unreadCount :n",
+                "ExpressionAttributeValues": {":n": len(chunk)}
+            }
+        })
+        dynamodb.meta.client.transact_write_items(TransactItems=transact_items)
+
+
+# -------------------------
+# Import: parse → one resolver pass → parallel batched writes
+# -------------------------
+def import_tasks(stream, fmt, owner_sub, owner_name):
+    started = time.perf_counter()
+    now = datetime.utcnow().isoformat()
+    report = {}
+    rows = []
+
+    for row_no, row in enumerate(iter_rows(stream, fmt), start=1):
+        if row_no > MAX_IMPORT_ROWS:
+            report[row_no] = {"row": row_no, "status": "error", "message": "Row limit exceeded"}
+            break
+        if not isinstance(row, dict):
+            report[row_no] = {"row": row_no, "status": "error", "message": "Invalid row"}
+            continue
+        wrong = [f for f in ROW_FIELDS if row.get(f) is not None and not isinstance(row[f], str)]
+        if wrong:
+            report[row_no] = {"row": row_no, "status": "error", "message": f"{wrong[0]} must be a string"}
+            continue
+        if not (row.get("title") or "").strip():
+            report[row_no] = {"row": row_no, "status": "error", "message": "Title required"}
+            continue
+        rows.append((row_no, row))
+
+    # every mentioned username, deduplicated, resolved once
+    usernames = {
+        u
+        for _, row in rows
+        for u in re.findall(MENTION_REGEX, row.get("description") or "")
+    }
+    subs = resolve_user_subs(usernames)
+
+    row_units = []
+    row_mentions = {}
+    for row_no, row in rows:
+        task_id, items, mentions = build_row_items(row, owner_sub, owner_name, subs, now)
+        report[row_no] = {"row": row_no, "status": "created", "taskId": task_id}
+        row_units.append((row_no, items))
+        row_mentions[row_no] = mentions
+
+    chunks = pack_chunks(row_units)
+    with ThreadPoolExecutor(max_workers=IMPORT_WORKERS) as pool:
+        futures = [(pool.submit(write_chunk, items), row_nos) for items, row_nos in chunks]
+
+        for future, row_nos in futures:
+            error = future.result()
+            if error:
+                for row_no in row_nos:
+                    report[row_no] = {"row": row_no, "status": "error", "message": error}
+
+        # mentions of the created tasks only, one serial writer per user
+        by_user = {}
+        for row_no, mentions in row_mentions.items():
+            if report[row_no]["status"] == "created":
+                for m in mentions:
+                    by_user.setdefault(m["pk"], []).append(m)
+
+        futures = [pool.submit(write_user_mentions, ms) for ms in by_user.values()]
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                # the tasks exist; only their mention notifications are missing
+                print("IMPORT MENTIONS ERROR:", str(e))
+
+    elapsed = time.perf_counter() - started
+    results = [report[n] for n in sorted(report)]
+    created = sum(1 for r in results if r["status"] == "created")
+
+    return {
+        "created": created,
+        "failed": len(results) - created,
+        "seconds": round(elapsed, 3),
+        "tasksPerSecond": round(created / elapsed, 1) if elapsed else None,
+        "rows": results
+    }
+
+
+def handler(event, context):
+    try:
+        if event.get("httpMethod") == "OPTIONS":
+            return {"statusCode": 200, "headers": CORS_HEADERS, "body": ""}
+
+        claims = event["requestContext"]["authorizer"]["jwt"]["claims"]
+        user_sub = claims["sub"]
+        username = (
+            claims.get("cognito:username")
+            or claims.get("username")
+            or claims.get("email")
+            or "unknown"
+        )
+
+        headers = {k.lower(): v for k, v in (event.get("headers") or {}).items()}
+        params = event.get("queryStringParameters") or {}
+        fmt = params.get("format") or (
+            "csv" if "csv" in headers.get("content-type", "") else "ndjson"
+        )
+
+        result = import_tasks(io.StringIO(event.get("body") or ""), fmt, user_sub, username)
+        print("IMPORT DONE:", result["created"], "created,", result["failed"], "failed,",
+              result["tasksPerSecond"], "tasks/s")
+
+        return {
+            "statusCode": 200,
+            "headers": CORS_HEADERS,
+            "body": json.dumps(result)
+        }
+
+    except Exception as e:
+        print("IMPORT TASKS ERROR:", str(e))
+        return {
+            "statusCode": 500,
+            "headers": CORS_HEADERS,
+            "body": json.dumps({"message": "Failed to import tasks"})
+        }
+
+
+# -------------------------
+# Local CLI: python task-import.py tasks.ndjson --owner-sub ... --owner-name ...
+# -------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import tasks from NDJSON or CSV")
+    parser.add_argument("file", help="path to .ndjson / .csv, or - for stdin")
+    parser.add_argument("--format", choices=["ndjson", "csv"])
+    parser.add_argument("--owner-sub", required=True)
+    parser.add_argument("--owner-name", required=True)
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.file.endswith(".csv") else "ndjson")
+    if args.file == "-":
+        result = import_tasks(sys.stdin, fmt, args.owner_sub, args.owner_name)
+    else:
+        with open(args.file, newline="") as f:
+            result = import_tasks(f, fmt, args.owner_sub, args.owner_name)
+
+    print(json.dumps(result, indent=2))
@@ -0,0 +1,94 @@
+import os
+import sys
+import json
+import time
+import argparse
+import importlib.util
+from decimal import Decimal
+
+# =========================
+# Response encoding benchmark: decimal_to_native() walk + json.dumps
+# (the old path) vs a single json.dumps(default=json_default) pass.
+#
+#   python task-list-json-bench.py --tasks 10000 --rounds 5
+# =========================
+
+
+def decimal_to_native(obj):
+    # previous task-list.py implementation, kept here for comparison
+    if isinstance(obj, list):
+        return [decimal_to_native(i) for i in obj]
+    elif isinstance(obj, dict):
+        return {k: decimal_to_native(v) for k, v in obj.items()}
+    elif isinstance(obj, Decimal):
+        return int(obj) if obj % 1 == 0 else float(obj)
+    else:
+        return obj
+
+
+def load_task_list():
+    os.environ.setdefault("TASK_TABLE", "bench-tasks")
+    os.environ.setdefault("CURSOR_SECRET", "bench")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "task-list.py")
+    spec = importlib.util.spec_from_file_location("task_list", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def fake_tasks(n):
+    # shaped like resource-layer META items: numbers come back as Decimal
+    return [
+        {
+            "pk": f"TASK#{i}",
+            "sk": "META",
+            "taskId": str(i),
+            "title": f"Task {i}",
+            "description": "Lorem ipsum dolor sit amet " * 4,
+            "status": "todo",
+            "priority": "medium",
+            "category": "general",
+            "ownerId": "owner-sub",
+            "participantIds": ["owner-sub", f"user-{i % 50}"],
+            "commentCount": Decimal(i % 20),
+            "version": Decimal(3),
+            "estimate": Decimal("1.5"),
+            "createdAt": "2024-01-01T00:00:00",
+            "updatedAt": f"2024-01-01T00:00:{i % 60:02d}"
+        }
+        for i in range(n)
+    ]
+
+
+def best_of(rounds, fn):
+    best = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        out = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="task-list JSON encoding: walk + dumps vs default=")
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    task_list = load_task_list()
+    body = {"tasks": fake_tasks(args.tasks), "nextCursor": None}
+
+    old, old_out = best_of(args.rounds, lambda: json.dumps(decimal_to_native(body)))
+    new, new_out = best_of(args.rounds, lambda: json.dumps(body, default=task_list.json_default))
+    assert json.loads(old_out) == json.loads(new_out)
+
+    print(f"{args.tasks} tasks, {len(new_out) / 1024:.0f} KiB body, best of {args.rounds}")
+    print(f"decimal_to_native + dumps: {old * 1000:8.1f} ms")
+    print(f"dumps(default=)          : {new * 1000:8.1f} ms  speedup x{old / new:.1f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
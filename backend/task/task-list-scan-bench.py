@@ -0,0 +1,103 @@
+import os
+import sys
+import time
+import argparse
+import importlib.util
+from types import SimpleNamespace
+
+# =========================
+# Admin listing benchmark: serial scan vs parallel segmented scan.
+#
+# Loads the real task-list.py and swaps its DynamoDB handle for a local fake
+# that serves Scan pages (1 MB worth of items each) with injected per-call
+# latency, so wall time is dominated by round trips just like in Lambda.
+#
+#   python task-list-scan-bench.py --tasks 20000 --latency-ms 25
+# =========================
+
+ITEM_BYTES = 1500            # typical META item
+PAGE_ITEMS = (1024 * 1024) // ITEM_BYTES
+
+
+class FakeScanClient:
+    """Scan with Segment / TotalSegments, paged like DynamoDB, with latency."""
+
+    def __init__(self, items, latency):
+        self.items = items
+        self.latency = latency
+        self.calls = 0
+
+    def scan(self, Segment=0, TotalSegments=1, ExclusiveStartKey=None, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+
+        segment = self.items[Segment::TotalSegments]
+        start = ExclusiveStartKey["i"] if ExclusiveStartKey else 0
+        page = segment[start:start + PAGE_ITEMS]
+
+        resp = {"Items": page}
+        if start + PAGE_ITEMS < len(segment):
+            resp["LastEvaluatedKey"] = {"i": start + PAGE_ITEMS}
+        return resp
+
+
+def load_task_list():
+    os.environ.setdefault("TASK_TABLE", "bench-tasks")
+    os.environ.setdefault("CURSOR_SECRET", "bench")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "task-list.py")
+    spec = importlib.util.spec_from_file_location("task_list", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def fake_tasks(n):
+    return [
+        {
+            "pk": f"TASK#{i}",
+            "sk": "META",
+            "taskId": str(i),
+            "title": f"Task {i}",
+            "status": "todo",
+            "updatedAt": f"2024-01-01T00:00:{i % 60:02d}.{i:06d}"
+        }
+        for i in range(n)
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Admin listing: serial vs segmented scan")
+    parser.add_argument("--tasks", type=int, default=20000)
+    parser.add_argument("--latency-ms", type=float, default=25)
+    parser.add_argument("--segments", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args(argv)
+
+    task_list = load_task_list()
+    items = fake_tasks(args.tasks)
+
+    print(f"{args.tasks} tasks, {PAGE_ITEMS} items/page, {args.latency_ms:.0f} ms per Scan call")
+    baseline = None
+    for segments in args.segments:
+        client = FakeScanClient(items, args.latency_ms / 1000)
+        task_list.dynamodb = SimpleNamespace(meta=SimpleNamespace(client=client))
+        task_list.ADMIN_SCAN_SEGMENTS = segments
+
+        started = time.perf_counter()
+        tasks = task_list.scan_all_tasks({})
+        elapsed = time.perf_counter() - started
+
+        assert len(tasks) == args.tasks
+        assert all(
+            task_list.sort_key(a) >= task_list.sort_key(b) for a, b in zip(tasks, tasks[1:])
+        )
+        baseline = baseline or elapsed
+        print(
+            f"segments {segments:>3}: {elapsed * 1000:8.1f} ms  "
+            f"{client.calls:>4} scan calls  speedup x{baseline / elapsed:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,28 +1,297 @@
 import json
 import os
+import time
+import base64
+import hmac
+import hashlib
+import heapq
+from concurrent.futures import ThreadPoolExecutor
 import boto3
 from decimal import Decimal
+from datetime import datetime, timedelta, timezone
+from boto3.dynamodb.conditions import Key, Attr
+from boto3.dynamodb.types import Binary
 
 dynamodb = boto3.resource("dynamodb")
-table = dynamodb.Table(os.environ["TASK_TABLE"])
+TASK_TABLE_NAME = os.environ["TASK_TABLE"]
+table = dynamodb.Table(TASK_TABLE_NAME)
+
+# GSI over membership items (pk=TASK#id, sk=MEMBER#sub)
+# partition key: memberId, sort key: updatedAt
+MEMBER_INDEX = os.environ.get("MEMBER_INDEX", "MemberIndex")
+
+# Filter GSIs over the same membership items, sort key: updatedAt,
+# projection: INCLUDE status, priority, category (for residual filters).
+# Most specific first: (filters covered, index name, partition attribute)
+FILTER_INDEXES = [
+    (("status", "priority"), "MemberStatusPriorityIndex", "memberStatusPriority"),
+    (("status",), "MemberStatusIndex", "memberStatus"),
+    (("priority",), "MemberPriorityIndex", "memberPriority"),
+    (("category",), "MemberCategoryIndex", "memberCategory")
+]
+FILTER_FIELDS = ("status", "priority", "category")
+
+# GSI over tombstones left by task-delete (tombstoneMemberId, updatedAt)
+TOMBSTONE_INDEX = os.environ.get("TOMBSTONE_INDEX", "TombstoneIndex")
+ALL_MEMBERS = "ALL"  # membership / tombstone partition read by admins
+
+# updatedAt comes from the writers' clocks: a write that commits after a
+# watermark can carry an older timestamp, so delta queries reach back this far
+# (clients dedupe the overlap by version)
+DELTA_SKEW_SECONDS = int(os.environ.get("DELTA_SKEW_SECONDS", "5"))
+
+# Signs pagination cursors so clients cannot forge ExclusiveStartKeys
+CURSOR_SECRET = os.environ["CURSOR_SECRET"].encode()
+MAX_PAGE_SIZE = 100
+
+# Admin full listing (no limit/cursor): parallel segmented scan (Segment / TotalSegments)
+ADMIN_SCAN_SEGMENTS = int(os.environ.get("ADMIN_SCAN_SEGMENTS", "8"))
 
 CORS_HEADERS = {
     "Content-Type": "application/json",
-    "Access-Control-Allow-Origin": "*"
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Expose-Headers": "ETag"
 }
 
 # ======================================================
-# 🔧 Decimal → JSON safe conversion (REQUIRED FIX)
+# 🔧 DynamoDB types → JSON in the same pass as json.dumps
+# (Decimal → int/float, set → list, Binary → base64)
 # ======================================================
-def decimal_to_native(obj):
-    if isinstance(obj, list):
-        return [decimal_to_native(i) for i in obj]
-    elif isinstance(obj, dict):
-        return {k: decimal_to_native(v) for k, v in obj.items()}
-    elif isinstance(obj, Decimal):
+def json_default(obj):
+    if isinstance(obj, Decimal):
         return int(obj) if obj % 1 == 0 else float(obj)
-    else:
-        return obj
+    if isinstance(obj, (set, frozenset)):
+        # convert first: Binary elements do not order
+        return sorted(json_default(v) if isinstance(v, (Decimal, Binary)) else v for v in obj)
+    if isinstance(obj, Binary):
+        return base64.b64encode(obj.value).decode()
+    raise TypeError(f"Not JSON serializable: {type(obj).__name__}")
+
+
+# ======================================================
+# 🔏 Opaque signed cursor <-> DynamoDB key
+# ======================================================
+def encode_cursor(kind, key):
+    payload = base64.urlsafe_b64encode(
+        json.dumps({"k": kind, "v": key}, separators=(",", ":")).encode()
+    ).decode().rstrip("=")
+    sig = hmac.new(CURSOR_SECRET, payload.encode(), hashlib.sha256).hexdigest()[:32]
+    return f"{payload}.{sig}"
+
+
+def decode_cursor(cursor, kind):
+    try:
+        payload, sig = cursor.split(".", 1)
+        expected = hmac.new(CURSOR_SECRET, payload.encode(), hashlib.sha256).hexdigest()[:32]
+        if not hmac.compare_digest(sig, expected):
+            return None
+        data = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return data["v"] if data.get("k") == kind else None
+    except Exception:
+        return None
+
+
+# ======================================================
+# 🎯 Pick the GSI covering the most filters, rest → FilterExpression
+# ======================================================
+def member_query(user_id, filters):
+    for fields, index, attr in FILTER_INDEXES:
+        if all(f in filters for f in fields):
+            value = user_id + "".join(f"#{f.upper()}#{filters[f]}" for f in fields)
+            rest = [f for f in filters if f not in fields]
+            return index, Key(attr).eq(value), rest
+
+    return MEMBER_INDEX, Key("memberId").eq(user_id), []
+
+
+def filter_expression(filters, fields):
+    expr = None
+    for f in fields:
+        cond = Attr(f).eq(filters[f])
+        expr = cond if expr is None else expr & cond
+    return expr
+
+
+# ======================================================
+# 👥 MEMBERSHIP INDEX → task ids (updatedAt order)
+# limit=None reads every page, otherwise stops after `limit` ids
+# ======================================================
+def query_member_task_ids(user_id, filters, descending=True, limit=None, start_key=None):
+    task_ids = []
+    index, key_condition, rest = member_query(user_id, filters)
+    query_kwargs = {
+        "IndexName": index,
+        "KeyConditionExpression": key_condition,
+        "ScanIndexForward": not descending
+    }
+    if rest:
+        query_kwargs["FilterExpression"] = filter_expression(filters, rest)
+    if start_key:
+        query_kwargs["ExclusiveStartKey"] = start_key
+
+    while True:
+        if limit:
+            query_kwargs["Limit"] = limit - len(task_ids)
+
+        resp = table.query(**query_kwargs)
+        task_ids.extend(i["pk"].split("#", 1)[1] for i in resp.get("Items", []))
+
+        last_key = resp.get("LastEvaluatedKey")
+        if not last_key or (limit and len(task_ids) >= limit):
+            return task_ids, last_key
+        query_kwargs["ExclusiveStartKey"] = last_key
+
+
+# ======================================================
+# 📦 BATCH GET task META items (100 keys per call)
+# ======================================================
+def batch_get_tasks(task_ids):
+    found = {}
+
+    for i in range(0, len(task_ids), 100):
+        request = {
+            TASK_TABLE_NAME: {
+                "Keys": [
+                    {"pk": f"TASK#{t}", "sk": "META"}
+                    for t in task_ids[i:i + 100]
+                ]
+            }
+        }
+
+        attempt = 0
+        while request:
+            resp = dynamodb.batch_get_item(RequestItems=request)
+            for item in resp.get("Responses", {}).get(TASK_TABLE_NAME, []):
+                found[item["taskId"]] = item
+
+            request = resp.get("UnprocessedKeys") or None
+            if request:
+                time.sleep(min(0.05 * (2 ** attempt), 1))
+                attempt += 1
+
+    # keep index order, drop ids whose META is gone
+    return [found[t] for t in task_ids if t in found]
+
+
+def sort_key(task):
+    return (task.get("updatedAt", task.get("createdAt", "")), task.get("taskId", ""))
+
+
+# ======================================================
+# 🧵 ADMIN: one scan segment → its META items, sorted
+# uses the client (thread-safe) rather than the Table resource
+# ======================================================
+def scan_segment(segment, total_segments, filters, descending=True):
+    tasks = []
+    condition = Attr("sk").eq("META")
+    if filters:
+        condition = condition & filter_expression(filters, filters)
+
+    scan_kwargs = {
+        "TableName": TASK_TABLE_NAME,
+        "Segment": segment,
+        "TotalSegments": total_segments,
+        "FilterExpression": condition
+    }
+
+    while True:
+        resp = dynamodb.meta.client.scan(**scan_kwargs)
+        tasks.extend(resp.get("Items", []))
+
+        if "LastEvaluatedKey" not in resp:
+            break
+        scan_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+    tasks.sort(key=sort_key, reverse=descending)
+    return tasks
+
+
+def scan_all_tasks(filters, descending=True):
+    segments = max(1, ADMIN_SCAN_SEGMENTS)
+
+    with ThreadPoolExecutor(max_workers=segments) as pool:
+        results = list(pool.map(
+            lambda seg: scan_segment(seg, segments, filters, descending),
+            range(segments)
+        ))
+
+    # k-way merge of the already sorted segments
+    return list(heapq.merge(*results, key=sort_key, reverse=descending))
+
+
+# ======================================================
+# 🔄 DELTA SYNC: changed tasks + tombstones since a watermark
+# ======================================================
+def query_since(index, key_condition):
+    items = []
+    query_kwargs = {"IndexName": index, "KeyConditionExpression": key_condition}
+
+    while True:
+        resp = table.query(**query_kwargs)
+        items.extend(resp.get("Items", []))
+
+        if "LastEvaluatedKey" not in resp:
+            return items
+        query_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+
+# watermark → naive UTC isoformat (as stored), minus the skew window
+def since_with_skew(since):
+    ts = datetime.fromisoformat(since.replace("Z", "+00:00"))
+    if ts.tzinfo:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return (ts - timedelta(seconds=DELTA_SKEW_SECONDS)).isoformat()
+
+
+def delta_sync(user_id, is_admin, since):
+    owner = ALL_MEMBERS if is_admin else user_id
+    query_from = since_with_skew(since)
+
+    members = query_since(
+        MEMBER_INDEX,
+        Key("memberId").eq(owner) & Key("updatedAt").gt(query_from)
+    )
+    changed = batch_get_tasks([m["taskId"] for m in members])
+
+    tombstones = query_since(
+        TOMBSTONE_INDEX,
+        Key("tombstoneMemberId").eq(owner) & Key("updatedAt").gt(query_from)
+    )
+
+    watermark = max(
+        [since]
+        + [t.get("updatedAt", "") for t in changed]
+        + [t["updatedAt"] for t in tombstones]
+    )
+
+    return changed, [t["taskId"] for t in tombstones], watermark
+
+
+# ======================================================
+# 🏷️ ETag over the serialized body; If-None-Match → 304
+# ======================================================
+def etag_response(event, body):
+    etag = 'W/"' + hashlib.sha256(body.encode()).hexdigest()[:32] + '"'
+    headers = {k.lower(): v for k, v in (event.get("headers") or {}).items()}
+    seen = [t.strip() for t in (headers.get("if-none-match") or "").split(",")]
+
+    if etag in seen or "*" in seen:
+        return {
+            "statusCode": 304,
+            "headers": {**CORS_HEADERS, "ETag": etag},
+            "body": ""
+        }
+    return {
+        "statusCode": 200,
+        "headers": {**CORS_HEADERS, "ETag": etag},
+        "body": body
+    }
+
+
+def normalize(task):
+    task["id"] = task.get("taskId")
+    # per-task ETag for If-Match on PUT / DELETE
+    task["etag"] = f'"{int(task.get("version", 0))}"'
 
 
 def handler(event, context):
@@ -37,56 +306,115 @@ def handler(event, context):
             "body": json.dumps({"message": "Unauthorized"})
         }
 
-    items = []
-    scan_kwargs = {}
+    # ======================================================
+    # 📄 PAGINATION PARAMS (optional)
+    # no limit/cursor → full list, as before
+    # ======================================================
+    params = event.get("queryStringParameters") or {}
 
     # ======================================================
-    # 🔁 FULL TABLE SCAN (unchanged)
+    # 🔄 ?since=<watermark> → only what changed
     # ======================================================
-    while True:
-        resp = table.scan(**scan_kwargs)
-        items.extend(resp.get("Items", []))
+    if params.get("since"):
+        try:
+            since_with_skew(params["since"])
+        except ValueError:
+            return {
+                "statusCode": 400,
+                "headers": CORS_HEADERS,
+                "body": json.dumps({"message": "since must be an ISO-8601 timestamp"})
+            }
 
-        if "LastEvaluatedKey" not in resp:
-            break
-        scan_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+        changed, deleted, watermark = delta_sync(
+            user_id, "admin" in groups, params["since"]
+        )
+        for t in changed:
+            normalize(t)
+        changed.sort(key=sort_key, reverse=True)
+
+        return etag_response(event, json.dumps({
+            "items": changed,
+            "deleted": deleted,
+            "watermark": watermark
+        }, default=json_default))
+
+    cursor = params.get("cursor")
+    paged = "limit" in params or cursor is not None
+
+    try:
+        limit = int(params.get("limit", MAX_PAGE_SIZE)) if paged else None
+    except ValueError:
+        limit = 0
+    if paged and not 0 < limit <= MAX_PAGE_SIZE:
+        return {
+            "statusCode": 400,
+            "headers": CORS_HEADERS,
+            "body": json.dumps({"message": f"limit must be 1-{MAX_PAGE_SIZE}"})
+        }
 
     # ======================================================
-    # 🔐 ROLE FILTERING (unchanged)
+    # 🔎 FILTERS + SORT ORDER (optional)
     # ======================================================
-    if "admin" in groups:
-        tasks = [
-            t for t in items
-            if t.get("pk", "").startswith("TASK#")
-            and t.get("sk") == "META"
-        ]
-    else:
-        tasks = [
-            t for t in items
-            if t.get("pk", "").startswith("TASK#")
-            and t.get("sk") == "META"
-            and user_id in t.get("participantIds", [])
-        ]
+    filters = {f: params[f] for f in FILTER_FIELDS if params.get(f)}
+    order = params.get("order", "desc").lower()
+    if order not in ("asc", "desc"):
+        return {
+            "statusCode": 400,
+            "headers": CORS_HEADERS,
+            "body": json.dumps({"message": "order must be asc or desc"})
+        }
+    descending = order == "desc"
+
+    is_admin = "admin" in groups
+    owner = ALL_MEMBERS if is_admin else user_id  # admins page through the ALL memberships
+    cursor_kind = ("admin:" if is_admin else "") + f"{member_query(owner, filters)[0]}:{order}"
+
+    start_key = None
+    if cursor:
+        start_key = decode_cursor(cursor, cursor_kind)
+        if start_key is None:
+            return {
+                "statusCode": 400,
+                "headers": CORS_HEADERS,
+                "body": json.dumps({"message": "Invalid cursor"})
+            }
 
     # ======================================================
-    # 🧠 NORMALIZE ID (unchanged)
+    # 🔐 ROLE BASED READ
+    # admin, full list → parallel segmented scan (every task is read anyway)
+    # admin, paged     → ALL membership / filter GSI query, one bounded read
+    # user             → membership / filter GSI query, sized to own tasks
     # ======================================================
-    for t in tasks:
-        t["id"] = t.get("taskId")
+    next_cursor = None
+
+    if is_admin and not paged:
+        tasks = scan_all_tasks(filters, descending)  # already merged in order
+    else:
+        task_ids, last_key = query_member_task_ids(
+            owner, filters, descending, limit, start_key
+        )
+        tasks = batch_get_tasks(task_ids)
+        if last_key:
+            next_cursor = encode_cursor(cursor_kind, last_key)
+
+        # ======================================================
+        # 📅 SORT (index order is by membership updatedAt, not META)
+        # ======================================================
+        tasks.sort(key=sort_key, reverse=descending)
 
     # ======================================================
-    # 📅 SORT (unchanged)
+    # 🧠 NORMALIZE ID + per-task ETag
     # ======================================================
-    tasks.sort(
-        key=lambda x: x.get("updatedAt", x.get("createdAt", "")),
-        reverse=True
-    )
+    for t in tasks:
+        normalize(t)
 
     # ======================================================
     # ✅ SAFE JSON RESPONSE (FIXED)
+    # paged → {"items": [...], "nextCursor": "..."}
+    # unchanged since the client's ETag → 304, no payload
     # ======================================================
-    return {
-        "statusCode": 200,
-        "headers": CORS_HEADERS,
-        "body": json.dumps(decimal_to_native(tasks))
-    }
\ No newline at end of file
+    body = tasks
+    if paged:
+        body = {"items": tasks, "nextCursor": next_cursor}
+
+    return etag_response(event, json.dumps(body, default=json_default))
@@ -0,0 +1,60 @@
+import os
+import boto3
+
+dynamodb = boto3.resource("dynamodb")
+TASK_TABLE = dynamodb.Table(os.environ["TASK_TABLE"])
+
+ALL_MEMBERS = "ALL"  # admin membership / tombstone partition
+
+
+# one copy per handler, kept identical by shared-helpers-check.py
+def membership_item(task, member_id, now):
+    status = task.get("status", "todo")
+    priority = task.get("priority", "medium")
+    category = task.get("category", "general")
+    return {
+        "pk": f"TASK#{task['taskId']}",
+        "sk": f"MEMBER#{member_id}",
+        "taskId": task["taskId"],
+        "memberId": member_id,
+        "updatedAt": now,
+        "status": status,
+        "priority": priority,
+        "category": category,
+        # composite partition keys for the filter GSIs
+        "memberStatus": f"{member_id}#STATUS#{status}",
+        "memberPriority": f"{member_id}#PRIORITY#{priority}",
+        "memberCategory": f"{member_id}#CATEGORY#{category}",
+        "memberStatusPriority": f"{member_id}#STATUS#{status}#PRIORITY#{priority}"
+    }
+
+
+# One-off: writes MEMBER# items (participants + ALL) for tasks created before
+# MemberIndex / the ALL membership existed.
+# Safe to re-run, membership items are overwritten with the same values.
+def handler(event, context):
+    scan_kwargs = {
+        "FilterExpression": "sk = :meta",
+        "ExpressionAttributeValues": {":meta": "META"}
+    }
+    tasks = 0
+    members = 0
+
+    with TASK_TABLE.batch_writer() as batch:
+        while True:
+            resp = TASK_TABLE.scan(**scan_kwargs)
+
+            for task in resp.get("Items", []):
+                updated_at = task.get("updatedAt", task.get("createdAt", ""))
+                tasks += 1
+
+                for member_id in task.get("participantIds", []) + [ALL_MEMBERS]:
+                    batch.put_item(Item=membership_item(task, member_id, updated_at))
+                    members += 1
+
+            if "LastEvaluatedKey" not in resp:
+                break
+            scan_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+    print("BACKFILL DONE:", tasks, "tasks,", members, "memberships")
+    return {"tasks": tasks, "memberships": members}
@@ -0,0 +1,68 @@
+import os
+import boto3
+from boto3.dynamodb.types import TypeDeserializer
+
+dynamodb = boto3.resource("dynamodb")
+TASK_TABLE = dynamodb.Table(os.environ["TASK_TABLE"])
+
+ALL_MEMBERS = "ALL"  # admin membership / tombstone partition
+ConditionalCheckFailed = dynamodb.meta.client.exceptions.ConditionalCheckFailedException
+
+deserializer = TypeDeserializer()
+
+# =========================
+# Membership touch worker (DynamoDB Streams trigger on TASK_TABLE,
+# view type NEW_AND_OLD_IMAGES, batch item failures enabled)
+#
+# Delta-sync clients read MEMBER# items by updatedAt, so every META write has
+# to move them too. Writers that change membership fields (update, bulk update,
+# mention worker) already write the memberships in the same transaction; the
+# comment handlers only touch META and leave the fan-out to this worker.
+#
+# The update is skipped for memberships that are already as new (written with
+# the META change) and for tombstones (no memberId), so a replay is a no-op.
+# =========================
+
+def image(record, name):
+    raw = record["dynamodb"].get(name)
+    if not raw:
+        return None
+    return {k: deserializer.deserialize(v) for k, v in raw.items()}
+
+
+def touch_memberships(task_id, member_ids, now):
+    for member_id in member_ids:
+        try:
+            TASK_TABLE.update_item(
+                Key={"pk": f"TASK#{task_id}", "sk": f"MEMBER#{member_id}"},
+                UpdateExpression="SET updatedAt = :now",
+                ConditionExpression="attribute_exists(memberId) AND updatedAt < :now",
+                ExpressionAttributeValues={":now": now}
+            )
+        except ConditionalCheckFailed:
+            pass
+
+
+def touch_record(record):
+    old, new = image(record, "OldImage"), image(record, "NewImage")
+    if not new or new.get("sk") != "META":
+        return
+    if old and old.get("updatedAt") == new.get("updatedAt"):
+        return
+
+    touch_memberships(new["taskId"], new.get("participantIds", []) + [ALL_MEMBERS], new["updatedAt"])
+
+
+def handler(event, context):
+    for record in event.get("Records", []):
+        try:
+            touch_record(record)
+        except Exception as e:
+            print("MEMBERSHIP STREAM ERROR:", record["dynamodb"].get("SequenceNumber"), str(e))
+            return {
+                "batchItemFailures": [
+                    {"itemIdentifier": record["dynamodb"]["SequenceNumber"]}
+                ]
+            }
+
+    return {"batchItemFailures": []}
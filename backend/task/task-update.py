@@ -1,5 +1,7 @@
 import json
 import os
+import zlib
+import time
 import boto3
 from datetime import datetime
 
@@ -7,11 +9,72 @@ dynamodb = boto3.resource("dynamodb")
 TASK_TABLE = dynamodb.Table(os.environ["TASK_TABLE"])
 AUDIT_TABLE = dynamodb.Table(os.environ["AUDIT_TABLE"])
 
+# Audit records are spread over AUDIT_SHARDS partitions per day
+# (audit/audit-get-lambda.py reads them with the same AUDIT_SHARDS; never lower it)
+AUDIT_SHARDS = int(os.environ.get("AUDIT_SHARDS", "8"))
+
+TransactionCanceled = dynamodb.meta.client.exceptions.TransactionCanceledException
+
+ALL_MEMBERS = "ALL"  # admin membership / tombstone partition
+MAX_TRANSACT_ITEMS = 100
+UPDATE_MAX_ATTEMPTS = 3
+
+# =========================
+# Helper: audit key (pk = AUDIT#<day>#<shard>, sk starts with the timestamp)
+# =========================
+def audit_key(action, entity_id, ts):
+    sk = f"{ts}#{action}#{entity_id}"
+    return {"pk": f"AUDIT#{ts[:10]}#{zlib.crc32(sk.encode()) % AUDIT_SHARDS}", "sk": sk}
+
+
+# =========================
+# Helper: membership item (feeds MemberIndex + filter GSIs)
+# (one copy per handler, kept identical by shared-helpers-check.py)
+# =========================
+def membership_item(task, member_id, now):
+    status = task.get("status", "todo")
+    priority = task.get("priority", "medium")
+    category = task.get("category", "general")
+    return {
+        "pk": f"TASK#{task['taskId']}",
+        "sk": f"MEMBER#{member_id}",
+        "taskId": task["taskId"],
+        "memberId": member_id,
+        "updatedAt": now,
+        "status": status,
+        "priority": priority,
+        "category": category,
+        # composite partition keys for the filter GSIs
+        "memberStatus": f"{member_id}#STATUS#{status}",
+        "memberPriority": f"{member_id}#PRIORITY#{priority}",
+        "memberCategory": f"{member_id}#CATEGORY#{category}",
+        "memberStatusPriority": f"{member_id}#STATUS#{status}#PRIORITY#{priority}"
+    }
+
+
 CORS_HEADERS = {
     "Content-Type": "application/json",
-    "Access-Control-Allow-Origin": "*"
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Expose-Headers": "ETag"
 }
 
+
+# =========================
+# Helper: If-Match: "<version>" → expected version (None = no precondition)
+# =========================
+def if_match_version(event):
+    headers = {k.lower(): v for k, v in (event.get("headers") or {}).items()}
+    tag = (headers.get("if-match") or "").strip()
+    if not tag or tag == "*":
+        return None
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    try:
+        return int(tag.strip('"'))
+    except ValueError:
+        return -1  # unparseable → never matches
+
+
 def handler(event, context):
     try:
         task_id = event["pathParameters"]["id"]
@@ -29,78 +92,115 @@ def handler(event, context):
         groups = claims.get("cognito:groups", [])
 
         pk = f"TASK#{task_id}"
-        sk = "META"
         now = datetime.utcnow().isoformat()
+        expected = if_match_version(event)
 
-        # ===== FETCH TASK =====
-        res = TASK_TABLE.get_item(Key={"pk": pk, "sk": sk})
-        task = res.get("Item")
-        if not task:
+        fields = [f for f in ("status", "priority") if f in body]
+        if not fields:
             return {
-                "statusCode": 404,
+                "statusCode": 200,
                 "headers": CORS_HEADERS,
-                "body": json.dumps({"message": "Task not found"})
+                "body": json.dumps({"message": "No changes"})
             }
 
-        # ===== AUTHZ =====
-        if "admin" not in groups and user_id != task["ownerId"]:
-            return {
-                "statusCode": 403,
-                "headers": CORS_HEADERS,
-                "body": json.dumps({"message": "Not allowed"})
-            }
+        # ===== READ → CHECK → ONE TRANSACTION (META + memberships) =====
+        # guarded by the updatedAt we read, as in task-bulk-update.py; a
+        # concurrent write cancels it and the checks run again on a fresh read
+        for attempt in range(UPDATE_MAX_ATTEMPTS):
+            task = TASK_TABLE.get_item(
+                Key={"pk": pk, "sk": "META"},
+                ConsistentRead=True
+            ).get("Item")
+
+            # ===== AUTHZ + PRECONDITION + CHANGE DETECTION =====
+            changes = {f: body[f] for f in fields if task and body[f] != task.get(f)}
+            code = None
+            if not task:
+                code, message = 404, "Task not found"
+            elif "admin" not in groups and user_id != task.get("ownerId"):
+                code, message = 403, "Not allowed"
+            elif expected is not None and expected != int(task.get("version", 0)):
+                return {
+                    "statusCode": 412,
+                    "headers": {**CORS_HEADERS, "ETag": f'"{int(task.get("version", 0))}"'},
+                    "body": json.dumps({"message": "Task was modified by someone else"})
+                }
+            elif not changes:
+                code, message = 200, "No changes"
+
+            if code:
+                return {
+                    "statusCode": code,
+                    "headers": CORS_HEADERS,
+                    "body": json.dumps({"message": message})
+                }
+
+            # ===== MEMBERSHIP (keeps MemberIndex + filter GSIs in step, atomically) =====
+            updated = dict(task, **changes)
+            member_ids = task.get("participantIds", []) + [ALL_MEMBERS]
+            if len(member_ids) + 1 > MAX_TRANSACT_ITEMS:
+                return {
+                    "statusCode": 422,
+                    "headers": CORS_HEADERS,
+                    "body": json.dumps({"message": "Task has too many participants to update atomically"})
+                }
 
-        update_expr = []
-        names = {}
-        values = {}
-        audits = []
-
-        # ===== STATUS =====
-        if "status" in body and body["status"] != task.get("status"):
-            update_expr.append("#s = :s")
-            names["#s"] = "status"
-            values[":s"] = body["status"]
-            audits.append(("UPDATE_STATUS", task.get("status"), body["status"]))
-
-        # ===== PRIORITY =====
-        if "priority" in body and body["priority"] != task.get("priority"):
-            update_expr.append("#p = :p")
-            names["#p"] = "priority"
-            values[":p"] = body["priority"]
-            audits.append(("UPDATE_PRIORITY", task.get("priority"), body["priority"]))
-
-        if not update_expr:
+            names = {"#ub": "updatedBy", "#ua": "updatedAt", "#v": "version"}
+            values = {":ub": username, ":ua": now, ":seen": task.get("updatedAt"), ":one": 1}
+            sets = ["#ub = :ub", "#ua = :ua"]
+            for field, value in changes.items():
+                names[f"#{field}"] = field
+                values[f":{field}"] = value
+                sets.append(f"#{field} = :{field}")
+
+            transact_items = [{
+                "Update": {
+                    "TableName": TASK_TABLE.name,
+                    "Key": {"pk": pk, "sk": "META"},
+                    "UpdateExpression": "SET " + ", ".join(sets) + " ADD #v :one",
+                    "ConditionExpression": "attribute_exists(pk) AND #ua = :seen",
+                    "ExpressionAttributeNames": names,
+                    "ExpressionAttributeValues": values
+                }
+            }]
+            transact_items += [
+                {"Put": {"TableName": TASK_TABLE.name, "Item": membership_item(updated, m, now)}}
+                for m in member_ids
+            ]
+
+            try:
+                dynamodb.meta.client.transact_write_items(TransactItems=transact_items)
+                break
+            except TransactionCanceled as e:
+                reasons = e.response.get("CancellationReasons", [])
+                if not reasons or reasons[0].get("Code") not in ("ConditionalCheckFailed", "TransactionConflict"):
+                    raise
+                time.sleep(min(0.05 * (2 ** attempt), 1))
+        else:
             return {
-                "statusCode": 200,
+                "statusCode": 409,
                 "headers": CORS_HEADERS,
-                "body": json.dumps({"message": "No changes"})
+                "body": json.dumps({"message": "Task changed concurrently"})
             }
 
-        update_expr += ["#ub = :ub", "#ua = :ua"]
-        names["#ub"] = "updatedBy"
-        names["#ua"] = "updatedAt"
-        values[":ub"] = username
-        values[":ua"] = now
-
-        TASK_TABLE.update_item(
-            Key={"pk": pk, "sk": sk},
-            UpdateExpression="SET " + ", ".join(update_expr),
-            ExpressionAttributeNames=names,
-            ExpressionAttributeValues=values
-        )
+        # ===== AUDIT DIFF (from the image the write was guarded on) =====
+        audits = [
+            (f"UPDATE_{field.upper()}", task.get(field), value)
+            for field, value in changes.items()
+        ]
 
         # ===== AUDIT =====
         for a, old, new in audits:
             AUDIT_TABLE.put_item(
                 Item={
-                    "pk": "AUDIT",
-                    "sk": f"{a}#{task_id}#{now}",
+                    **audit_key(a, task_id, now),
                     "action": a,
                     "taskId": task_id,
                     "taskTitle": task.get("title"),
                     "oldValue": old,
                     "newValue": new,
                     "updatedBy": username,
+                    "actor": username,  # AuditActorIndex
                     "updatedAt": now,
                     "createdAt": now
                 }
@@ -108,7 +208,7 @@ def handler(event, context):
 
         return {
             "statusCode": 200,
-            "headers": CORS_HEADERS,
+            "headers": {**CORS_HEADERS, "ETag": f'"{int(task.get("version", 0)) + 1}"'},
             "body": json.dumps({"message": "Task updated"})
         }
 
@@ -33,6 +33,8 @@ let ALL_USERS = []; // [{ username, userId }]
    GLOBAL SETUP
 ========================================================= */
 let ALL_TASKS = []; // 🔑 source of truth for filtering
+let TASKS_WATERMARK = null; // latest updatedAt seen, for delta refresh
+const MENTIONS_PAGE_SIZE = 50; // mentions per page (newest first)
 
 const API = "https://s8a2413duf.execute-api.ap-south-1.amazonaws.com/prod";
 const token = localStorage.getItem("access_token");
@@ -152,11 +154,31 @@ async function loadUsers() {
    TASKS — FETCH & STORE
 ========================================================= */
 async function loadTasks() {
-  const res = await fetch(`${API}/tasks`, {
-    headers: { Authorization: `Bearer ${token}` }
-  });
+  /* First load: full list. Afterwards: only changes since TASKS_WATERMARK */
+  if (TASKS_WATERMARK) {
+    const res = await fetch(
+      `${API}/tasks?since=${encodeURIComponent(TASKS_WATERMARK)}`,
+      { headers: { Authorization: `Bearer ${token}` } }
+    );
+    const delta = await res.json();
+
+    const byId = new Map(ALL_TASKS.map(t => [t.taskId, t]));
+    delta.items.forEach(t => byId.set(t.taskId, t));
+    delta.deleted.forEach(id => byId.delete(id));
+
+    ALL_TASKS = [...byId.values()];
+    TASKS_WATERMARK = delta.watermark;
+  } else {
+    const res = await fetch(`${API}/tasks`, {
+      headers: { Authorization: `Bearer ${token}` }
+    });
 
-  ALL_TASKS = await res.json();
+    ALL_TASKS = await res.json();
+    TASKS_WATERMARK = ALL_TASKS.reduce(
+      (w, t) => ((t.updatedAt || "") > w ? t.updatedAt : w),
+      ""
+    ) || null;
+  }
 
   /* Normalize identifiers once */
   ALL_TASKS.forEach(t => {
@@ -562,22 +584,21 @@ function clearFilters() {
 /* =========================================================
    MENTIONS (UNCHANGED)
 ========================================================= */
-async function loadMentions() {
-  const res = await fetch(`${API}/mentions`, {
+async function loadMentions(cursor) {
+  const qs = `?limit=${MENTIONS_PAGE_SIZE}` + (cursor ? `&cursor=${encodeURIComponent(cursor)}` : "");
+  const res = await fetch(`${API}/mentions${qs}`, {
     headers: { Authorization: `Bearer ${token}` }
   });
 
-  const mentions = await res.json();
-  const badge = document.getElementById("mentionsBadge");
+  const { items: mentions, nextCursor } = await res.json();
 
-  const unread = mentions.filter(m => m.status !== "READ").length;
-  badge.style.display = unread ? "inline-block" : "none";
-  badge.innerText = unread || "";
+  refreshMentionsBadge();
 
   const body = document.getElementById("mentionsBody");
-  body.innerHTML = "";
+  if (!cursor) body.innerHTML = "";
+  document.getElementById("mentionsMore")?.remove();
 
-  if (!mentions.length) {
+  if (!cursor && !mentions.length) {
     body.innerHTML = `<tr><td colspan="5" class="subtitle">No mentions 🎉</td></tr>`;
     return;
   }
@@ -610,6 +631,13 @@ async function loadMentions() {
   </td>
 </tr>`;
   });
+
+  if (nextCursor) {
+    body.innerHTML += `
+<tr id="mentionsMore">
+  <td colspan="5"><button class="btn" onclick="loadMentions('${nextCursor}')">Load more</button></td>
+</tr>`;
+  }
 }
 
 async function markRead(sk) {
@@ -620,6 +648,18 @@ async function markRead(sk) {
   loadMentions();
 }
 
+async function markAllRead() {
+  await fetch(`${API}/mentions/read`, {
+    method: "POST",
+    headers: {
+      Authorization: `Bearer ${token}`,
+      "Content-Type": "application/json"
+    },
+    body: JSON.stringify({ all: true })
+  });
+  loadMentions();
+}
+
 function openTaskFromMention(taskId, sk) {
   // 1️⃣ Mark mention as READ (non-blocking)
   if (sk) {
@@ -647,26 +687,26 @@ function openTaskFromMention(taskId, sk) {
 /* =========================================================
    AUDIT (UNCHANGED)
 ========================================================= */
-async function loadAudit() {
+async function loadAudit(cursor) {
   if (!isAdmin) return;
 
-  const res = await fetch(`${API}/audit`, {
+  const qs = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+  const res = await fetch(`${API}/audit${qs}`, {
     headers: { Authorization: `Bearer ${token}` }
   });
 
-  const logs = await res.json();
-  logs.sort((a, b) =>
-    new Date(b.updatedAt || b.createdAt) -
-    new Date(a.updatedAt || a.createdAt)
-  );
+  /* newest first, already ordered by the API */
+  const { items: logs, nextCursor } = await res.json();
 
   const body = document.getElementById("auditBody");
-  body.innerHTML = "";
+  if (!cursor) body.innerHTML = "";
+  document.getElementById("auditMore")?.remove();
+  const offset = body.querySelectorAll("tr").length;
 
   logs.forEach((l, i) => {
     body.innerHTML += `
 <tr>
-  <td>${i + 1}</td>
+  <td>${offset + i + 1}</td>
  <td>
   ${l.action}
 
@@ -679,22 +719,28 @@ async function loadAudit() {
   }
 </td>
   <td>${l.taskTitle || "-"}</td>
-  <td>${l.updatedBy || l.createdBy || l.user || l.deletedBy || "-"}</td>
+  <td>${l.actor || l.updatedBy || l.createdBy || l.user || l.deletedBy || "-"}</td>
   <td>${formatLocalTime(l.updatedAt || l.createdAt)}</td>
 </tr>`;
   });
+
+  if (nextCursor) {
+    body.innerHTML += `
+<tr id="auditMore">
+  <td colspan="5"><button class="btn" onclick="loadAudit('${nextCursor}')">Load more</button></td>
+</tr>`;
+  }
 }
 
 /* =========================================================
    MENTIONS BADGE REFRESH
 ========================================================= */
 async function refreshMentionsBadge() {
-  const res = await fetch(`${API}/mentions`, {
+  const res = await fetch(`${API}/mentions/unread-count`, {
     headers: { Authorization: `Bearer ${token}` }
   });
 
-  const mentions = await res.json();
-  const unread = mentions.filter(m => m.status !== "READ").length;
+  const { unread } = await res.json();
 
   const badge = document.getElementById("mentionsBadge");
   if (!badge) return;